@@ -1,11 +1,12 @@
-import json
 import logging
 
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
-from resilient_logger.models import ResilientLogEntry
+from resilient_logger.models import ResilientLogArchiveEntry, ResilientLogEntry
+from resilient_logger.serializers import get_serializer
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +19,15 @@ class ResilientLogEntryAdmin(admin.ModelAdmin):
         "is_sent",
         "level",
         "created_at",
+        "attempts",
+        "last_error",
+        "next_attempt_at",
         "message_prettified",
         "context_prettified",
     )
-    list_display = ("id", "__str__", "created_at", "is_sent")
+    list_display = ("id", "__str__", "created_at", "is_sent", "attempts")
     list_filter = ("created_at", "is_sent")
+    actions = ("requeue_parked_entries",)
 
     def has_delete_permission(self, request, obj=None):
         return False
@@ -33,16 +38,40 @@ class ResilientLogEntryAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+    @admin.action(description="Requeue the selected parked entries")
+    def requeue_parked_entries(self, request, queryset):
+        """Reset the attempts of the entries that exceeded the maximum attempts."""
+        count = queryset.filter(is_sent=False, next_attempt_at__isnull=True).update(
+            attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"Requeued {count} parked entries.")
+
     @admin.display(description="message")
     def message_prettified(self, instance):
         """Format the message to be a bit a more user-friendly."""
-        message = json.dumps(instance.message, indent=2, sort_keys=True)
-        content = f"<pre>{escape(message)}</pre>"
+        message = get_serializer().dumps(instance.message, sort_keys=True, pretty=True)
+        content = f"<pre>{escape(message.decode())}</pre>"
         return mark_safe(content)
 
     @admin.display(description="context")
     def context_prettified(self, instance):
         """Format the context to be a bit a more user-friendly."""
-        context = json.dumps(instance.context, indent=2, sort_keys=True)
-        content = f"<pre>{escape(context)}</pre>"
+        context = get_serializer().dumps(instance.context, sort_keys=True, pretty=True)
+        content = f"<pre>{escape(context.decode())}</pre>"
         return mark_safe(content)
+
+
+@admin.register(ResilientLogArchiveEntry)
+class ResilientLogArchiveEntryAdmin(ResilientLogEntryAdmin):
+    readonly_fields = (
+        "id",
+        "level",
+        "created_at",
+        "sent_at",
+        "attempts",
+        "message_prettified",
+        "context_prettified",
+    )
+    list_display = ("id", "__str__", "created_at", "sent_at")
+    list_filter = ("created_at",)
+    actions = ()
@@ -1,6 +1,21 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_save
 
 
 class ResilientLoggerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "resilient_logger"
+
+    def ready(self) -> None:
+        if not apps.is_installed("auditlog"):
+            return
+
+        from auditlog.models import LogEntry
+
+        from resilient_logger.signals import queue_audit_log_delivery
+
+        post_save.connect(
+            queue_audit_log_delivery,
+            sender=LogEntry,
+            dispatch_uid="resilient_logger_queue_audit_log_delivery",
+        )
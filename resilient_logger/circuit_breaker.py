@@ -0,0 +1,63 @@
+import time
+from collections.abc import Callable
+from enum import Enum
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks the consecutive failures of a log target.
+
+    The circuit opens after failure_threshold consecutive failures and no requests
+    are allowed until reset_timeout seconds have passed. After that the circuit is
+    half-open and the next request decides whether it closes or opens again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+
+        if self._clock() - self._opened_at >= self._reset_timeout:
+            return CircuitState.HALF_OPEN
+
+        return CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        return self.state != CircuitState.OPEN
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            self._opened_at = self._clock()
+
+    def as_dict(self) -> dict:
+        return {"state": self.state.value, "failures": self._failures}
@@ -0,0 +1,116 @@
+"""
+Migration operations that adapt to the capabilities of the database.
+"""
+
+from django.db import models
+from django.db.migrations.operations import AddIndex, RemoveIndex
+
+
+class AddPartialIndexConcurrently(AddIndex):
+    """
+    Adds a partial index without blocking the writes where possible.
+
+    On PostgreSQL the index is created concurrently, except on a partitioned
+    table, which does not support it. Databases without partial indexes get an
+    index on the condition fields followed by the index fields instead. The
+    migration using this must not be atomic.
+    """
+
+    def __init__(
+        self, model_name: str, index: models.Index, fallback_fields: list[str]
+    ):
+        super().__init__(model_name, index)
+        self.fallback_fields = fallback_fields
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        kwargs["fallback_fields"] = self.fallback_fields
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            _add_index(schema_editor, model, self.index, self.fallback_fields)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            _remove_index(schema_editor, model, self.index)
+
+    def describe(self):
+        return f"{super().describe()} (concurrently where supported)"
+
+    def _fallback_index(self) -> models.Index:
+        return _fallback_index(self.index, self.fallback_fields)
+
+
+class RemovePartialIndexConcurrently(RemoveIndex):
+    """
+    Removes an index added with AddPartialIndexConcurrently without blocking the
+    writes where possible. The migration using this must not be atomic.
+    """
+
+    def __init__(self, model_name: str, name: str, fallback_fields: list[str]):
+        super().__init__(model_name, name)
+        self.fallback_fields = fallback_fields
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        kwargs["fallback_fields"] = self.fallback_fields
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            model_state = from_state.models[app_label, self.model_name_lower]
+            index = model_state.get_index_by_name(self.name)
+            _remove_index(schema_editor, model, index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            model_state = to_state.models[app_label, self.model_name_lower]
+            index = model_state.get_index_by_name(self.name)
+            _add_index(schema_editor, model, index, self.fallback_fields)
+
+    def describe(self):
+        return f"{super().describe()} (concurrently where supported)"
+
+
+def _add_index(schema_editor, model, index: models.Index, fallback_fields: list[str]):
+    if _can_run_concurrently(schema_editor, model):
+        schema_editor.add_index(model, index, concurrently=True)
+    elif schema_editor.connection.features.supports_partial_indexes:
+        schema_editor.add_index(model, index)
+    else:
+        schema_editor.add_index(model, _fallback_index(index, fallback_fields))
+
+
+def _remove_index(schema_editor, model, index: models.Index):
+    if _can_run_concurrently(schema_editor, model):
+        schema_editor.remove_index(model, index, concurrently=True)
+    else:
+        # Both variants share the name
+        schema_editor.remove_index(model, index)
+
+
+def _fallback_index(index: models.Index, fallback_fields: list[str]) -> models.Index:
+    return models.Index(fields=[*fallback_fields, *index.fields], name=index.name)
+
+
+def _can_run_concurrently(schema_editor, model) -> bool:
+    connection = schema_editor.connection
+
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [model._meta.db_table],
+        )
+        return cursor.fetchone() is None
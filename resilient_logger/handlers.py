@@ -1,9 +1,21 @@
+import asyncio
 import logging
+import os
+import queue
+import threading
+import weakref
+from typing import Any
+
+from django.db import close_old_connections, connections
 
 from resilient_logger.utils import assert_required_extras, get_log_record_extra
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+
 
 class ResilientLogHandler(logging.Handler):
     def __init__(
@@ -29,3 +41,262 @@ class ResilientLogHandler(logging.Handler):
         return ResilientLogSource.create(
             level=record.levelno, message=record.getMessage(), context=extra
         )
+
+
+class AsyncResilientLogHandler(ResilientLogHandler):
+    """
+    Log handler that does not block a running event loop.
+
+    When a record is logged from a coroutine, the entry is stored with the async
+    ORM in a task scheduled on the running loop. Elsewhere the entry is stored
+    synchronously like ResilientLogHandler does. The scheduled tasks can be
+    awaited with aflush().
+    """
+
+    def __init__(
+        self,
+        level: int = logging.NOTSET,
+        required_fields: list[str] | None = None,
+    ):
+        super().__init__(level, required_fields)
+        self._tasks: set[asyncio.Task] = set()
+
+    def emit(self, record: logging.LogRecord):
+        from resilient_logger.sources import ResilientLogSource
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return super().emit(record)
+
+        extra = get_log_record_extra(record)
+        assert_required_extras(extra, self.required_fields)
+        kwargs = {
+            "level": record.levelno,
+            "message": record.getMessage(),
+            "context": extra,
+        }
+
+        if ResilientLogSource.is_batch_active():
+            # Adding to the batch does not touch the database
+            return ResilientLogSource.create(**kwargs)
+
+        task = loop.create_task(ResilientLogSource.acreate(**kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(lambda task: self._task_done(task, record))
+
+    async def aflush(self) -> None:
+        """
+        Waits until the entries scheduled on the running loop are stored.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = [
+            task for task in self._tasks if task.get_loop() is loop and not task.done()
+        ]
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def _task_done(self, task: asyncio.Task, record: logging.LogRecord) -> None:
+        self._tasks.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            try:
+                raise task.exception()
+            except Exception:
+                self.handleError(record)
+
+
+class BufferedResilientLogHandler(ResilientLogHandler):
+    """
+    Log handler that stores the records in the background instead of inserting
+    each of them in the thread that logs.
+
+    The records are queued in memory and a background thread stores them with
+    one bulk insert when flush_size records are queued or flush_interval seconds
+    have passed. At most queue_size records are kept in memory; the overflow
+    policy defines what happens when the queue is full:
+    - "block" waits until there is space in the queue.
+    - "drop_newest" drops the record being logged.
+    - "drop_oldest" drops the oldest queued record.
+    The number of dropped records is stored as a warning entry.
+
+    The queued records are stored when the handler is flushed or closed, which
+    logging does on the interpreter exit. Records queued when the process is
+    killed are lost.
+    """
+
+    def __init__(
+        self,
+        level: int = logging.NOTSET,
+        required_fields: list[str] | None = None,
+        queue_size: int = 10000,
+        flush_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow: str = OVERFLOW_DROP_NEWEST,
+    ):
+        super().__init__(level, required_fields)
+
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST):
+            raise ValueError(f"Unknown overflow policy '{overflow}'")
+
+        if queue_size < 1 or flush_size < 1:
+            raise ValueError("queue_size and flush_size must be at least 1")
+
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.dropped = 0
+
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._worker_pid: int | None = None
+
+        after_fork = weakref.WeakMethod(self._after_fork)
+
+        def reset_after_fork() -> None:
+            method = after_fork()
+
+            if method is not None:
+                method()
+
+        os.register_at_fork(after_in_child=reset_after_fork)
+
+    def emit(self, record: logging.LogRecord):
+        from resilient_logger.sources.resilient_log_source import (
+            ResilientLogEntryData,
+        )
+
+        extra = get_log_record_extra(record)
+        assert_required_extras(extra, self.required_fields)
+
+        self._ensure_worker()
+        self._enqueue(
+            ResilientLogEntryData(
+                level=record.levelno, message=record.getMessage(), context=extra
+            )
+        )
+
+        if self._queue.qsize() >= self.flush_size:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Stores the queued records in the calling thread.
+        """
+        with self._flush_lock:
+            entries = self._drain()
+
+            if self.dropped:
+                entries.append(self._dropped_entry(self.dropped))
+                self.dropped = 0
+
+            if not entries:
+                return
+
+            try:
+                self._store(entries)
+            except Exception:
+                self.handleError(
+                    logging.makeLogRecord(
+                        {"msg": f"Failed to store {len(entries)} log entries"}
+                    )
+                )
+
+    def close(self):
+        self._closed.set()
+        self._wake.set()
+
+        if self._worker is not None:
+            self._worker.join()
+
+        self.flush()
+        super().close()
+
+    def _enqueue(self, entry: Any) -> None:
+        if self.overflow == OVERFLOW_BLOCK:
+            self._queue.put(entry)
+            return
+
+        while True:
+            try:
+                self._queue.put_nowait(entry)
+                return
+            except queue.Full:
+                self._wake.set()
+                self.dropped += 1
+
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    return
+
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+    def _drain(self) -> list[Any]:
+        entries = []
+
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                return entries
+
+    def _store(self, entries: list[Any]) -> None:
+        from resilient_logger.sources import ResilientLogSource
+
+        # The background thread keeps its connection between the flushes
+        close_old_connections()
+
+        for i in range(0, len(entries), self.flush_size):
+            ResilientLogSource.bulk_create(entries[i : i + self.flush_size])
+
+    def _dropped_entry(self, count: int) -> Any:
+        from resilient_logger.sources.resilient_log_source import (
+            ResilientLogEntryData,
+        )
+
+        return ResilientLogEntryData(
+            level=logging.WARNING,
+            message=f"Dropped {count} log records, the log queue was full.",
+            context={"dropped": count},
+        )
+
+    def _after_fork(self) -> None:
+        # Threads do not survive fork, so the child starts its own worker. The
+        # records queued by the parent are left for the parent to store.
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self.dropped = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker_pid is not None or self._closed.is_set():
+            return
+
+        with self._worker_lock:
+            if self._worker_pid is not None:
+                return
+
+            self._worker = threading.Thread(
+                target=self._run, name="BufferedResilientLogHandler", daemon=True
+            )
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._closed.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self.flush()
+        finally:
+            connections.close_all()
@@ -29,6 +29,15 @@ class Command(BaseCommand):
             default=30,
             help="Days to keep the old values stored",
         )
+        parser.add_argument(
+            "--max-seconds",
+            action="store",
+            dest="max_seconds",
+            type=float,
+            default=None,
+            help="Stop clearing after this many seconds, the rest is cleared on "
+            "the next run",
+        )
 
     def handle(self, *args, **options):
         days_to_keep = options.get("days_to_keep", 30)
@@ -38,5 +47,7 @@ class Command(BaseCommand):
             return
 
         logger.info("Begin clear_sent_entries job")
-        result = self.resilient_logger.clear_sent_entries(days_to_keep)
+        result = self.resilient_logger.clear_sent_entries(
+            days_to_keep, options.get("max_seconds")
+        )
         logger.info("Finished clear_sent_entries job done", extra={"result": result})
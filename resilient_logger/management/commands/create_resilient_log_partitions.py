@@ -0,0 +1,62 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from resilient_logger.models import ResilientLogEntry
+from resilient_logger.partitioning import (
+    INTERVAL_DAILY,
+    INTERVAL_MONTHLY,
+    convert_to_partitioned,
+    create_partitions,
+    is_partitioned,
+)
+from resilient_logger.utils import get_resilient_logger_config
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the upcoming partitions of the django-resilient-logger entry table, "
+        "only works if settings.RESILIENT_LOGGER['partitioning'] is set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            dest="convert",
+            default=False,
+            help="Convert the entry table to a partitioned table first. Copies the "
+            "existing entries and locks the table while doing it.",
+        )
+
+    def handle(self, *args, **options):
+        partitioning = get_resilient_logger_config()["partitioning"]
+
+        if not partitioning:
+            raise CommandError("partitioning is not configured")
+
+        interval = partitioning.get("interval", INTERVAL_MONTHLY)
+        premake = partitioning.get("premake", 3)
+
+        if interval not in (INTERVAL_DAILY, INTERVAL_MONTHLY):
+            raise CommandError(f"Unknown partitioning interval '{interval}'")
+
+        using = router.db_for_write(ResilientLogEntry)
+
+        if connections[using].vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL")
+
+        if not is_partitioned(using):
+            if not options["convert"]:
+                raise CommandError(
+                    "The entry table is not partitioned, run with --convert"
+                )
+
+            logger.info("Converting the entry table to a partitioned table")
+            convert_to_partitioned(interval, premake, using)
+
+        created = create_partitions(interval, premake, using)
+        logger.info(f"Created {len(created)} partitions.", extra={"result": created})
@@ -0,0 +1,63 @@
+import logging
+
+from auditlog.models import LogEntry
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from resilient_logger.models import AuditLogDelivery
+from resilient_logger.sources.django_audit_log_source import (
+    DjangoAuditLogSource,
+    _unsent_q,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the auditlog entries which are not marked as sent into the "
+        "delivery table of django-resilient-logger. Run once after switching "
+        "DjangoAuditLogSource to tracking='delivery_table'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            action="store",
+            dest="chunk_size",
+            type=int,
+            default=1000,
+            help="Number of entries queued in one transaction",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        if not DjangoAuditLogSource.is_delivery_table_enabled():
+            logger.warning("DjangoAuditLogSource does not use the delivery table")
+
+        entries = LogEntry.objects.filter(_unsent_q()).order_by("id")
+
+        queued = 0
+        last_id = None
+
+        while True:
+            chunk = entries if last_id is None else entries.filter(id__gt=last_id)
+            ids = list(chunk.values_list("id", flat=True)[:chunk_size])
+
+            if not ids:
+                break
+
+            with transaction.atomic():
+                AuditLogDelivery.objects.bulk_create(
+                    [AuditLogDelivery(log_entry_id=id) for id in ids],
+                    ignore_conflicts=True,
+                )
+
+            queued += len(ids)
+            last_id = ids[-1]
+
+        logger.info(f"Queued {queued} audit log entries for delivery.")
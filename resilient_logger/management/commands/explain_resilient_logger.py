@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from resilient_logger.models import ResilientLogEntry
+from resilient_logger.resilient_logger import ResilientLogger
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plans of the queries that fetch the unsent entries and "
+        "clear the sent entries of each django-resilient-logger source"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days-to-keep",
+            action="store",
+            dest="days_to_keep",
+            type=int,
+            default=30,
+            help="Days to keep used in the clear query",
+        )
+        parser.add_argument(
+            "--no-analyze",
+            action="store_false",
+            dest="analyze",
+            default=True,
+            help="Only plan the queries instead of running them with EXPLAIN "
+            "ANALYZE on PostgreSQL",
+        )
+
+    def handle(self, *args, **options):
+        options_for_explain = {}
+        vendor = connections[router.db_for_read(ResilientLogEntry)].vendor
+
+        if options["analyze"] and vendor == "postgresql":
+            options_for_explain = {"analyze": True, "buffers": True}
+
+        plans = ResilientLogger.create().explain_queries(
+            options["days_to_keep"], **options_for_explain
+        )
+
+        for source_name, queries in plans.items():
+            for query_name, plan in queries.items():
+                self.stdout.write(f"== {source_name}: {query_name} ==")
+                self.stdout.write(plan)
+                self.stdout.write("")
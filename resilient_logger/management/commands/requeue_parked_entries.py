@@ -0,0 +1,23 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from resilient_logger.resilient_logger import ResilientLogger
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Requeue django-resilient-logger entries which were parked after "
+        "exceeding the maximum attempts of the retry policy"
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.resilient_logger = ResilientLogger.create()
+
+    def handle(self, *args, **options):
+        logger.info("Begin requeue_parked_entries job")
+        result = self.resilient_logger.requeue_parked_entries()
+        logger.info("Finished requeue_parked_entries job", extra={"result": result})
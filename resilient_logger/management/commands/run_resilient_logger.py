@@ -0,0 +1,151 @@
+import logging
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from resilient_logger.notifications import NotificationListener
+from resilient_logger.resilient_logger import ResilientLogger
+from resilient_logger.utils import get_resilient_logger_config
+
+logger = logging.getLogger(__name__)
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class Command(BaseCommand):
+    help = (
+        "Continuously send django-resilient-logger entries to centralized log center. "
+        "Polls for new entries right away while there is a backlog and backs off "
+        "exponentially when there is nothing to send."
+    )
+
+    def __init__(self):
+        super().__init__()
+        settings = get_resilient_logger_config()
+        self.should_submit = settings["submit_unsent_entries"] or False
+        self.resilient_logger = ResilientLogger.create()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-interval",
+            action="store",
+            dest="min_interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait after a run that submitted entries",
+        )
+        parser.add_argument(
+            "--max-interval",
+            action="store",
+            dest="max_interval",
+            type=float,
+            default=60.0,
+            help="Maximum seconds to wait while there is nothing to submit",
+        )
+
+    def handle(self, *args, **options):
+        min_interval = options.get("min_interval", 1.0)
+        max_interval = options.get("max_interval", 60.0)
+
+        if min_interval <= 0 or max_interval < min_interval:
+            raise CommandError(
+                "Intervals must satisfy 0 < min-interval <= max-interval"
+            )
+
+        if not self.should_submit:
+            logger.info("submit_unsent_entries is disabled in config")
+            return
+
+        previous_handlers = {
+            signum: signal.signal(signum, self._handle_stop_signal)
+            for signum in STOP_SIGNALS
+        }
+        listener = self._create_listener()
+        interval = min_interval
+
+        logger.info("Begin run_resilient_logger.")
+
+        try:
+            while not self.resilient_logger.is_stopped():
+                close_old_connections()
+                result = self.resilient_logger.submit_unsent_entries()
+
+                if result:
+                    sent = sum(result.values())
+                    logger.info(
+                        f"Submitted {sent} of {len(result)} entries.",
+                        extra={
+                            "circuit_breakers": (
+                                self.resilient_logger.get_circuit_breaker_states()
+                            )
+                        },
+                    )
+
+                interval = self._next_interval(
+                    interval, result, min_interval, max_interval
+                )
+                self._wait(interval, listener)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+            if listener:
+                listener.close()
+
+        logger.info("Finished run_resilient_logger.")
+
+    def _handle_stop_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, stopping after the current chunk.")
+        self.resilient_logger.stop()
+
+    def _create_listener(self) -> NotificationListener | None:
+        if not NotificationListener.is_supported():
+            return None
+
+        listener = NotificationListener()
+        listener.listen()
+
+        return listener
+
+    def _next_interval(
+        self,
+        interval: float,
+        result: dict[str, bool],
+        min_interval: float,
+        max_interval: float,
+    ) -> float:
+        """
+        Continues immediately while the batch limit is reached, waits the minimum
+        interval after a partial batch and doubles the wait while idle.
+        """
+        sent = sum(result.values())
+
+        if sent and len(result) >= self.resilient_logger.batch_limit:
+            return 0.0
+
+        if sent:
+            return min_interval
+
+        return min(max(interval, min_interval) * 2, max_interval)
+
+    def _wait(self, interval: float, listener: NotificationListener | None) -> None:
+        """
+        Waits for the interval in short slices, so that a stop signal or a new
+        entry notification ends the wait early.
+        """
+        deadline = time.monotonic() + interval
+
+        while not self.resilient_logger.is_stopped():
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                return
+
+            timeout = min(remaining, 1.0)
+
+            if listener is None:
+                time.sleep(timeout)
+            elif listener.wait(timeout):
+                return
@@ -1,9 +1,13 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 
 from resilient_logger.resilient_logger import ResilientLogger
 from resilient_logger.utils import get_resilient_logger_config
+from resilient_logger.workers import submit_unsent_entries_worker
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +21,64 @@ class Command(BaseCommand):
         self.should_submit = settings["submit_unsent_entries"] or False
         self.resilient_logger = ResilientLogger.create()
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            action="store",
+            dest="workers",
+            type=int,
+            default=1,
+            help=(
+                "Number of worker processes submitting entries in parallel. "
+                "Each worker submits at most batch_limit entries."
+            ),
+        )
+
     def handle(self, *args, **options):
+        workers = options.get("workers", 1)
+
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+
         if not self.should_submit:
             logger.info("submit_unsent_entries is disabled in config")
             return
 
         logger.info("Begin submit_unsent_entries job.")
-        result = self.resilient_logger.submit_unsent_entries()
-        logger.info("Finished submit_unsent_entries done.", extra={"result": result})
+
+        if workers > 1:
+            result, circuit_breakers = self._submit_with_workers(workers)
+        else:
+            result = self.resilient_logger.submit_unsent_entries()
+            circuit_breakers = self.resilient_logger.get_circuit_breaker_states()
+
+        logger.info(
+            "Finished submit_unsent_entries done.",
+            extra={"result": result, "circuit_breakers": circuit_breakers},
+        )
+
+    def _submit_with_workers(
+        self, workers: int
+    ) -> tuple[dict[str, bool], list[dict[str, Any]]]:
+        result: dict[str, bool] = {}
+        circuit_breakers: list[dict[str, Any]] = []
+
+        # Worker processes must not share the database connections of this process
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(submit_unsent_entries_worker) for _ in range(workers)
+            ]
+
+            for future in futures:
+                try:
+                    worker_result, worker_circuit_breakers = future.result()
+                except Exception:
+                    logger.exception("submit_unsent_entries worker failed")
+                    continue
+
+                result.update(worker_result)
+                circuit_breakers += worker_circuit_breakers
+
+        return result, circuit_breakers
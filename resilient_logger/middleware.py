@@ -0,0 +1,42 @@
+from collections.abc import Awaitable, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import HttpRequest, HttpResponse
+
+from resilient_logger.sources import ResilientLogSource
+
+
+class ResilientLogBatchMiddleware:
+    """
+    Saves the resilient log entries created during a request with one bulk insert
+    at the end of the request, see ResilientLogSource.batch().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(
+        self,
+        get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]],
+    ) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with ResilientLogSource.batch():
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = ResilientLogSource.start_batch()
+
+        try:
+            return await self.get_response(request)
+        finally:
+            entries = ResilientLogSource.end_batch(token)
+            await sync_to_async(ResilientLogSource.save_batch)(entries)
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resilient_logger", "0004_remove_explicit_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resilientlogentry",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0, verbose_name="attempts"),
+        ),
+        migrations.AddField(
+            model_name="resilientlogentry",
+            name="last_error",
+            field=models.TextField(null=True, verbose_name="last error"),
+        ),
+        migrations.AddField(
+            model_name="resilientlogentry",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                null=True,
+                verbose_name="next attempt at",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resilientlogentry",
+            index=models.Index(
+                fields=["is_sent", "next_attempt_at"], name="resilient_log_retry_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resilient_logger", "0005_retry_scheduling"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLogDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "log_entry_id",
+                    models.BigIntegerField(unique=True, verbose_name="log entry id"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="attempts"),
+                ),
+                ("last_error", models.TextField(null=True, verbose_name="last error")),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        null=True,
+                        verbose_name="next attempt at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "audit log delivery",
+                "verbose_name_plural": "audit log deliveries",
+                "indexes": [
+                    models.Index(
+                        fields=["next_attempt_at", "log_entry_id"],
+                        name="audit_log_delivery_retry_idx",
+                    )
+                ],
+            },
+        ),
+    ]
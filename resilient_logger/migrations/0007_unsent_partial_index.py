@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+from resilient_logger.db_operations import AddPartialIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes can only be created concurrently outside of a transaction
+    atomic = False
+
+    dependencies = [
+        ("resilient_logger", "0006_audit_log_delivery"),
+    ]
+
+    operations = [
+        AddPartialIndexConcurrently(
+            model_name="resilientlogentry",
+            index=models.Index(
+                condition=models.Q(("is_sent", False)),
+                fields=["created_at", "id"],
+                name="resilient_log_unsent_idx",
+            ),
+            fallback_fields=["is_sent"],
+        ),
+    ]
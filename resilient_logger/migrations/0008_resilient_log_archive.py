@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resilient_logger", "0007_unsent_partial_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResilientLogArchiveEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="id"
+                    ),
+                ),
+                ("level", models.IntegerField(default=0, verbose_name="level")),
+                ("message", models.JSONField(verbose_name="message")),
+                ("context", models.JSONField(null=True, verbose_name="context")),
+                (
+                    "created_at",
+                    models.DateTimeField(db_index=True, verbose_name="created at"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="attempts"),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="sent at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "resilient log archive entry",
+                "verbose_name_plural": "resilient log archive entries",
+                "ordering": ["-created_at", "-id"],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+import resilient_logger.utils
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resilient_logger", "0008_resilient_log_archive"),
+    ]
+
+    operations = [
+        # Added without the default first, so the existing entries stay null
+        # instead of sharing one generated key
+        migrations.AddField(
+            model_name="resilientlogentry",
+            name="idempotency_key",
+            field=models.CharField(
+                db_index=True,
+                editable=False,
+                max_length=64,
+                null=True,
+                verbose_name="idempotency key",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="resilientlogentry",
+            name="idempotency_key",
+            field=models.CharField(
+                db_index=True,
+                default=resilient_logger.utils.generate_idempotency_key,
+                editable=False,
+                max_length=64,
+                null=True,
+                verbose_name="idempotency key",
+            ),
+        ),
+    ]
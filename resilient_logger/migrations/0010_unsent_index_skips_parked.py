@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+from resilient_logger.db_operations import (
+    AddPartialIndexConcurrently,
+    RemovePartialIndexConcurrently,
+)
+
+
+class Migration(migrations.Migration):
+    # Indexes can only be created concurrently outside of a transaction
+    atomic = False
+
+    dependencies = [
+        ("resilient_logger", "0009_idempotency_key"),
+    ]
+
+    operations = [
+        RemovePartialIndexConcurrently(
+            model_name="resilientlogentry",
+            name="resilient_log_unsent_idx",
+            fallback_fields=["is_sent"],
+        ),
+        AddPartialIndexConcurrently(
+            model_name="resilientlogentry",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_sent", False), ("next_attempt_at__isnull", False)
+                ),
+                fields=["created_at", "id"],
+                name="resilient_log_unsent_idx",
+            ),
+            fallback_fields=["is_sent", "next_attempt_at"],
+        ),
+    ]
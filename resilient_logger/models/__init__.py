@@ -1 +1,5 @@
+from .audit_log_delivery import AuditLogDelivery as AuditLogDelivery
+from .resilient_log_archive_entry import (
+    ResilientLogArchiveEntry as ResilientLogArchiveEntry,
+)
 from .resilient_log_entry import ResilientLogEntry as ResilientLogEntry
@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class AuditLogDelivery(models.Model):
+    """
+    Pending delivery of a django-auditlog LogEntry. The row is created together
+    with the log entry and removed once the entry has been submitted.
+
+    The log entry is referenced by id only, since django-auditlog is optional.
+    """
+
+    log_entry_id = models.BigIntegerField(unique=True, verbose_name=_("log entry id"))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("attempts"))
+    last_error = models.TextField(null=True, verbose_name=_("last error"))
+    # Entries that exceeded the maximum attempts are parked with null value
+    next_attempt_at = models.DateTimeField(
+        null=True, default=timezone.now, verbose_name=_("next attempt at")
+    )
+
+    class Meta:
+        verbose_name = _("audit log delivery")
+        verbose_name_plural = _("audit log deliveries")
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "log_entry_id"],
+                name="audit_log_delivery_retry_idx",
+            ),
+        ]
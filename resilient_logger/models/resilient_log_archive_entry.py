@@ -0,0 +1,23 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ResilientLogArchiveEntry(models.Model):
+    """
+    Sent ResilientLogEntry moved out of the queue table when ResilientLogSource
+    uses the archive. Keeps the id of the original entry.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name=_("id"))
+    level = models.IntegerField(verbose_name=_("level"), default=0)
+    message = models.JSONField(verbose_name=_("message"))
+    context = models.JSONField(verbose_name=_("context"), null=True)
+    created_at = models.DateTimeField(verbose_name=_("created at"), db_index=True)
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("attempts"))
+    sent_at = models.DateTimeField(default=timezone.now, verbose_name=_("sent at"))
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        verbose_name = _("resilient log archive entry")
+        verbose_name_plural = _("resilient log archive entries")
@@ -1,6 +1,9 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from resilient_logger.utils import generate_idempotency_key
+
 
 class ResilientLogEntry(models.Model):
     is_sent = models.BooleanField(default=False, verbose_name=_("is sent"))
@@ -10,8 +13,37 @@ class ResilientLogEntry(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name=_("created at"), db_index=True
     )
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("attempts"))
+    last_error = models.TextField(null=True, verbose_name=_("last error"))
+    # Entries that exceeded the maximum attempts are parked with null value
+    next_attempt_at = models.DateTimeField(
+        null=True, default=timezone.now, verbose_name=_("next attempt at")
+    )
+    # Used by the targets as the document id, null for the entries created
+    # before it was added
+    idempotency_key = models.CharField(
+        max_length=64,
+        null=True,
+        default=generate_idempotency_key,
+        db_index=True,
+        editable=False,
+        verbose_name=_("idempotency key"),
+    )
 
     class Meta:
         ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["is_sent", "next_attempt_at"],
+                name="resilient_log_retry_idx",
+            ),
+            # Keeps the unsent queue small regardless of the number of sent entries
+            models.Index(
+                fields=["created_at", "id"],
+                # Parked entries are only retried manually, so they stay out too
+                condition=models.Q(is_sent=False, next_attempt_at__isnull=False),
+                name="resilient_log_unsent_idx",
+            ),
+        ]
         verbose_name = _("resilient log entry")
         verbose_name_plural = _("resilient log entries")
@@ -0,0 +1,122 @@
+"""
+PostgreSQL LISTEN/NOTIFY support that allows a long-running submitter to wake up
+as soon as new log entries are stored instead of waiting for the next poll.
+"""
+
+import logging
+import select
+import time
+from contextlib import suppress
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, Error, connections
+
+from resilient_logger.utils import get_resilient_logger_config
+
+NOTIFY_CHANNEL = "resilient_logger"
+
+logger = logging.getLogger(__name__)
+
+
+def _notify_enabled() -> bool:
+    try:
+        return bool(get_resilient_logger_config().get("listen_notify", False))
+    except RuntimeError:
+        return False
+
+
+def notify_new_entries(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Notifies the listeners that new entries were stored. PostgreSQL delivers the
+    notification once the current transaction commits, other databases are ignored.
+    """
+    connection = connections[using]
+
+    if connection.vendor != "postgresql" or not _notify_enabled():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, '')", [NOTIFY_CHANNEL])
+
+
+async def anotify_new_entries(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Async version of notify_new_entries. Only hops to a thread when a
+    notification is actually sent.
+    """
+    if connections[using].vendor != "postgresql" or not _notify_enabled():
+        return
+
+    await sync_to_async(notify_new_entries)(using)
+
+
+class NotificationListener:
+    """
+    Listens for the new entry notifications on a dedicated database connection,
+    so the notifications are not lost when the ORM connection is closed or reset.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS) -> None:
+        self._connection = connections.create_connection(using)
+
+    @classmethod
+    def is_supported(cls, using: str = DEFAULT_DB_ALIAS) -> bool:
+        return connections[using].vendor == "postgresql" and _notify_enabled()
+
+    def listen(self) -> None:
+        self._connection.ensure_connection()
+
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Waits at most timeout seconds for a notification and returns whether one
+        was received. Pending notifications are consumed.
+
+        If the connection is lost, it is reopened on the next call, which returns
+        True as notifications may have been missed in between.
+        """
+        try:
+            if self._connection.connection is None:
+                self.listen()
+                logger.info("Notification listener reconnected.")
+                return True
+
+            return self._receive(timeout)
+        except (Error, self._connection.Database.Error, OSError) as e:
+            logger.warning(f"Notification listener connection failed: {e!r}")
+
+            with suppress(Error):
+                self._connection.close()
+
+            time.sleep(timeout)
+            return False
+
+    def _receive(self, timeout: float) -> bool:
+        raw_connection = self._connection.connection
+        notifies = raw_connection.notifies
+
+        if callable(notifies):
+            # psycopg 3
+            if not any(True for _ in notifies(timeout=timeout, stop_after=1)):
+                return False
+
+            # The notifications queued meanwhile are handled by the same run
+            for _ in notifies(timeout=0):
+                pass
+
+            return True
+
+        # psycopg2
+        if select.select([raw_connection], [], [], timeout) == ([], [], []):
+            return False
+
+        raw_connection.poll()
+        received = bool(notifies)
+        notifies.clear()
+
+        return received
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,340 @@
+"""
+Optional PostgreSQL range partitioning of the ResilientLogEntry table by
+created_at, which lets the retention drop whole partitions instead of deleting
+the entries row by row.
+"""
+
+import datetime
+import logging
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from resilient_logger.models import ResilientLogEntry
+
+INTERVAL_DAILY = "daily"
+INTERVAL_MONTHLY = "monthly"
+
+_PARTITION_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+logger = logging.getLogger(__name__)
+
+
+def _table_name() -> str:
+    return ResilientLogEntry._meta.db_table
+
+
+def get_partition_start(interval: str, moment: datetime.datetime) -> datetime.datetime:
+    """Returns the start of the partition (in UTC) that contains the moment."""
+    moment = moment.astimezone(datetime.timezone.utc)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if interval == INTERVAL_MONTHLY:
+        return start.replace(day=1)
+
+    if interval == INTERVAL_DAILY:
+        return start
+
+    raise ValueError(f"Unknown partitioning interval '{interval}'")
+
+
+def get_next_partition_start(
+    interval: str, start: datetime.datetime
+) -> datetime.datetime:
+    if interval == INTERVAL_MONTHLY:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+
+        return start.replace(month=start.month + 1)
+
+    return start + datetime.timedelta(days=1)
+
+
+def get_partition_name(interval: str, start: datetime.datetime) -> str:
+    suffix = start.strftime("%Y%m" if interval == INTERVAL_MONTHLY else "%Y%m%d")
+    return f"{_table_name()}_p{suffix}"
+
+
+def get_partition_ranges(
+    interval: str, first: datetime.datetime, last: datetime.datetime
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Returns the (start, end) of the partitions that cover first...last."""
+    ranges = []
+    start = get_partition_start(interval, first)
+
+    while start <= last:
+        end = get_next_partition_start(interval, start)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def is_partitioned(using: str = DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[using]
+
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [_table_name()],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_partitions(
+    interval: str,
+    premake: int,
+    using: str = DEFAULT_DB_ALIAS,
+    now: datetime.datetime | None = None,
+) -> list[str]:
+    """
+    Creates the partitions from the current one up to premake intervals ahead
+    and returns the names of the created partitions.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    last = _get_premake_end(interval, premake, now)
+
+    return _create_partitions(connections[using], interval, now, last)
+
+
+def _get_premake_end(
+    interval: str, premake: int, now: datetime.datetime
+) -> datetime.datetime:
+    last = get_partition_start(interval, now)
+
+    for _ in range(premake):
+        last = get_next_partition_start(interval, last)
+
+    return last
+
+
+def _get_partitions(cursor) -> list[tuple[str, str]]:
+    """Returns the name and the bound expression of each partition."""
+    cursor.execute(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = %s::regclass",
+        [_table_name()],
+    )
+    return cursor.fetchall()
+
+
+def _create_partitions(
+    connection, interval: str, first: datetime.datetime, last: datetime.datetime
+) -> list[str]:
+    quote_name = connection.ops.quote_name
+    table = _table_name()
+    created = []
+
+    with connection.cursor() as cursor:
+        default = next(
+            (name for name, bound in _get_partitions(cursor) if bound == "DEFAULT"),
+            None,
+        )
+
+        for start, end in get_partition_ranges(interval, first, last):
+            name = get_partition_name(interval, start)
+            cursor.execute("SELECT to_regclass(%s)", [name])
+
+            if cursor.fetchone()[0] is not None:
+                continue
+
+            with transaction.atomic(using=connection.alias):
+                has_default_rows = False
+
+                if default is not None:
+                    cursor.execute(
+                        f"SELECT 1 FROM {quote_name(default)} "
+                        "WHERE created_at >= %s AND created_at < %s LIMIT 1",
+                        [start, end],
+                    )
+                    has_default_rows = cursor.fetchone() is not None
+
+                if has_default_rows:
+                    # The partition can't be created while the default partition
+                    # has rows in its range, so they are moved over to it.
+                    cursor.execute(
+                        f"ALTER TABLE {quote_name(table)} "
+                        f"DETACH PARTITION {quote_name(default)}"
+                    )
+
+                cursor.execute(
+                    f"CREATE TABLE {quote_name(name)} PARTITION OF "
+                    f"{quote_name(table)} FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+
+                if has_default_rows:
+                    cursor.execute(
+                        f"WITH moved AS (DELETE FROM {quote_name(default)} "
+                        "WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                        f"INSERT INTO {quote_name(name)} SELECT * FROM moved",
+                        [start, end],
+                    )
+                    moved = cursor.rowcount
+                    cursor.execute(
+                        f"ALTER TABLE {quote_name(table)} "
+                        f"ATTACH PARTITION {quote_name(default)} DEFAULT"
+                    )
+                    logger.info(f"Moved {moved} entries from {default} to {name}.")
+
+            created.append(name)
+
+    return created
+
+
+def convert_to_partitioned(
+    interval: str, premake: int, using: str = DEFAULT_DB_ALIAS
+) -> None:
+    """
+    Converts the ResilientLogEntry table to a table partitioned by created_at.
+
+    The existing entries are copied into the partitions, so the table is locked
+    for the duration of the copy. The primary key becomes (id, created_at) as
+    PostgreSQL requires it to contain the partition key. Entries outside of the
+    created partitions go to the default partition.
+    """
+    connection = connections[using]
+
+    if connection.vendor != "postgresql":
+        raise RuntimeError("Partitioning requires PostgreSQL")
+
+    table = _table_name()
+    quote_name = connection.ops.quote_name
+    old_table = f"{table}_unpartitioned"
+    # The name differs from the sequence of the old table, which is dropped with it
+    sequence = f"{table}_partitioned_id_seq"
+
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {quote_name(table)} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(
+                f"SELECT min(created_at), coalesce(max(id), 0) FROM {quote_name(table)}"
+            )
+            first, max_id = cursor.fetchone()
+
+            cursor.execute(
+                f"ALTER TABLE {quote_name(table)} RENAME TO {quote_name(old_table)}"
+            )
+            # Index names are unique within the schema, the indexes of the old
+            # table are dropped to recreate them with the same names.
+            cursor.execute(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND contype IN ('p', 'u')",
+                [old_table],
+            )
+
+            for (name,) in cursor.fetchall():
+                cursor.execute(
+                    f"ALTER TABLE {quote_name(old_table)} "
+                    f"DROP CONSTRAINT {quote_name(name)}"
+                )
+
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE tablename = %s", [old_table]
+            )
+
+            for (name,) in cursor.fetchall():
+                cursor.execute(f"DROP INDEX {quote_name(name)}")
+
+            # Identity columns are not supported on partitioned tables before
+            # PostgreSQL 17, so the ids come from a plain sequence.
+            cursor.execute(f"CREATE SEQUENCE {quote_name(sequence)}")
+            cursor.execute("SELECT setval(%s, %s + 1, false)", [sequence, max_id])
+            cursor.execute(
+                f"CREATE TABLE {quote_name(table)} (LIKE {quote_name(old_table)} "
+                "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                "PARTITION BY RANGE (created_at)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote_name(table)} "
+                f"ALTER COLUMN id SET DEFAULT nextval('{sequence}'), "
+                "ADD PRIMARY KEY (id, created_at)"
+            )
+            cursor.execute(
+                f"ALTER SEQUENCE {quote_name(sequence)} OWNED BY {quote_name(table)}.id"
+            )
+
+            # The field and Meta indexes with the names of the migration state
+            schema_editor = connection.schema_editor()
+
+            for statement in schema_editor._model_indexes_sql(ResilientLogEntry):
+                cursor.execute(str(statement))
+
+            cursor.execute(
+                f"CREATE TABLE {quote_name(f'{table}_default')} "
+                f"PARTITION OF {quote_name(table)} DEFAULT"
+            )
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        _create_partitions(
+            connection, interval, first or now, _get_premake_end(interval, premake, now)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote_name(table)} SELECT * FROM {quote_name(old_table)}"
+            )
+            cursor.execute(f"DROP TABLE {quote_name(old_table)}")
+
+
+def drop_sent_partitions(
+    cutoff: datetime.datetime, using: str = DEFAULT_DB_ALIAS
+) -> int:
+    """
+    Drops the partitions that end before the cutoff and only contain sent
+    entries. Returns the number of dropped entries. Must not be called inside a
+    transaction.
+    """
+    if not is_partitioned(using):
+        return 0
+
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    table = _table_name()
+    dropped = 0
+
+    with connection.cursor() as cursor:
+        partitions = _get_partitions(cursor)
+
+    for name, bound in partitions:
+        match = _PARTITION_BOUND_RE.search(bound)
+
+        if match is None:
+            # The default partition
+            continue
+
+        end = parse_datetime(match.group(2))
+
+        if end is None or end > cutoff:
+            continue
+
+        # Detaching locks the whole table, so each partition is dropped in a
+        # transaction of its own that must not be nested in a longer one.
+        with (
+            transaction.atomic(using=using, durable=True),
+            connection.cursor() as cursor,
+        ):
+            cursor.execute(
+                f"SELECT count(*), count(*) FILTER (WHERE NOT is_sent) "
+                f"FROM {quote_name(name)}"
+            )
+            count, unsent = cursor.fetchone()
+
+            if unsent:
+                continue
+
+            cursor.execute(
+                f"ALTER TABLE {quote_name(table)} DETACH PARTITION {quote_name(name)}"
+            )
+            cursor.execute(f"DROP TABLE {quote_name(name)}")
+
+        logger.info(f"Dropped partition {name} with {count} entries.")
+        dropped += count
+
+    return dropped
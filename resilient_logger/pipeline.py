@@ -0,0 +1,149 @@
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the items in a queue
+_END = object()
+
+# Seconds between the checks of whether the pipeline was aborted
+_POLL_INTERVAL = 0.1
+
+
+class Pipeline:
+    """
+    Runs stages connected by bounded queues in background threads.
+
+    Every stage runs in a thread of its own and uses its own database connection,
+    which is closed when the stage finishes. The queues hold at most queue_depth
+    items, so a fast stage waits for the slower ones instead of buffering without
+    a limit. If any stage fails, the whole pipeline is aborted and the error is
+    raised when the pipeline is closed.
+    """
+
+    def __init__(self, queue_depth: int) -> None:
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be at least 1")
+
+        self._queue_depth = queue_depth
+        self._abort = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._errors: list[BaseException] = []
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            # Stop the stages and let the original error propagate
+            self._abort.set()
+            self._join()
+            return
+
+        self.close()
+
+    def produce(self, producer: Callable[[], Iterable[Any]]) -> queue.Queue:
+        """
+        Starts a stage that puts the items of the producer into the returned queue.
+        """
+        outbox = self.create_queue()
+
+        def run() -> None:
+            for item in producer():
+                self.put(outbox, item)
+
+        self._start(run, outbox)
+        return outbox
+
+    def map(self, inbox: queue.Queue, function: Callable[[Any], Any]) -> queue.Queue:
+        """
+        Starts a stage that puts the result of the function for each item of the
+        inbox into the returned queue.
+        """
+        outbox = self.create_queue()
+
+        def run() -> None:
+            for item in self.iterate(inbox):
+                self.put(outbox, function(item))
+
+        self._start(run, outbox)
+        return outbox
+
+    def consume(self, inbox: queue.Queue, function: Callable[[Any], None]) -> None:
+        """
+        Starts a stage that calls the function for each item of the inbox.
+        """
+
+        def run() -> None:
+            for item in self.iterate(inbox):
+                function(item)
+
+        self._start(run, None)
+
+    def create_queue(self) -> queue.Queue:
+        return queue.Queue(maxsize=self._queue_depth)
+
+    def put(self, outbox: queue.Queue, item: Any) -> None:
+        while not self._abort.is_set():
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def end(self, outbox: queue.Queue) -> None:
+        """
+        Marks that no more items are put into the queue.
+        """
+        self.put(outbox, _END)
+
+    def iterate(self, inbox: queue.Queue) -> Iterator[Any]:
+        """
+        Yields the items of the queue until it is ended or the pipeline is aborted.
+        """
+        while not self._abort.is_set():
+            try:
+                item = inbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if item is _END:
+                return
+
+            yield item
+
+    def close(self) -> None:
+        """
+        Waits for the stages to finish and raises the first error of the stages.
+        """
+        self._join()
+
+        if self._errors:
+            raise self._errors[0]
+
+    def _join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _start(self, run: Callable[[], None], outbox: queue.Queue | None) -> None:
+        def target() -> None:
+            try:
+                run()
+            except BaseException as e:
+                logger.exception("Pipeline stage failed")
+                self._errors.append(e)
+                self._abort.set()
+            finally:
+                if outbox is not None:
+                    self.end(outbox)
+
+                connections.close_all()
+
+        thread = threading.Thread(target=target, daemon=True)
+        self._threads.append(thread)
+        thread.start()
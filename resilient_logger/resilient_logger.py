@@ -1,9 +1,17 @@
+import inspect
 import logging
+import threading
+import time
 from collections.abc import Iterator
-from typing import TypeVar, cast
+from functools import partial
+from typing import Any, TypeVar, cast
 
 from django.db import transaction
 
+from resilient_logger.circuit_breaker import CircuitBreaker
+from resilient_logger.pipeline import Pipeline
+from resilient_logger.retry_policy import RetryPolicy
+from resilient_logger.scheduler import SourceScheduler
 from resilient_logger.sources import AbstractLogSource
 from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
 from resilient_logger.targets import AbstractLogTarget
@@ -14,6 +22,14 @@ logger = logging.getLogger(__name__)
 TResilientLogger = TypeVar("TResilientLogger", bound="ResilientLogger")
 
 
+class TargetUnavailable(str):
+    """
+    Error of an entry that was not submitted because the log target was
+    unavailable, i.e. the target threw, failed the whole request or its circuit
+    was open. Unlike rejections, these do not count as failed attempts.
+    """
+
+
 class ResilientLogger:
     def __init__(
         self,
@@ -21,26 +37,68 @@ class ResilientLogger:
         chunk_size: int,
         log_sources: list[AbstractLogSource],
         log_targets: list[AbstractLogTarget],
+        commit_per_chunk: bool = False,
+        claim_entries: bool = False,
+        circuit_breaker: dict[str, Any] | None = None,
+        retry: dict[str, Any] | None = None,
+        pipeline_queue_depth: int = 0,
+        source_weights: list[int] | None = None,
+        source_limits: list[int | None] | None = None,
+        concurrent_fetch: bool = False,
     ) -> None:
         self._batch_limit = batch_limit
         self._chunk_size = chunk_size
+        self._commit_per_chunk = commit_per_chunk or claim_entries
+        self._claim_entries = claim_entries
         self._log_sources = log_sources
         self._log_targets = log_targets
+        self._pipeline_queue_depth = pipeline_queue_depth
+        self._source_weights = source_weights or [1] * len(log_sources)
+        self._source_limits = source_limits or [None] * len(log_sources)
+        self._concurrent_fetch = concurrent_fetch
+        self._stop_event = threading.Event()
+        self._retry_policy = RetryPolicy(**(retry or {}))
+        self._circuit_breakers = [
+            CircuitBreaker(**(circuit_breaker or {})) for _ in log_targets
+        ]
+        if claim_entries and pipeline_queue_depth > 0:
+            raise ValueError(
+                "claim_entries can't be combined with pipeline_queue_depth, "
+                "the pipeline stages commit on their own"
+            )
+
+        # Validates the weights and the limits of the sources
+        self._create_scheduler()
 
     @classmethod
-    def create(cls: type[TResilientLogger]) -> TResilientLogger:
-        settings = get_resilient_logger_config()
+    def create(cls: type[TResilientLogger], **overrides: Any) -> TResilientLogger:
+        """
+        Creates the logger from the RESILIENT_LOGGER settings. The given keyword
+        arguments override the corresponding configuration keys.
+        """
+        settings = {**get_resilient_logger_config(), **overrides}
         batch_limit = settings.get("batch_limit", 5000)
         chunk_size = settings.get("chunk_size", 500)
+        commit_per_chunk = settings.get("commit_per_chunk", False)
+        claim_entries = settings.get("claim_entries", False)
+        circuit_breaker = settings.get("circuit_breaker", {})
+        retry = settings.get("retry", {})
+        pipeline_queue_depth = settings.get("pipeline_queue_depth", 0)
+        concurrent_fetch = settings.get("concurrent_fetch", False)
         sources = settings.get("sources", []).copy()
         targets = settings.get("targets", []).copy()
 
         list_sources: list[AbstractLogSource] = []
         list_targets: list[AbstractLogTarget] = []
+        source_weights: list[int] = []
+        source_limits: list[int | None] = []
 
         for source in sources:
             source_args = source.copy()
             source_class_name = source_args.pop("class", None)
+            # Scheduling options, not passed to the source
+            source_weights.append(source_args.pop("weight", 1))
+            source_limits.append(source_args.pop("limit", None))
             source_class = dynamic_class(
                 cast(type[AbstractLogSource], AbstractLogSource), source_class_name
             )
@@ -59,56 +117,477 @@ class ResilientLogger:
             chunk_size=chunk_size,
             log_sources=list_sources,
             log_targets=list_targets,
+            commit_per_chunk=commit_per_chunk,
+            claim_entries=claim_entries,
+            circuit_breaker=circuit_breaker,
+            retry=retry,
+            pipeline_queue_depth=pipeline_queue_depth,
+            source_weights=source_weights,
+            source_limits=source_limits,
+            concurrent_fetch=concurrent_fetch,
         )
 
-    @transaction.atomic
+    @property
+    def batch_limit(self) -> int:
+        return self._batch_limit
+
+    def stop(self) -> None:
+        """
+        Requests the logger to stop submitting. The chunk being submitted is
+        finished, but no further chunks are fetched.
+        """
+        self._stop_event.set()
+
+    def is_stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def get_circuit_breaker_states(self) -> list[dict[str, Any]]:
+        """
+        Returns the circuit breaker state of each log target.
+        """
+        return [
+            {"target": type(log_target).__name__, **circuit_breaker.as_dict()}
+            for log_target, circuit_breaker in zip(
+                self._log_targets, self._circuit_breakers
+            )
+        ]
+
     def submit_unsent_entries(self) -> dict[str, bool]:
+        """
+        Submits the unsent entries to the log targets. By default the whole run is
+        done in a single transaction, with commit_per_chunk each chunk is fetched,
+        submitted and acknowledged in its own transaction instead.
+
+        With claim_entries each chunk is also locked while it is being submitted,
+        so that concurrent runs skip it instead of submitting it again.
+
+        With a positive pipeline_queue_depth, fetching, preparing, submitting and
+        acknowledging the chunks run concurrently instead, see _submit_pipelined.
+
+        The chunks of the sources are interleaved by their weights, see
+        SourceScheduler.
+        """
+        if self._pipeline_queue_depth > 0:
+            return self._submit_pipelined()
+
+        if self._commit_per_chunk:
+            return self._submit_in_chunk_transactions()
+
+        return self._submit_in_single_transaction()
+
+    @transaction.atomic
+    def _submit_in_single_transaction(self) -> dict[str, bool]:
         results: dict[str, bool] = {}
 
-        for count, entry in enumerate(self._get_unsent_entries()):
-            if count >= self._batch_limit:
-                logger.info(f"Job limit of {self._batch_limit} logs reached.")
+        if not self._should_continue():
+            return results
+
+        if len(self._log_sources) == 1:
+            # A single source is iterated with a cursor, nothing to interleave
+            chunks = self._get_unsent_chunks()
+        else:
+            chunks = self._fetch_unsent_chunks()
+
+        for log_source, chunk in chunks:
+            results.update(self._process_chunk(log_source, chunk))
+
+            if not self._should_continue():
                 break
 
-            entry_id = str(entry.get_id())
-            result = self._submit(entry)
-            results[entry_id] = result
+        return results
+
+    def _submit_in_chunk_transactions(self) -> dict[str, bool]:
+        results: dict[str, bool] = {}
+        scheduler = self._create_scheduler()
+
+        while self._should_continue() and (scheduled := scheduler.next()):
+            index, chunk_size, after = scheduled
+            log_source = self._log_sources[index]
+
+            with transaction.atomic():
+                chunk = log_source.get_unsent_chunk(
+                    chunk_size, after, claim=self._claim_entries
+                )
+                results.update(self._process_chunk(log_source, chunk))
 
-            if result:
-                entry.mark_sent()
+            scheduler.record(index, chunk, exhausted=len(chunk) < chunk_size)
+
+        if scheduler.is_batch_limit_reached:
+            logger.info(f"Job limit of {self._batch_limit} logs reached.")
 
         return results
 
-    @transaction.atomic
-    def clear_sent_entries(self, days_to_keep: int = 30) -> list[str]:
+    def _submit_pipelined(self) -> dict[str, bool]:
+        """
+        Submits the entries with a pipeline of four stages connected by queues of
+        pipeline_queue_depth chunks: the next chunks are fetched from the sources
+        and prepared for the targets in the background while the current chunk is
+        being submitted, and the results are acknowledged in the background too.
+
+        Every stage uses its own database connection and commits on its own, so
+        entries cannot be claimed in this mode. When stopped, the chunks already
+        fetched are still submitted. When the circuit of a required target opens,
+        the chunks already fetched are left unsent for the next run instead.
+
+        With concurrent_fetch every source is fetched in a stage of its own.
+        """
+        results: dict[str, bool] = {}
+
+        with Pipeline(self._pipeline_queue_depth) as pipeline:
+            if self._concurrent_fetch:
+                fetched = pipeline.produce(
+                    lambda: self._fetch_unsent_chunks_concurrently(pipeline)
+                )
+            else:
+                fetched = pipeline.produce(self._fetch_unsent_chunks)
+
+            prepared = pipeline.map(fetched, self._prepare_chunk)
+            submitted = pipeline.create_queue()
+            pipeline.consume(submitted, self._acknowledge_chunk)
+
+            for log_source, chunk, payloads in pipeline.iterate(prepared):
+                if self._is_required_circuit_open():
+                    continue
+
+                errors = self._submit_chunk(chunk, payloads)
+                pipeline.put(submitted, (log_source, chunk, errors))
+
+                for entry, error in zip(chunk, errors):
+                    results[str(entry.get_id())] = error is None
+
+            pipeline.end(submitted)
+
+        return results
+
+    def _create_scheduler(self) -> SourceScheduler:
+        return SourceScheduler(
+            self._chunk_size,
+            self._batch_limit,
+            self._source_weights,
+            self._source_limits,
+        )
+
+    def _fetch_unsent_chunks(
+        self,
+    ) -> Iterator[tuple[AbstractLogSource, list[AbstractLogSourceEntry]]]:
+        """
+        Fetches the chunks of the sources in the order of the scheduler.
+        """
+        scheduler = self._create_scheduler()
+
+        while self._should_continue() and (scheduled := scheduler.next()):
+            index, chunk_size, after = scheduled
+            log_source = self._log_sources[index]
+            chunk = log_source.get_unsent_chunk(chunk_size, after)
+            scheduler.record(index, chunk, exhausted=len(chunk) < chunk_size)
+
+            if chunk:
+                yield log_source, chunk
+
+        if scheduler.is_batch_limit_reached:
+            logger.info(f"Job limit of {self._batch_limit} logs reached.")
+
+    def _fetch_unsent_chunks_concurrently(
+        self, pipeline: Pipeline
+    ) -> Iterator[tuple[AbstractLogSource, list[AbstractLogSourceEntry]]]:
+        """
+        Fetches every source in a pipeline stage of its own and yields their
+        chunks in the order of the scheduler. The stages fetch ahead at most
+        pipeline_queue_depth chunks, which are left unsent if the run ends first.
+        """
+        scheduler = self._create_scheduler()
+        stop = threading.Event()
+        inboxes = [
+            pipeline.produce(partial(self._fetch_source_chunks, index, stop))
+            for index in range(len(self._log_sources))
+        ]
+
+        # The inboxes whose end has been taken already, iterating them blocks
+        ended: set[int] = set()
+
+        try:
+            while self._should_continue() and (scheduled := scheduler.next()):
+                index, chunk_size, _ = scheduled
+                chunk = next(pipeline.iterate(inboxes[index]), None)
+
+                if chunk is None:
+                    ended.add(index)
+                    scheduler.record(index, [], exhausted=True)
+                    continue
+
+                # The stage does not know how much of the batch_limit is left
+                chunk = chunk[:chunk_size]
+                scheduler.record(index, chunk, exhausted=False)
+                yield self._log_sources[index], chunk
+        finally:
+            stop.set()
+
+            # Unblocks the stages waiting for room in their queues
+            for index, inbox in enumerate(inboxes):
+                if index not in ended:
+                    for _ in pipeline.iterate(inbox):
+                        pass
+
+        if scheduler.is_batch_limit_reached:
+            logger.info(f"Job limit of {self._batch_limit} logs reached.")
+
+    def _fetch_source_chunks(
+        self, index: int, stop: threading.Event
+    ) -> Iterator[list[AbstractLogSourceEntry]]:
+        log_source = self._log_sources[index]
+        limit = self._source_limits[index]
+        remaining = (
+            self._batch_limit if limit is None else min(self._batch_limit, limit)
+        )
+        after: AbstractLogSourceEntry | None = None
+
+        while remaining > 0 and not stop.is_set():
+            chunk_size = min(self._chunk_size, remaining)
+            chunk = log_source.get_unsent_chunk(chunk_size, after)
+            remaining -= len(chunk)
+
+            if chunk:
+                yield chunk
+
+            if len(chunk) < chunk_size:
+                return
+
+            after = chunk[-1]
+
+    def _prepare_chunk(
+        self, item: tuple[AbstractLogSource, list[AbstractLogSourceEntry]]
+    ) -> tuple[AbstractLogSource, list[AbstractLogSourceEntry], list[Any]]:
+        log_source, chunk = item
+        payloads = [log_target.prepare_batch(chunk) for log_target in self._log_targets]
+
+        return log_source, chunk, payloads
+
+    def _acknowledge_chunk(
+        self,
+        item: tuple[AbstractLogSource, list[AbstractLogSourceEntry], list[str | None]],
+    ) -> None:
+        log_source, chunk, errors = item
+
+        with transaction.atomic():
+            self._acknowledge(log_source, chunk, errors)
+
+    def clear_sent_entries(
+        self, days_to_keep: int = 30, max_seconds: float | None = None
+    ) -> int:
         """
         Clears all the old entries that are older than days_to_keep days
-        and returns the list of the cleared object ids.
+        and returns the number of the cleared entries. The sources share the
+        max_seconds budget, the entries left over are cleared on the next run.
+
+        No transaction is opened here, the sources commit every chunk on its own
+        so that the locks are released as the run goes.
         """
-        deleted_ids: list[str] = []
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        deleted = 0
 
         for log_source in self._log_sources:
-            deleted_ids += log_source.clear_sent_entries(days_to_keep)
+            remaining = None if deadline is None else deadline - time.monotonic()
 
-        return deleted_ids
+            if remaining is not None and remaining <= 0:
+                break
 
-    def _submit(self, source: AbstractLogSourceEntry) -> bool:
-        for log_target in self._log_targets:
-            submitted = False
+            deleted += self._clear_source(log_source, days_to_keep, remaining)
 
-            try:
-                submitted = log_target.submit(source)
-            except Exception:
-                logger.exception("Log target threw while submitting")
+        return deleted
 
-            if not submitted and log_target.is_required():
-                return False
+    def _clear_source(
+        self,
+        log_source: AbstractLogSource,
+        days_to_keep: int,
+        max_seconds: float | None,
+    ) -> int:
+        clear = log_source.clear_sent_entries
 
-        return True
+        try:
+            inspect.signature(clear).bind(days_to_keep, self._chunk_size, max_seconds)
+        except TypeError:
+            # Sources written against the old clear_sent_entries(days_to_keep)
+            # signature, which returned the ids of the cleared entries
+            cleared: Any = clear(days_to_keep)
+        else:
+            cleared = clear(days_to_keep, self._chunk_size, max_seconds)
 
-    def _get_unsent_entries(self) -> Iterator[AbstractLogSourceEntry]:
+        return cleared if isinstance(cleared, int) else len(cleared)
+
+    def requeue_parked_entries(self) -> int:
         """
-        Queries and returns iterator for all unsent log entries.
+        Requeues the entries parked after exceeding the maximum attempts of the
+        retry policy and returns the number of the requeued entries.
         """
-        for log_source in self._log_sources:
-            yield from log_source.get_unsent_entries(self._chunk_size)
+        return sum(
+            log_source.requeue_parked_entries() for log_source in self._log_sources
+        )
+
+    def explain_queries(
+        self, days_to_keep: int = 30, **options: Any
+    ) -> dict[str, dict[str, str]]:
+        """
+        Returns the query plans of the fetch and clear queries of each source,
+        keyed by the source class name. The options are passed to
+        QuerySet.explain().
+        """
+        return {
+            log_source.__class__.__name__: log_source.explain_queries(
+                self._chunk_size, days_to_keep, **options
+            )
+            for log_source in self._log_sources
+        }
+
+    def _process_chunk(
+        self, log_source: AbstractLogSource, chunk: list[AbstractLogSourceEntry]
+    ) -> dict[str, bool]:
+        """
+        Submits the chunk, acknowledges the successfully submitted entries and
+        schedules the failed entries to be retried later.
+        """
+        if not chunk:
+            return {}
+
+        errors = self._submit_chunk(chunk)
+        self._acknowledge(log_source, chunk, errors)
+
+        return {
+            str(entry.get_id()): error is None for entry, error in zip(chunk, errors)
+        }
+
+    def _acknowledge(
+        self,
+        log_source: AbstractLogSource,
+        chunk: list[AbstractLogSourceEntry],
+        errors: list[str | None],
+    ) -> None:
+        """
+        Marks the submitted entries as sent and schedules the entries rejected by
+        a target to be retried later. Entries that were not submitted because a
+        target was unavailable are left untouched to be retried on the next run,
+        so an outage of the target does not use up their attempts.
+        """
+        sent_ids: list[str | int] = []
+        failed: dict[str | int, str] = {}
+
+        for entry, error in zip(chunk, errors):
+            if error is None:
+                sent_ids.append(entry.get_id())
+            elif not isinstance(error, TargetUnavailable):
+                failed[entry.get_id()] = error
+
+        if sent_ids:
+            log_source.mark_sent_many(sent_ids)
+
+        if failed:
+            log_source.mark_failed_many(failed, self._retry_policy)
+
+    def _submit_chunk(
+        self,
+        entries: list[AbstractLogSourceEntry],
+        payloads: list[Any] | None = None,
+    ) -> list[str | None]:
+        """
+        Submits the chunk to every log target and returns None for each submitted
+        entry and the error message for each failed one. Entries rejected by a
+        required target are not passed to the later targets. The error of entries
+        that were not submitted because the target was unavailable is a
+        TargetUnavailable.
+
+        If payloads prepared by the targets are given, they are submitted as long
+        as no entry of the chunk has been rejected.
+        """
+        errors: list[str | None] = [None] * len(entries)
+        pending = list(range(len(entries)))
+
+        for index, (log_target, circuit_breaker) in enumerate(
+            zip(self._log_targets, self._circuit_breakers)
+        ):
+            if not pending:
+                break
+
+            target_name = type(log_target).__name__
+            batch = [entries[index] for index in pending]
+            submitted: list[bool | None] = [None] * len(batch)
+            unavailable = TargetUnavailable(f"{target_name} is unavailable")
+
+            if circuit_breaker.allow_request():
+                try:
+                    if payloads is not None and len(batch) == len(entries):
+                        submitted = log_target.submit_prepared(payloads[index])
+                    else:
+                        submitted = log_target.submit_batch(batch)
+                except Exception as e:
+                    logger.exception("Log target threw while submitting")
+                    unavailable = TargetUnavailable(f"{target_name} threw {e!r}")
+
+                # Rejections are answers of an available target, only the
+                # entries not answered at all count against the circuit
+                if any(ok is not None for ok in submitted):
+                    circuit_breaker.record_success()
+                else:
+                    circuit_breaker.record_failure()
+            else:
+                unavailable = TargetUnavailable(f"Circuit of {target_name} is open")
+
+            if log_target.is_required():
+                for index, ok in zip(pending, submitted):
+                    if ok is False:
+                        errors[index] = f"Rejected by {target_name}"
+                    elif ok is None:
+                        errors[index] = unavailable
+
+                pending = [index for index, ok in zip(pending, submitted) if ok]
+
+        return errors
+
+    def _should_continue(self) -> bool:
+        """
+        Returns whether the next chunk should be submitted. Submitting is stopped
+        when requested or when the circuit of a required log target is open.
+        """
+        return not self.is_stopped() and not self._is_required_circuit_open()
+
+    def _is_required_circuit_open(self) -> bool:
+        for log_target, circuit_breaker in zip(
+            self._log_targets, self._circuit_breakers
+        ):
+            if log_target.is_required() and not circuit_breaker.allow_request():
+                logger.warning(
+                    f"Circuit of the required log target "
+                    f"{type(log_target).__name__} is open, skipping the rest."
+                )
+                return True
+
+        return False
+
+    def _get_unsent_chunks(
+        self,
+    ) -> Iterator[tuple[AbstractLogSource, list[AbstractLogSourceEntry]]]:
+        """
+        Groups the unsent log entries of the only source into chunks of
+        chunk_size entries, stopping once the batch_limit or the limit of the
+        source is reached.
+        """
+        [log_source] = self._log_sources
+        [limit] = self._source_limits
+        batch_limit = (
+            self._batch_limit if limit is None else min(self._batch_limit, limit)
+        )
+        chunk: list[AbstractLogSourceEntry] = []
+        count = 0
+
+        for entry in log_source.get_unsent_entries(self._chunk_size):
+            if count >= batch_limit:
+                logger.info(f"Job limit of {batch_limit} logs reached.")
+                break
+
+            count += 1
+            chunk.append(entry)
+
+            if len(chunk) >= self._chunk_size:
+                yield log_source, chunk
+                chunk = []
+
+        if chunk:
+            yield log_source, chunk
@@ -0,0 +1,44 @@
+import datetime
+import random
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with jitter for the entries that failed to submit.
+
+    The delay after the n:th failed attempt is base_delay * 2 ** (n - 1) seconds,
+    capped to max_delay and randomly shortened by at most the jitter fraction.
+    Entries that have failed max_attempts times are parked and not retried.
+    """
+
+    base_delay: float = 60.0
+    max_delay: float = 24 * 60 * 60.0
+    max_attempts: int = 10
+    jitter: float = 0.5
+
+    def get_delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempts - 1, 0))
+        return delay - random.uniform(0, delay * self.jitter)
+
+    def get_next_attempt_at(
+        self, attempts: int, now: datetime.datetime
+    ) -> datetime.datetime | None:
+        """
+        Returns the time of the next attempt after the given number of failed
+        attempts, or None if the entry should be parked.
+        """
+        if attempts >= self.max_attempts:
+            return None
+
+        return now + datetime.timedelta(seconds=self.get_delay(attempts))
+
+    def record_failure(self, obj: Any, error: str, now: datetime.datetime) -> None:
+        """
+        Updates the attempts, last_error and next_attempt_at of a failed object.
+        """
+        obj.attempts += 1
+        obj.last_error = error
+        obj.next_attempt_at = self.get_next_attempt_at(obj.attempts, now)
@@ -0,0 +1,90 @@
+from collections.abc import Sequence
+from typing import Any
+
+
+class SourceScheduler:
+    """
+    Decides from which log source the next chunk of a run is fetched.
+
+    The chunks are interleaved across the sources with smooth weighted
+    round-robin, so a source with weight 2 gets two chunks for every chunk of a
+    source with weight 1 and a large backlog in one source does not starve the
+    others. A source is skipped once it is exhausted or has reached its limit,
+    and the run ends when every source is done or batch_limit entries have been
+    fetched in total.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        batch_limit: int,
+        weights: Sequence[int],
+        limits: Sequence[int | None],
+    ) -> None:
+        if len(weights) != len(limits):
+            raise ValueError("Every source must have a weight and a limit")
+
+        if any(weight < 1 for weight in weights):
+            raise ValueError("Source weights must be at least 1")
+
+        self._chunk_size = chunk_size
+        self._remaining = batch_limit
+        self._weights = list(weights)
+        self._limits = list(limits)
+        self._fetched = [0] * len(weights)
+        self._current = [0] * len(weights)
+        self._done = [False] * len(weights)
+        self._afters: list[Any] = [None] * len(weights)
+
+    @property
+    def is_batch_limit_reached(self) -> bool:
+        return self._remaining <= 0
+
+    def get_max_size(self, index: int) -> int:
+        """Returns the number of entries the source may still fetch in this run."""
+        limit = self._limits[index]
+
+        if limit is None:
+            return self._remaining
+
+        return min(self._remaining, limit - self._fetched[index])
+
+    def next(self) -> tuple[int, int, Any] | None:
+        """
+        Returns the index of the next source, the size of the chunk to fetch from
+        it and the last entry of its previous chunk, or None when the run is done.
+        """
+        active = [
+            index
+            for index, done in enumerate(self._done)
+            if not done and self.get_max_size(index) > 0
+        ]
+
+        if not active:
+            return None
+
+        total = 0
+
+        for index in active:
+            self._current[index] += self._weights[index]
+            total += self._weights[index]
+
+        index = max(active, key=lambda index: self._current[index])
+        self._current[index] -= total
+        size = min(self._chunk_size, self.get_max_size(index))
+
+        return index, size, self._afters[index]
+
+    def record(self, index: int, chunk: Sequence[Any], exhausted: bool) -> None:
+        """
+        Records the chunk fetched from the source. An exhausted source is not
+        scheduled again.
+        """
+        self._fetched[index] += len(chunk)
+        self._remaining -= len(chunk)
+
+        if chunk:
+            self._afters[index] = chunk[-1]
+
+        if exhausted:
+            self._done[index] = True
@@ -0,0 +1,107 @@
+import json
+import typing
+from functools import cache
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from resilient_logger.utils import (
+    dynamic_class,
+    get_resilient_logger_config,
+    unavailable_class,
+)
+
+
+class JsonSerializer:
+    """
+    Serializes values to JSON with the standard library, encoding datetimes,
+    Decimals, UUIDs etc. with DjangoJSONEncoder.
+
+    Custom serializers are sub-classes of this class.
+    """
+
+    def dumps(
+        self, value: Any, *, sort_keys: bool = False, pretty: bool = False
+    ) -> bytes:
+        """Serialize the value, indented by two spaces if pretty."""
+        return json.dumps(
+            value,
+            sort_keys=sort_keys,
+            indent=2 if pretty else None,
+            cls=DjangoJSONEncoder,
+        ).encode()
+
+    def canonical(self, value: Any) -> bytes:
+        """
+        Serialize the value to the form that is hashed. The output must stay
+        byte-identical across the serializers and versions, otherwise the hashes
+        of the entries already stored in the targets change.
+        """
+        return json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder).encode()
+
+
+if typing.TYPE_CHECKING:
+    import orjson
+else:
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+
+if orjson is not None:
+
+    class OrjsonSerializer(JsonSerializer):
+        """
+        Serializes values to JSON with orjson. Datetimes are passed to
+        DjangoJSONEncoder to encode them the same way as JsonSerializer does.
+
+        The canonical form is inherited as orjson separates the items differently
+        and doesn't escape non-ASCII characters.
+        """
+
+        _encoder = DjangoJSONEncoder()
+
+        def dumps(
+            self, value: Any, *, sort_keys: bool = False, pretty: bool = False
+        ) -> bytes:
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+
+            try:
+                return orjson.dumps(value, default=self._encoder.default, option=option)
+            except orjson.JSONEncodeError:
+                # e.g. integers over 64 bits, which the standard library supports
+                return super().dumps(value, sort_keys=sort_keys, pretty=pretty)
+
+else:
+    OrjsonSerializer = unavailable_class("OrjsonSerializer", ["orjson"])
+
+
+def get_serializer() -> JsonSerializer:
+    """
+    Returns the serializer configured with the `serializer` class path. By
+    default, OrjsonSerializer is used when orjson is installed.
+    """
+    try:
+        class_path = get_resilient_logger_config()["serializer"]
+    except RuntimeError:
+        class_path = None
+
+    return _load_serializer(class_path)
+
+
+@cache
+def _load_serializer(class_path: str | None) -> JsonSerializer:
+    if class_path is not None:
+        return dynamic_class(JsonSerializer, class_path)()
+
+    if orjson is not None:
+        return OrjsonSerializer()
+
+    return JsonSerializer()
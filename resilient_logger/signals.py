@@ -0,0 +1,25 @@
+"""
+Signal handlers that queue new auditlog entries for delivery when
+the DjangoAuditLogSource uses the delivery table.
+"""
+
+from typing import Any
+
+from resilient_logger.models import AuditLogDelivery
+from resilient_logger.sources.django_audit_log_source import DjangoAuditLogSource
+
+
+def queue_audit_log_delivery(
+    sender: type, instance: Any, created: bool, **kwargs: Any
+) -> None:
+    """
+    Adds the created auditlog entry to the delivery table. The row is stored in
+    the same transaction as the log entry, so neither can exist without the other.
+    """
+    if not created or kwargs.get("raw", False):
+        return
+
+    if not DjangoAuditLogSource.is_delivery_table_enabled():
+        return
+
+    AuditLogDelivery.objects.using(kwargs.get("using")).create(log_entry_id=instance.pk)
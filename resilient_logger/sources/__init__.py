@@ -3,6 +3,7 @@ import typing
 from resilient_logger.utils import unavailable_class
 
 from .abstract_log_source import AbstractLogSource as AbstractLogSource
+from .model_log_source import ModelLogSource as ModelLogSource
 from .resilient_log_source import ResilientLogSource as ResilientLogSource
 
 if typing.TYPE_CHECKING:
@@ -1,6 +1,12 @@
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Iterator
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any
 
+from django.db import transaction
+from django.db.models import QuerySet
+
+from resilient_logger.retry_policy import RetryPolicy
 from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
 
 
@@ -18,10 +24,154 @@ class AbstractLogSource(ABC):
         """
         raise NotImplementedError()
 
+    def get_unsent_chunk(
+        self,
+        chunk_size: int,
+        after: AbstractLogSourceEntry | None = None,
+        claim: bool = False,
+    ) -> list[AbstractLogSourceEntry]:
+        """
+        Queries and returns at most chunk_size unsent log entries. If after is given,
+        only the entries ordered after it are returned.
+
+        With claim, the returned entries are locked until the end of the current
+        transaction and entries locked by concurrent workers are skipped.
+
+        By default the chunk is taken from get_unsent_entries, skipping the entries
+        up to after, or from the first entry if after is no longer unsent. Such
+        entries can't be claimed, sources should override this with a query of
+        their own.
+        """
+        after_id = None if after is None else after.get_id()
+        first: list[AbstractLogSourceEntry] = []
+        chunk: list[AbstractLogSourceEntry] = []
+        found = after is None
+
+        for entry in self.get_unsent_entries(chunk_size):
+            if found:
+                chunk.append(entry)
+
+                if len(chunk) >= chunk_size:
+                    break
+            elif entry.get_id() == after_id:
+                found = True
+            elif len(first) < chunk_size:
+                first.append(entry)
+
+        return chunk if found else first
+
+    def _iterate_unsent_chunks(
+        self, chunk_size: int
+    ) -> Iterator["AbstractLogSourceEntry"]:
+        """
+        Iterates the unsent entries by fetching one chunk at a time with keyset
+        pagination, so at most one chunk is held in memory and no server-side
+        cursor is needed.
+        """
+        after: AbstractLogSourceEntry | None = None
+
+        while True:
+            chunk = self.get_unsent_chunk(chunk_size, after)
+            yield from chunk
+
+            if len(chunk) < chunk_size:
+                return
+
+            after = chunk[-1]
+
+    def mark_sent_many(self, ids: Sequence[str | int]) -> None:
+        """
+        Marks the entries with the given ids as sent in the persistent store.
+
+        By default the entries are looked up from the unsent entries and marked
+        one by one with mark_sent. Sources should override this with a single
+        update of the store.
+        """
+        pending = {str(id) for id in ids}
+        entries: list[AbstractLogSourceEntry] = []
+
+        if not pending:
+            return
+
+        for entry in self.get_unsent_entries(len(pending)):
+            if str(entry.get_id()) in pending:
+                pending.discard(str(entry.get_id()))
+                entries.append(entry)
+
+                if not pending:
+                    break
+
+        for entry in entries:
+            entry.mark_sent()
+
+    def mark_failed_many(
+        self, errors: Mapping[str | int, str], retry_policy: RetryPolicy
+    ) -> None:
+        """
+        Records a failed attempt for the entries, errors maps the entry ids to the
+        error messages. The retry_policy decides when the entries are returned as
+        unsent again. Sources without retry bookkeeping ignore this.
+        """
+        return None
+
+    def requeue_parked_entries(self) -> int:
+        """
+        Returns the entries parked after exceeding the maximum attempts to the
+        unsent entries with their attempts reset, and returns their number.
+        Sources without retry bookkeeping have nothing to requeue.
+        """
+        return 0
+
     @abstractmethod
-    def clear_sent_entries(self, days_to_keep: int = 30) -> list[str]:
+    def clear_sent_entries(
+        self,
+        days_to_keep: int = 30,
+        chunk_size: int = 1000,
+        max_seconds: float | None = None,
+    ) -> int:
         """
         Clears the old entries that are older than days_to_keep days
-        and returns the list of the cleared object ids.
+        and returns the number of the cleared entries.
+
+        The entries are deleted in id ranges of at most chunk_size entries, each
+        in its own transaction. If max_seconds is given, no new chunk is started
+        after that and the rest is left for the next run.
         """
         raise NotImplementedError()
+
+    def explain_queries(
+        self, chunk_size: int, days_to_keep: int = 30, **options: Any
+    ) -> dict[str, str]:
+        """
+        Returns the query plans of the fetch and clear queries by name. The
+        options are passed to QuerySet.explain(). Sources that do not query a
+        database return nothing.
+        """
+        return {}
+
+    def _delete_in_chunks(
+        self, entries: QuerySet, chunk_size: int, max_seconds: float | None
+    ) -> int:
+        """
+        Deletes the entries of the queryset in ascending primary key ranges, so every
+        transaction locks at most chunk_size rows.
+        """
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        entries = entries.order_by("pk")
+        deleted = 0
+        last_id = None
+
+        while deadline is None or time.monotonic() < deadline:
+            with transaction.atomic(using=entries.db):
+                chunk = entries if last_id is None else entries.filter(pk__gt=last_id)
+                ids = list(chunk.values_list("pk", flat=True)[:chunk_size])
+
+                if not ids:
+                    break
+
+                entries.filter(pk__gte=ids[0], pk__lte=ids[-1]).delete()
+
+            deleted += len(ids)
+            last_id = ids[-1]
+
+        return deleted
@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import TypedDict
 
+from resilient_logger.serializers import get_serializer
+from resilient_logger.utils import content_hash, freeze
+
 
 class AuditLogEvent(TypedDict):
     actor: dict
@@ -25,7 +28,15 @@ AuditLogDocument = TypedDict(
 
 
 class AbstractLogSourceEntry(ABC):
-    """Represents a single log entry contract."""
+    """
+    Represents a single log entry contract.
+
+    The document is built once per entry and shared by all targets through
+    get_shared_document() and get_serialized_document(). Targets that need to
+    change it work on a copy-on-write view, e.g. collections.ChainMap({}, document).
+    """
+
+    __slots__ = ()
 
     @abstractmethod
     def get_id(self) -> str | int:
@@ -37,6 +48,36 @@ class AbstractLogSourceEntry(ABC):
         """Serialize the entry into a document format."""
         raise NotImplementedError()
 
+    def get_shared_document(self) -> AuditLogDocument:
+        """
+        Retrieve the document built on the first call. It is read-only as the
+        same document is passed to every target.
+        """
+        document = getattr(self, "_shared_document", None)
+
+        if document is None:
+            document = freeze(self.get_document())
+            self._shared_document = document
+
+        return document
+
+    def get_serialized_document(self) -> bytes:
+        """Retrieve the shared document serialized to JSON once."""
+        serialized = getattr(self, "_serialized_document", None)
+
+        if serialized is None:
+            serialized = get_serializer().dumps(self.get_shared_document())
+            self._serialized_document = serialized
+
+        return serialized
+
+    def get_idempotency_key(self) -> str:
+        """
+        Retrieve the key that identifies the entry in the targets. It must stay
+        the same when the entry is submitted again.
+        """
+        return content_hash(self.get_shared_document())
+
     @abstractmethod
     def is_sent(self) -> bool:
         """Check if the entry has already been processed."""
@@ -1,46 +1,266 @@
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from datetime import timedelta
+from itertools import islice
+from typing import Any, TypeVar, cast
 
 from auditlog.models import LogEntry
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 
+from resilient_logger.models import AuditLogDelivery
+from resilient_logger.retry_policy import RetryPolicy
 from resilient_logger.sources import AbstractLogSource
+from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
 from resilient_logger.sources.django_audit_log_source_entry import (
+    DeliveryTrackedAuditLogSourceEntry,
     DjangoAuditLogSourceEntry,
 )
+from resilient_logger.utils import dynamic_class, get_resilient_logger_config
+
+TAuditLogSourceEntry = TypeVar("TAuditLogSourceEntry", bound=DjangoAuditLogSourceEntry)
+
+TRACKING_ADDITIONAL_DATA = "additional_data"
+TRACKING_DELIVERY_TABLE = "delivery_table"
+
+
+def _unsent_q() -> Q:
+    """
+    Matches the log entries not marked as sent in their additional_data. The
+    entries stored before the flag was introduced have no is_sent key.
+    """
+    return ~Q(additional_data__has_key="is_sent") | Q(additional_data__is_sent=False)
+
+
+def _sent_q() -> Q:
+    """
+    Matches the log entries to clear when the sent state is stored in their
+    additional_data, including the entries without the is_sent key.
+    """
+    return ~Q(additional_data__has_key="is_sent") | Q(additional_data__is_sent=True)
 
 
 class DjangoAuditLogSource(AbstractLogSource):
+    """
+    Log source for the entries stored by django-auditlog.
+
+    With keyset_pagination the unsent entries are fetched in chunks ordered by
+    (timestamp, id) instead of iterating them with a database cursor.
+
+    The tracking defines how the sent state is stored:
+    - "additional_data" (default) stores is_sent flag in the additional_data
+      of the log entries, which requires scanning the whole auditlog table.
+    - "delivery_table" stores the pending entries in the AuditLogDelivery table,
+      which only holds the entries that are not sent yet. The unsent entries are
+      found with an index scan, the log entries are not modified and the failed
+      entries are retried with backoff. Entries created before enabling it must
+      be queued once with the enqueue_unsent_audit_log_entries command.
+    """
+
+    def __init__(
+        self,
+        keyset_pagination: bool = False,
+        tracking: str = TRACKING_ADDITIONAL_DATA,
+    ) -> None:
+        if tracking not in (TRACKING_ADDITIONAL_DATA, TRACKING_DELIVERY_TABLE):
+            raise ValueError(f"Unknown DjangoAuditLogSource tracking '{tracking}'")
+
+        self._keyset_pagination = keyset_pagination
+        self._tracking = tracking
+        # The actor dicts by actor id, memoised for the duration of a run
+        self._actors: dict[int, dict] = {}
+
+    @classmethod
+    def is_delivery_table_enabled(cls) -> bool:
+        """
+        Checks whether any configured DjangoAuditLogSource uses the delivery table.
+        """
+        try:
+            sources = get_resilient_logger_config()["sources"]
+        except RuntimeError:
+            return False
+
+        return any(
+            issubclass(dynamic_class(AbstractLogSource, source["class"]), cls)
+            and source.get("tracking") == TRACKING_DELIVERY_TABLE
+            for source in sources
+        )
+
     @transaction.atomic
     def get_unsent_entries(
         self, chunk_size: int
     ) -> Iterator["DjangoAuditLogSourceEntry"]:
-        entries = (
-            LogEntry.objects.select_related("actor")
-            .filter(
-                (
-                    ~Q(additional_data__has_key="is_sent")  # support old entries
-                    | Q(additional_data__is_sent=False)
-                ),
-            )
-            .order_by("timestamp")
+        if self._keyset_pagination or self._tracking == TRACKING_DELIVERY_TABLE:
+            yield from self._iterate_unsent_chunks(chunk_size)
+            return
+
+        self._actors.clear()
+        logs = (
+            LogEntry.objects.filter(_unsent_q())
+            .order_by("timestamp", "id")
             .iterator(chunk_size=chunk_size)
         )
 
+        while chunk := list(islice(logs, chunk_size)):
+            yield from self._to_entries(DjangoAuditLogSourceEntry, chunk)
+
+    def _to_entries(
+        self, entry_class: type[TAuditLogSourceEntry], logs: Iterable[LogEntry]
+    ) -> list[TAuditLogSourceEntry]:
+        """
+        Wraps the log entries and resolves their actors and operations at once.
+        The actors are fetched in one query per chunk instead of joining the
+        whole user row to every log entry.
+        """
+        entries = [entry_class(log) for log in logs]
+        entry_class.prepare_chunk(entries, self._actors)
+
+        return entries
+
+    def get_unsent_chunk(
+        self,
+        chunk_size: int,
+        after: AbstractLogSourceEntry | None = None,
+        claim: bool = False,
+    ) -> list["DjangoAuditLogSourceEntry"]:
+        if after is None:
+            # A new run, the actors may have changed since the previous one
+            self._actors.clear()
+
+        if self._tracking == TRACKING_DELIVERY_TABLE:
+            return self._get_unsent_delivery_chunk(chunk_size, after, claim)
+
+        entries = LogEntry.objects.filter(_unsent_q())
+
+        if after is not None:
+            log = cast(DjangoAuditLogSourceEntry, after).log
+            # (timestamp, id) > (log.timestamp, log.id) with an index range bound
+            entries = entries.filter(
+                Q(timestamp__gt=log.timestamp) | Q(id__gt=log.id),
+                timestamp__gte=log.timestamp,
+            )
+
+        if claim:
+            entries = entries.select_for_update(skip_locked=True)
+
+        return self._to_entries(
+            DjangoAuditLogSourceEntry, entries.order_by("timestamp", "id")[:chunk_size]
+        )
+
+    def _get_unsent_delivery_chunk(
+        self,
+        chunk_size: int,
+        after: AbstractLogSourceEntry | None,
+        claim: bool,
+    ) -> list["DjangoAuditLogSourceEntry"]:
+        deliveries = AuditLogDelivery.objects.filter(
+            next_attempt_at__lte=timezone.now()
+        )
+
+        if after is not None:
+            deliveries = deliveries.filter(log_entry_id__gt=after.get_id())
+
+        if claim:
+            deliveries = deliveries.select_for_update(skip_locked=True)
+
+        ids = list(
+            deliveries.order_by("log_entry_id").values_list("log_entry_id", flat=True)[
+                :chunk_size
+            ]
+        )
+        entries = self._to_entries(
+            DeliveryTrackedAuditLogSourceEntry,
+            LogEntry.objects.filter(id__in=ids).order_by("id"),
+        )
+
+        if len(entries) < len(ids):
+            # The log entries have been removed by other means
+            found_ids = {entry.get_id() for entry in entries}
+            AuditLogDelivery.objects.filter(
+                log_entry_id__in=[id for id in ids if id not in found_ids]
+            ).delete()
+
+        return entries
+
+    def mark_sent_many(self, ids: Sequence[str | int]) -> None:
+        if self._tracking == TRACKING_DELIVERY_TABLE:
+            AuditLogDelivery.objects.filter(log_entry_id__in=ids).delete()
+            return
+
+        entries = list(
+            LogEntry.objects.filter(id__in=ids).only("id", "additional_data")
+        )
+
         for entry in entries:
-            yield DjangoAuditLogSourceEntry(entry)
+            entry.additional_data = {**(entry.additional_data or {}), "is_sent": True}
 
-    @transaction.atomic
-    def clear_sent_entries(self, days_to_keep: int = 30) -> list[str]:
-        entries = LogEntry.objects.filter(
-            ~Q(additional_data__has_key="is_sent")  # support old entries
-            | Q(additional_data__is_sent=True),
-            timestamp__lte=(timezone.now() - timedelta(days=days_to_keep)),
-        ).select_for_update()
+        LogEntry.objects.bulk_update(entries, ["additional_data"])
+
+    def mark_failed_many(
+        self, errors: Mapping[str | int, str], retry_policy: RetryPolicy
+    ) -> None:
+        if self._tracking != TRACKING_DELIVERY_TABLE:
+            return
+
+        now = timezone.now()
+        deliveries = list(
+            AuditLogDelivery.objects.filter(log_entry_id__in=list(errors)).only(
+                "id", "log_entry_id", "attempts"
+            )
+        )
+
+        for delivery in deliveries:
+            error = errors.get(
+                delivery.log_entry_id, errors.get(str(delivery.log_entry_id), "")
+            )
+            retry_policy.record_failure(delivery, error, now)
+
+        AuditLogDelivery.objects.bulk_update(
+            deliveries, ["attempts", "last_error", "next_attempt_at"]
+        )
+
+    def requeue_parked_entries(self) -> int:
+        if self._tracking != TRACKING_DELIVERY_TABLE:
+            return 0
+
+        return AuditLogDelivery.objects.filter(next_attempt_at__isnull=True).update(
+            attempts=0, next_attempt_at=timezone.now()
+        )
+
+    def clear_sent_entries(
+        self,
+        days_to_keep: int = 30,
+        chunk_size: int = 1000,
+        max_seconds: float | None = None,
+    ) -> int:
+        return self._delete_in_chunks(
+            self._get_sent_queryset(days_to_keep), chunk_size, max_seconds
+        )
+
+    def explain_queries(
+        self, chunk_size: int, days_to_keep: int = 30, **options: Any
+    ) -> dict[str, str]:
+        if self._tracking == TRACKING_DELIVERY_TABLE:
+            fetch = AuditLogDelivery.objects.filter(
+                next_attempt_at__lte=timezone.now()
+            ).order_by("log_entry_id")
+        else:
+            fetch = LogEntry.objects.filter(_unsent_q()).order_by("timestamp", "id")
 
-        deleted_ids = list(entries.values_list("id", flat=True))
-        entries.delete()
+        return {
+            "fetch": fetch[:chunk_size].explain(**options),
+            "clear": self._get_sent_queryset(days_to_keep)
+            .order_by("id")
+            .values("id")[:chunk_size]
+            .explain(**options),
+        }
+
+    def _get_sent_queryset(self, days_to_keep: int) -> QuerySet[LogEntry]:
+        cutoff = timezone.now() - timedelta(days=days_to_keep)
+
+        if self._tracking == TRACKING_DELIVERY_TABLE:
+            return LogEntry.objects.filter(timestamp__lte=cutoff).exclude(
+                id__in=AuditLogDelivery.objects.values("log_entry_id")
+            )
 
-        return [str(deleted_id) for deleted_id in deleted_ids]
+        return LogEntry.objects.filter(_sent_q(), timestamp__lte=cutoff)
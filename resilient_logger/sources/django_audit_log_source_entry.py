@@ -1,6 +1,10 @@
+from collections.abc import Iterable
+
 from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 
+from resilient_logger.models import AuditLogDelivery
 from resilient_logger.sources.abstract_log_source_entry import (
     AbstractLogSourceEntry,
     AuditLogDocument,
@@ -11,16 +15,64 @@ from resilient_logger.utils import get_resilient_logger_config
 class DjangoAuditLogSourceEntry(AbstractLogSourceEntry):
     def __init__(self, log: LogEntry):
         self.log = log
+        # Resolved for a whole chunk by prepare_chunk()
+        self._actor: dict | None = None
+        self._operation: str | None = None
+
+    @classmethod
+    def prepare_chunk(
+        cls, entries: Iterable["DjangoAuditLogSourceEntry"], actors: dict[int, dict]
+    ) -> None:
+        """
+        Resolves the actors and the operations of the entries at once. The actors
+        maps the actor ids to the actor dicts already resolved, the missing ones
+        are fetched with a single query and added to it.
+        """
+        entries = list(entries)
+        missing = {
+            entry.log.actor_id
+            for entry in entries
+            if entry.log.actor_id is not None and entry.log.actor_id not in actors
+        }
+
+        if missing:
+            actors.update(cls._fetch_actors(missing))
+
+        operations = {
+            value: str(label).upper() for value, label in LogEntry.Action.choices
+        }
+
+        for entry in entries:
+            entry._operation = operations[entry.log.action]
+            entry._actor = actors.get(entry.log.actor_id) or cls._parse_actor(None)
+
+    @classmethod
+    def _fetch_actors(cls, ids: set[int]) -> dict[int, dict]:
+        user_model = get_user_model()
+        users = user_model._default_manager.filter(pk__in=ids)
+
+        if getattr(user_model, "get_full_name", None) is AbstractUser.get_full_name:
+            # Only the columns used by the default get_full_name() and the email
+            users = users.only("first_name", "last_name", "email")
+
+        return {user.pk: cls._parse_actor(user) for user in users}
 
     def get_id(self) -> str | int:
         return self.log.id
 
     def get_document(self) -> AuditLogDocument:
         config = get_resilient_logger_config()
-        actor: AbstractUser | None = self.log.actor
+        actor = self._actor
+
+        if actor is None:
+            actor = self._parse_actor(self.log.actor)
+
+        operation = self._operation
+
+        if operation is None:
+            # Looks up the action tuple [int, str] and uses name of it
+            operation = str(LogEntry.Action.choices[self.log.action][1]).upper()
 
-        # Looks up the action tuple [int, str] and uses name of it
-        action = LogEntry.Action.choices[self.log.action][1]
         additional_data = (self.log.additional_data or {}).copy()
 
         # Remove is_sent variable from additional_data, it's only for local tracking
@@ -35,9 +87,9 @@ class DjangoAuditLogSourceEntry(AbstractLogSourceEntry):
         return {
             "@timestamp": self.log.timestamp,
             "audit_event": {
-                "actor": self._parse_actor(actor),
+                "actor": actor,
                 "date_time": self.log.timestamp,
-                "operation": str(action).upper(),
+                "operation": operation,
                 "origin": config["origin"],
                 "target": {
                     "value": self.log.object_repr,
@@ -99,3 +151,13 @@ class DjangoAuditLogSourceEntry(AbstractLogSourceEntry):
                 substrings.append(f"{field}{colon}{operation} {sorted(objects)}")
 
         return separator.join(substrings)
+
+
+class DeliveryTrackedAuditLogSourceEntry(DjangoAuditLogSourceEntry):
+    """Log entry whose sent state is tracked in the AuditLogDelivery table."""
+
+    def is_sent(self) -> bool:
+        return not AuditLogDelivery.objects.filter(log_entry_id=self.log.id).exists()
+
+    def mark_sent(self) -> None:
+        AuditLogDelivery.objects.filter(log_entry_id=self.log.id).delete()
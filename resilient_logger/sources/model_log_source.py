@@ -0,0 +1,176 @@
+import datetime
+from collections.abc import Iterator, Sequence
+from typing import Any, cast
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from resilient_logger.sources import AbstractLogSource
+from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
+from resilient_logger.sources.model_log_source_entry import ModelLogSourceEntry
+
+TRACKING_FLAG = "flag"
+TRACKING_TIMESTAMP = "timestamp"
+
+MAPPED_KEYS = ("message", "level", "operation", "actor", "target")
+
+
+class ModelLogSource(AbstractLogSource):
+    """
+    Log source for the rows of any model, e.g. an append-only table of login
+    events. Configured in RESILIENT_LOGGER["sources"] with:
+
+    - model: the model as "app_label.ModelName".
+    - fields: maps the keys of the audit event (message, level, operation, actor
+      and target) to the fields of the model. The message is required.
+    - extra_fields: the fields stored in the extra of the audit event.
+    - timestamp_field: the creation time of the rows, used in the document and
+      in the ordering.
+    - tracking and sent_field: how the sent state is stored. "flag" (default)
+      sets the boolean sent_field (default "is_sent") and "timestamp" sets the
+      nullable datetime sent_field (e.g. "sent_at") to the time of sending.
+    - operation: the operation used when none is mapped.
+
+    The unsent rows are fetched in chunks ordered by (timestamp_field, pk) with
+    keyset pagination, loading only the mapped fields. An index on
+    (timestamp_field, pk), preferably partial on the unsent rows, keeps the
+    fetching fast however large the table grows.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        fields: dict[str, str],
+        extra_fields: Sequence[str] = (),
+        timestamp_field: str = "created_at",
+        tracking: str = TRACKING_FLAG,
+        sent_field: str = "is_sent",
+        operation: str = "MANUAL",
+    ) -> None:
+        if tracking not in (TRACKING_FLAG, TRACKING_TIMESTAMP):
+            raise ValueError(f"Unknown ModelLogSource tracking '{tracking}'")
+
+        unknown_keys = set(fields) - set(MAPPED_KEYS)
+
+        if unknown_keys:
+            raise ValueError(f"Unknown ModelLogSource fields: {sorted(unknown_keys)}")
+
+        if "message" not in fields:
+            raise ValueError("ModelLogSource fields must map the message")
+
+        self.model: type[models.Model] = apps.get_model(model)
+        self.model_label = self.model._meta.label
+        self.timestamp_field = self._get_attname(timestamp_field)
+        self.sent_field = self._get_attname(sent_field)
+        self.tracking = tracking
+        self.operation = operation
+        self.mapped_attnames = {
+            key: self._get_attname(name) for key, name in fields.items()
+        }
+        self.extra_attnames = {name: self._get_attname(name) for name in extra_fields}
+
+    def _get_attname(self, name: str) -> str:
+        """
+        Returns the attribute of the field, the id of a relation is used as is
+        instead of fetching the related object.
+        """
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist as e:
+            raise ValueError(f"{self.model._meta.label} has no field '{name}'") from e
+
+        if not field.concrete:
+            raise ValueError(f"{self.model._meta.label}.{name} is not a column")
+
+        return cast(models.Field, field).attname
+
+    def get_sent_value(self) -> bool | datetime.datetime:
+        return True if self.tracking == TRACKING_FLAG else timezone.now()
+
+    @transaction.atomic
+    def get_unsent_entries(self, chunk_size: int) -> Iterator[AbstractLogSourceEntry]:
+        # Always keyset paginated, the rows of any table are fetched in chunks
+        yield from self._iterate_unsent_chunks(chunk_size)
+
+    def get_unsent_chunk(
+        self,
+        chunk_size: int,
+        after: AbstractLogSourceEntry | None = None,
+        claim: bool = False,
+    ) -> list[ModelLogSourceEntry]:
+        entries = self._get_unsent_queryset()
+
+        if after is not None:
+            after_entry = cast(ModelLogSourceEntry, after)
+            timestamp = after_entry.get_timestamp()
+            # (timestamp, pk) > (after.timestamp, after.pk) with an index range bound
+            entries = entries.filter(
+                Q(**{f"{self.timestamp_field}__gt": timestamp})
+                | Q(pk__gt=after_entry.get_id()),
+                **{f"{self.timestamp_field}__gte": timestamp},
+            )
+
+        if claim:
+            entries = entries.select_for_update(skip_locked=True)
+
+        return [
+            ModelLogSourceEntry(instance, self) for instance in entries[:chunk_size]
+        ]
+
+    def _get_unsent_queryset(self) -> QuerySet:
+        pk_name = self.model._meta.pk.attname
+
+        return (
+            self.model._default_manager.filter(self._get_sent_q(negate=True))
+            .only(
+                pk_name,
+                self.timestamp_field,
+                self.sent_field,
+                *self.mapped_attnames.values(),
+                *self.extra_attnames.values(),
+            )
+            .order_by(self.timestamp_field, "pk")
+        )
+
+    def _get_sent_q(self, negate: bool = False) -> Q:
+        if self.tracking == TRACKING_FLAG:
+            return Q(**{self.sent_field: not negate})
+
+        return Q(**{f"{self.sent_field}__isnull": negate})
+
+    def _get_sent_queryset(self, days_to_keep: int) -> QuerySet:
+        cutoff = timezone.now() - datetime.timedelta(days=days_to_keep)
+
+        return self.model._default_manager.filter(
+            self._get_sent_q(), **{f"{self.timestamp_field}__lte": cutoff}
+        )
+
+    def mark_sent_many(self, ids: Sequence[str | int]) -> None:
+        self.model._default_manager.filter(pk__in=ids).update(
+            **{self.sent_field: self.get_sent_value()}
+        )
+
+    def clear_sent_entries(
+        self,
+        days_to_keep: int = 30,
+        chunk_size: int = 1000,
+        max_seconds: float | None = None,
+    ) -> int:
+        return self._delete_in_chunks(
+            self._get_sent_queryset(days_to_keep), chunk_size, max_seconds
+        )
+
+    def explain_queries(
+        self, chunk_size: int, days_to_keep: int = 30, **options: Any
+    ) -> dict[str, str]:
+        return {
+            "fetch": self._get_unsent_queryset()[:chunk_size].explain(**options),
+            "clear": self._get_sent_queryset(days_to_keep)
+            .order_by("pk")
+            .values("pk")[:chunk_size]
+            .explain(**options),
+        }
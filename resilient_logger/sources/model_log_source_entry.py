@@ -0,0 +1,100 @@
+import datetime
+from typing import TYPE_CHECKING
+
+from django.db import models
+
+from resilient_logger.sources.abstract_log_source_entry import (
+    AbstractLogSourceEntry,
+    AuditLogDocument,
+)
+from resilient_logger.utils import (
+    derive_idempotency_key,
+    get_resilient_logger_config,
+    value_as_dict,
+)
+
+if TYPE_CHECKING:
+    from resilient_logger.sources.model_log_source import ModelLogSource
+
+
+class ModelLogSourceEntry(AbstractLogSourceEntry):
+    """Log entry of a model instance fetched by ModelLogSource."""
+
+    def __init__(self, instance: models.Model, source: "ModelLogSource") -> None:
+        self.instance = instance
+        self.source = source
+
+    def get_id(self) -> str | int:
+        return self.instance.pk
+
+    def get_timestamp(self) -> datetime.datetime:
+        return getattr(self.instance, self.source.timestamp_field)
+
+    def get_document(self) -> AuditLogDocument:
+        config = get_resilient_logger_config()
+        source = self.source
+        mapped = {
+            key: getattr(self.instance, attname)
+            for key, attname in source.mapped_attnames.items()
+        }
+        iso_date = (
+            self.get_timestamp()
+            .astimezone(datetime.timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z")
+        )
+
+        extra = {
+            **{
+                name: getattr(self.instance, attname)
+                for name, attname in source.extra_attnames.items()
+            },
+            "source_model": source.model_label,
+            "source_pk": self.get_id(),
+        }
+
+        return {
+            "@timestamp": iso_date,
+            "audit_event": {
+                "actor": self._as_dict(mapped.get("actor")),
+                "date_time": iso_date,
+                "operation": str(mapped.get("operation") or source.operation),
+                "origin": config["origin"],
+                "target": self._as_dict(mapped.get("target")),
+                "environment": config["environment"],
+                "message": mapped["message"],
+                "level": mapped.get("level"),
+                "extra": extra,
+            },
+        }
+
+    def get_idempotency_key(self) -> str:
+        """
+        Derived from the model and the identity of the row, which do not change
+        between the attempts, instead of hashing the whole document.
+        """
+        config = get_resilient_logger_config()
+        return derive_idempotency_key(
+            self.source.model_label,
+            config["origin"],
+            config["environment"],
+            self.get_id(),
+            self.get_timestamp().isoformat(),
+        )
+
+    def is_sent(self) -> bool:
+        return bool(getattr(self.instance, self.source.sent_field))
+
+    def mark_sent(self) -> None:
+        setattr(self.instance, self.source.sent_field, self.source.get_sent_value())
+        self.instance.save(update_fields=[self.source.sent_field])
+
+    @staticmethod
+    def _as_dict(value: object) -> dict:
+        if value is None:
+            return value_as_dict("unknown")
+
+        if isinstance(value, dict):
+            return value
+
+        return value_as_dict(str(value))
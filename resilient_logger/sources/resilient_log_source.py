@@ -1,17 +1,39 @@
+import csv
 import datetime
-from collections.abc import Iterable, Iterator
+import io
+import json
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 from dataclasses import dataclass
-from typing import Any, TypeVar
+from functools import partial
+from itertools import islice
+from typing import Any, TypeVar, cast
 
-from django.db import transaction
+from django.db import connections, router, transaction
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 
-from resilient_logger.models import ResilientLogEntry
+from resilient_logger.models import ResilientLogArchiveEntry, ResilientLogEntry
+from resilient_logger.notifications import anotify_new_entries, notify_new_entries
+from resilient_logger.partitioning import drop_sent_partitions
+from resilient_logger.retry_policy import RetryPolicy
 from resilient_logger.sources import AbstractLogSource
-from resilient_logger.sources.resilient_log_source_entry import ResilientLogSourceEntry
+from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
+from resilient_logger.sources.resilient_log_source_entry import (
+    ResilientLogSourceEntry,
+    ResilientLogSourceRowEntry,
+)
+from resilient_logger.utils import generate_idempotency_key
 
 TResilientLogSource = TypeVar("TResilientLogSource", bound="ResilientLogSource")
 
+# Entries created inside ResilientLogSource.batch(), saved when the batch ends
+_batch_entries: ContextVar[list[ResilientLogEntry] | None] = ContextVar(
+    "resilient_logger_batch_entries", default=None
+)
+
 
 @dataclass
 class ResilientLogEntryData:
@@ -30,19 +52,274 @@ class StructuredResilientLogEntryData:
     extra: dict | None = None
 
 
+# Columns written by COPY, id comes from the sequence and last_error is NULL
+_COPY_FIELDS = (
+    "level",
+    "message",
+    "context",
+    "is_sent",
+    "created_at",
+    "attempts",
+    "next_attempt_at",
+    "idempotency_key",
+)
+
+
+class _CopyStream(io.RawIOBase):
+    """File-like object for psycopg2 copy_expert that reads from an iterator."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+
+            if chunk is None:
+                return 0
+
+            self._buffer = chunk
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+
+        return size
+
+
+def _csv_chunks(
+    objs: Iterator[ResilientLogEntryData], chunk_size: int, counter: list[int]
+) -> Iterator[bytes]:
+    message_field = ResilientLogEntry._meta.get_field("message")
+    context_field = ResilientLogEntry._meta.get_field("context")
+    now = timezone.now().isoformat()
+
+    while chunk := list(islice(objs, chunk_size)):
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        for obj in chunk:
+            writer.writerow(
+                (
+                    obj.level,
+                    json.dumps(obj.message, cls=message_field.encoder),
+                    # Unquoted empty value is NULL in the CSV format
+                    ""
+                    if obj.context is None
+                    else json.dumps(obj.context, cls=context_field.encoder),
+                    "f",
+                    now,
+                    0,
+                    now,
+                    generate_idempotency_key(),
+                )
+            )
+
+        counter[0] += len(chunk)
+        yield output.getvalue().encode()
+
+
+def _copy_entries(
+    connection, objs: Iterator[ResilientLogEntryData], chunk_size: int
+) -> int:
+    meta = ResilientLogEntry._meta
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(
+        quote_name(meta.get_field(name).column) for name in _COPY_FIELDS
+    )
+    sql = f"COPY {quote_name(meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    counter = [0]
+    chunks = _csv_chunks(objs, chunk_size, counter)
+
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+
+        if hasattr(raw_cursor, "copy"):
+            # psycopg 3
+            with raw_cursor.copy(sql) as copy:
+                for chunk in chunks:
+                    copy.write(chunk)
+        else:
+            # psycopg2
+            raw_cursor.copy_expert(sql, _CopyStream(chunks))
+
+    return counter[0]
+
+
+# Columns moved to the archive, sent_at is set to the time of the move
+_ARCHIVE_FIELDS = ("id", "level", "message", "context", "created_at", "attempts")
+
+
+def _move_to_archive(ids: Sequence[str | int]) -> None:
+    """
+    Moves the entries from the queue table to the archive table. On PostgreSQL
+    the rows are deleted and inserted with one statement, elsewhere with two
+    statements in one transaction.
+    """
+    if not ids:
+        return
+
+    using = router.db_for_write(ResilientLogEntry)
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    queue_table = quote_name(ResilientLogEntry._meta.db_table)
+    archive_table = quote_name(ResilientLogArchiveEntry._meta.db_table)
+    columns = ", ".join(quote_name(field) for field in _ARCHIVE_FIELDS)
+    insert = f"INSERT INTO {archive_table} ({columns}, {quote_name('sent_at')})"
+    ids = [int(id) for id in ids]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {queue_table} WHERE id = ANY(%s) "
+                f"RETURNING {columns}) {insert} SELECT {columns}, %s FROM moved",
+                [ids, now],
+            )
+            return
+
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"{insert} SELECT {columns}, %s FROM {queue_table} "
+            f"WHERE id IN ({placeholders})",
+            [now, *ids],
+        )
+        cursor.execute(f"DELETE FROM {queue_table} WHERE id IN ({placeholders})", ids)
+
+
 class ResilientLogSource(AbstractLogSource):
+    """
+    Log source for the entries stored in ResilientLogEntry.
+
+    By default unsent entries are iterated with a database cursor. With
+    keyset_pagination the entries are fetched in chunks ordered by (created_at, id)
+    instead, which keeps the memory usage bounded on databases without server-side
+    cursors and works with connection poolers in transaction mode.
+
+    With archive the sent entries are moved from the ResilientLogEntry table to
+    the ResilientLogArchiveEntry table, so the queue table only holds the unsent
+    entries and stays small regardless of how long the history is kept. The old
+    entries are then cleared from the archive.
+
+    With row_projection the unsent entries are fetched as values_list() rows and
+    returned as ResilientLogSourceRowEntry instead of model instances, and the
+    documents of each chunk are built at once.
+    """
+
+    def __init__(
+        self,
+        keyset_pagination: bool = False,
+        archive: bool = False,
+        row_projection: bool = False,
+    ) -> None:
+        self._keyset_pagination = keyset_pagination
+        self._archive = archive
+        self._row_projection = row_projection
+
     @classmethod
     def create(
         cls: type[TResilientLogSource], *, level: int, message: Any, context: dict
     ) -> TResilientLogSource:
+        batch_entries = _batch_entries.get()
+
+        if batch_entries is not None:
+            entry = ResilientLogEntry(level=level, message=message, context=context)
+            using = router.db_for_write(ResilientLogEntry)
+
+            if transaction.get_connection(using).in_atomic_block:
+                # Joins the batch only if the transaction it was created in commits
+                transaction.on_commit(partial(batch_entries.append, entry), using=using)
+            else:
+                batch_entries.append(entry)
+
+            return ResilientLogSourceEntry(entry)
+
         entry = ResilientLogEntry.objects.create(
             level=level,
             message=message,
             context=context,
         )
+        notify_new_entries(router.db_for_write(ResilientLogEntry))
+
+        return ResilientLogSourceEntry(entry)
+
+    @classmethod
+    async def acreate(
+        cls: type[TResilientLogSource], *, level: int, message: Any, context: dict
+    ) -> TResilientLogSource:
+        if cls.is_batch_active():
+            return cls.create(level=level, message=message, context=context)
+
+        entry = await ResilientLogEntry.objects.acreate(
+            level=level,
+            message=message,
+            context=context,
+        )
+        await anotify_new_entries(router.db_for_write(ResilientLogEntry))
 
         return ResilientLogSourceEntry(entry)
 
+    @classmethod
+    def is_batch_active(cls) -> bool:
+        return _batch_entries.get() is not None
+
+    @classmethod
+    @contextmanager
+    def batch(cls) -> Iterator[None]:
+        """
+        Collects the entries created inside the block and saves them with one
+        bulk insert when the block exits. Inside an atomic block the entries are
+        saved when the transaction commits. An entry created inside an atomic
+        block is only saved if that transaction commits, e.g. the entries of a
+        view rolled back by ATOMIC_REQUESTS are discarded with it. The entries
+        returned by create inside the block are unsaved until then. Nested blocks
+        join the outermost one.
+        """
+        if cls.is_batch_active():
+            yield
+            return
+
+        token = cls.start_batch()
+
+        try:
+            yield
+        finally:
+            cls.save_batch(cls.end_batch(token))
+
+    @classmethod
+    def start_batch(cls) -> Token:
+        return _batch_entries.set([])
+
+    @classmethod
+    def end_batch(cls, token: Token) -> list[ResilientLogEntry]:
+        entries = _batch_entries.get()
+        _batch_entries.reset(token)
+
+        if entries is None:
+            return []
+
+        return entries
+
+    @classmethod
+    def save_batch(cls, entries: list[ResilientLogEntry]) -> None:
+        using = router.db_for_write(ResilientLogEntry)
+
+        def save() -> None:
+            # Read on save, the entries of committed transactions are added
+            # to the list until then
+            if entries:
+                ResilientLogEntry.objects.using(using).bulk_create(entries)
+                notify_new_entries(using)
+
+        if transaction.get_connection(using).in_atomic_block:
+            transaction.on_commit(save, using=using)
+        else:
+            save()
+
     @classmethod
     def bulk_create(
         cls: type[TResilientLogSource], objs: Iterable[ResilientLogEntryData]
@@ -52,6 +329,60 @@ class ResilientLogSource(AbstractLogSource):
             for obj in objs
         )
 
+        if entries:
+            notify_new_entries(router.db_for_write(ResilientLogEntry))
+
+        return [ResilientLogSourceEntry(entry) for entry in entries]
+
+    @classmethod
+    def bulk_ingest(
+        cls, objs: Iterable[ResilientLogEntryData], chunk_size: int = 1000
+    ) -> int:
+        """
+        Stores a large number of entries without returning them and returns the
+        number of stored entries. The objs are consumed chunk_size at a time, so
+        a generator is never fully materialised.
+
+        On PostgreSQL the rows are streamed with COPY FROM STDIN, elsewhere they
+        are inserted with bulk_create in chunks. All entries are stored in one
+        transaction.
+        """
+        using = router.db_for_write(ResilientLogEntry)
+        connection = connections[using]
+        objs = iter(objs)
+
+        with transaction.atomic(using=using):
+            if connection.vendor == "postgresql":
+                count = _copy_entries(connection, objs, chunk_size)
+            else:
+                count = 0
+
+                while chunk := list(islice(objs, chunk_size)):
+                    ResilientLogEntry.objects.using(using).bulk_create(
+                        ResilientLogEntry(
+                            level=obj.level, message=obj.message, context=obj.context
+                        )
+                        for obj in chunk
+                    )
+                    count += len(chunk)
+
+            if count:
+                notify_new_entries(using)
+
+        return count
+
+    @classmethod
+    async def abulk_create(
+        cls: type[TResilientLogSource], objs: Iterable[ResilientLogEntryData]
+    ) -> Iterable[TResilientLogSource]:
+        entries = await ResilientLogEntry.objects.abulk_create(
+            ResilientLogEntry(level=obj.level, message=obj.message, context=obj.context)
+            for obj in objs
+        )
+
+        if entries:
+            await anotify_new_entries(router.db_for_write(ResilientLogEntry))
+
         return [ResilientLogSourceEntry(entry) for entry in entries]
 
     @classmethod
@@ -76,6 +407,28 @@ class ResilientLogSource(AbstractLogSource):
             },
         )
 
+    @classmethod
+    async def acreate_structured(
+        cls: type[TResilientLogSource],
+        *,
+        message: Any,
+        level: int = 0,
+        operation: str = "MANUAL",
+        actor: dict | None = None,
+        target: dict | None = None,
+        extra: dict | None = None,
+    ) -> TResilientLogSource:
+        return await cls.acreate(
+            level=level,
+            message=message,
+            context={
+                **(extra or {}),
+                "actor": actor or {},
+                "operation": operation,
+                "target": target or {},
+            },
+        )
+
     @classmethod
     def bulk_create_structured(
         cls: type[TResilientLogSource],
@@ -100,24 +453,149 @@ class ResilientLogSource(AbstractLogSource):
     @transaction.atomic
     def get_unsent_entries(
         self, chunk_size: int
-    ) -> Iterator["ResilientLogSourceEntry"]:
-        entries = (
-            ResilientLogEntry.objects.filter(is_sent=False)
-            .order_by("created_at")
-            .iterator(chunk_size=chunk_size)
-        )
+    ) -> Iterator[ResilientLogSourceEntry | ResilientLogSourceRowEntry]:
+        if self._keyset_pagination:
+            yield from self._iterate_unsent_chunks(chunk_size)
+            return
+
+        if self._row_projection:
+            rows = (
+                self._get_unsent_queryset()
+                .values_list(*ResilientLogSourceRowEntry.FIELDS)
+                .iterator(chunk_size=chunk_size)
+            )
+
+            while chunk := list(islice(rows, chunk_size)):
+                yield from self._to_row_entries(chunk)
+
+            return
+
+        entries = self._get_unsent_queryset().iterator(chunk_size=chunk_size)
 
         for entry in entries:
             yield ResilientLogSourceEntry(entry)
 
-    @transaction.atomic
-    def clear_sent_entries(self, days_to_keep: int = 30) -> list[str]:
-        entries = ResilientLogEntry.objects.filter(
-            is_sent=True,
-            created_at__lte=(timezone.now() - datetime.timedelta(days=days_to_keep)),
-        ).select_for_update()
+    def get_unsent_chunk(
+        self,
+        chunk_size: int,
+        after: AbstractLogSourceEntry | None = None,
+        claim: bool = False,
+    ) -> list[ResilientLogSourceEntry | ResilientLogSourceRowEntry]:
+        entries = self._get_unsent_queryset()
+
+        if after is not None:
+            if isinstance(after, ResilientLogSourceRowEntry):
+                created_at, after_id = after.created_at, after.id
+            else:
+                log = cast(ResilientLogSourceEntry, after).log
+                created_at, after_id = log.created_at, log.id
+
+            # (created_at, id) > (created_at, after_id) with an index range bound
+            entries = entries.filter(
+                Q(created_at__gt=created_at) | Q(id__gt=after_id),
+                created_at__gte=created_at,
+            )
+
+        if claim:
+            entries = entries.select_for_update(skip_locked=True)
+
+        if self._row_projection:
+            rows = entries.values_list(*ResilientLogSourceRowEntry.FIELDS)
+            return self._to_row_entries(rows[:chunk_size])
+
+        return [ResilientLogSourceEntry(entry) for entry in entries[:chunk_size]]
+
+    @staticmethod
+    def _to_row_entries(rows: Iterable[tuple]) -> list[ResilientLogSourceRowEntry]:
+        entries = [ResilientLogSourceRowEntry(*row) for row in rows]
+        ResilientLogSourceRowEntry.build_documents(entries)
+
+        return entries
+
+    def _get_unsent_queryset(self) -> QuerySet[ResilientLogEntry]:
+        # Served by the partial index resilient_log_unsent_idx
+        return ResilientLogEntry.objects.filter(
+            is_sent=False, next_attempt_at__lte=timezone.now()
+        ).order_by("created_at", "id")
+
+    def _get_sent_queryset(self, days_to_keep: int) -> QuerySet:
+        cutoff = timezone.now() - datetime.timedelta(days=days_to_keep)
+
+        if self._archive:
+            return ResilientLogArchiveEntry.objects.filter(created_at__lte=cutoff)
+
+        return ResilientLogEntry.objects.filter(is_sent=True, created_at__lte=cutoff)
+
+    def explain_queries(
+        self, chunk_size: int, days_to_keep: int = 30, **options: Any
+    ) -> dict[str, str]:
+        return {
+            "fetch": self._get_unsent_queryset()[:chunk_size].explain(**options),
+            "clear": self._get_sent_queryset(days_to_keep)
+            .order_by("id")
+            .values("id")[:chunk_size]
+            .explain(**options),
+        }
 
-        deleted_ids = list(entries.values_list("id", flat=True))
-        entries.delete()
+    def mark_sent_many(self, ids: Sequence[str | int]) -> None:
+        if self._archive:
+            _move_to_archive(ids)
+            return
+
+        ResilientLogEntry.objects.filter(id__in=ids).update(is_sent=True)
+
+    def mark_failed_many(
+        self, errors: Mapping[str | int, str], retry_policy: RetryPolicy
+    ) -> None:
+        now = timezone.now()
+        entries = list(
+            ResilientLogEntry.objects.filter(id__in=list(errors)).only("id", "attempts")
+        )
+
+        for entry in entries:
+            error = errors.get(entry.id, errors.get(str(entry.id), ""))
+            retry_policy.record_failure(entry, error, now)
+
+        ResilientLogEntry.objects.bulk_update(
+            entries, ["attempts", "last_error", "next_attempt_at"]
+        )
+
+    def requeue_parked_entries(self) -> int:
+        return ResilientLogEntry.objects.filter(
+            is_sent=False, next_attempt_at__isnull=True
+        ).update(attempts=0, next_attempt_at=timezone.now())
+
+    def clear_sent_entries(
+        self,
+        days_to_keep: int = 30,
+        chunk_size: int = 1000,
+        max_seconds: float | None = None,
+    ) -> int:
+        entries = self._get_sent_queryset(days_to_keep)
+
+        if self._archive:
+            # Entries marked sent one by one are still in the queue table. They
+            # are moved within the same time budget, e.g. the backlog left from
+            # before enabling the archive is moved over several runs.
+            deadline = None if max_seconds is None else time.monotonic() + max_seconds
+            sent = ResilientLogEntry.objects.filter(is_sent=True).order_by("id")
+
+            while deadline is None or time.monotonic() < deadline:
+                ids = list(sent.values_list("id", flat=True)[:chunk_size])
+
+                if not ids:
+                    break
+
+                _move_to_archive(ids)
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+
+            return self._delete_in_chunks(entries, chunk_size, remaining)
+
+        # Whole partitions are dropped first, the rest is deleted row by row
+        deleted = drop_sent_partitions(
+            timezone.now() - datetime.timedelta(days=days_to_keep),
+            router.db_for_write(ResilientLogEntry),
+        )
 
-        return [str(deleted_id) for deleted_id in deleted_ids]
+        return deleted + self._delete_in_chunks(entries, chunk_size, max_seconds)
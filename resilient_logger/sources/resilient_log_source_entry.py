@@ -1,4 +1,5 @@
 import datetime
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import Any
 
@@ -27,6 +28,45 @@ class StructuredResilientLogEntryData:
     extra: dict | None = None
 
 
+def build_document(
+    id: int,
+    level: int,
+    message: Any,
+    context: dict,
+    created_at: datetime.datetime,
+    origin: str,
+    environment: str,
+) -> AuditLogDocument:
+    """
+    Builds the document of a ResilientLogEntry. The actor, operation and target
+    are popped from the context, so pass a copy if it is still used.
+    """
+    actor = context.pop("actor", "unknown")
+    operation = context.pop("operation", "MANUAL")
+    target = context.pop("target", "unknown")
+    iso_date = (
+        created_at.astimezone(datetime.timezone.utc)
+        .isoformat(timespec="milliseconds")
+        .replace("+00:00", "Z")
+    )
+    context["source_pk"] = id
+
+    return {
+        "@timestamp": iso_date,
+        "audit_event": {
+            "actor": value_as_dict(actor),
+            "date_time": iso_date,
+            "operation": operation,
+            "origin": origin,
+            "target": value_as_dict(target),
+            "environment": environment,
+            "message": message,
+            "level": level,
+            "extra": context,
+        },
+    }
+
+
 class ResilientLogSourceEntry(AbstractLogSourceEntry):
     def __init__(self, log: ResilientLogEntry):
         self.log = log
@@ -36,35 +76,20 @@ class ResilientLogSourceEntry(AbstractLogSourceEntry):
 
     def get_document(self) -> AuditLogDocument:
         config = get_resilient_logger_config()
-        context = (self.log.context or {}).copy()
-        actor = context.pop("actor", "unknown")
-        operation = context.pop("operation", "MANUAL")
-        target = context.pop("target", "unknown")
-        iso_date = (
-            self.log.created_at.astimezone(datetime.timezone.utc)
-            .isoformat(timespec="milliseconds")
-            .replace("+00:00", "Z")
+
+        return build_document(
+            self.get_id(),
+            self.log.level,
+            self.log.message,
+            (self.log.context or {}).copy(),
+            self.log.created_at,
+            config["origin"],
+            config["environment"],
         )
 
-        extra = {
-            **context,
-            "source_pk": self.get_id(),
-        }
-
-        return {
-            "@timestamp": iso_date,
-            "audit_event": {
-                "actor": value_as_dict(actor),
-                "date_time": iso_date,
-                "operation": operation,
-                "origin": config["origin"],
-                "target": value_as_dict(target),
-                "environment": config["environment"],
-                "message": self.log.message,
-                "level": self.log.level,
-                "extra": extra,
-            },
-        }
+    def get_idempotency_key(self) -> str:
+        # Entries created before the key was stored fall back to the content hash
+        return self.log.idempotency_key or super().get_idempotency_key()
 
     def is_sent(self) -> bool:
         return self.log.is_sent
@@ -72,3 +97,88 @@ class ResilientLogSourceEntry(AbstractLogSourceEntry):
     def mark_sent(self) -> None:
         self.log.is_sent = True
         self.log.save(update_fields=["is_sent"])
+
+
+class ResilientLogSourceRowEntry(AbstractLogSourceEntry):
+    """
+    Lightweight entry of a ResilientLogEntry row fetched with values_list() instead
+    of a model instance. The documents of a whole chunk are built at once with
+    build_documents().
+    """
+
+    __slots__ = (
+        "id",
+        "level",
+        "message",
+        "context",
+        "created_at",
+        "idempotency_key",
+        "_document",
+        "_shared_document",
+        "_serialized_document",
+    )
+
+    # The order of the fields in the fetched rows
+    FIELDS = ("id", "level", "message", "context", "created_at", "idempotency_key")
+
+    def __init__(
+        self,
+        id: int,
+        level: int,
+        message: Any,
+        context: dict | None,
+        created_at: datetime.datetime,
+        idempotency_key: str | None,
+    ) -> None:
+        self.id = id
+        self.level = level
+        self.message = message
+        self.context = context
+        self.created_at = created_at
+        self.idempotency_key = idempotency_key
+        self._document: AuditLogDocument | None = None
+
+    @classmethod
+    def build_documents(cls, entries: Iterable["ResilientLogSourceRowEntry"]) -> None:
+        """Builds the documents of the entries with the config read only once."""
+        config = get_resilient_logger_config()
+        origin = config["origin"]
+        environment = config["environment"]
+
+        for entry in entries:
+            entry._document = entry._build_document(origin, environment)
+
+    def _build_document(self, origin: str, environment: str) -> AuditLogDocument:
+        # The context of a fetched row is not shared, so it is not copied
+        context, self.context = self.context or {}, None
+
+        return build_document(
+            self.id,
+            self.level,
+            self.message,
+            context,
+            self.created_at,
+            origin,
+            environment,
+        )
+
+    def get_id(self) -> str | int:
+        return self.id
+
+    def get_document(self) -> AuditLogDocument:
+        if self._document is None:
+            config = get_resilient_logger_config()
+            self._document = self._build_document(
+                config["origin"], config["environment"]
+            )
+
+        return self._document
+
+    def get_idempotency_key(self) -> str:
+        return self.idempotency_key or super().get_idempotency_key()
+
+    def is_sent(self) -> bool:
+        return False
+
+    def mark_sent(self) -> None:
+        ResilientLogEntry.objects.filter(id=self.id).update(is_sent=True)
@@ -1,7 +1,12 @@
+import logging
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Any
 
 from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
 
+logger = logging.getLogger(__name__)
+
 
 class AbstractLogTarget(ABC):
     @abstractmethod
@@ -9,5 +14,48 @@ class AbstractLogTarget(ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    def submit(self, entry: AbstractLogSourceEntry) -> bool:
+    def submit(self, entry: AbstractLogSourceEntry) -> bool | None:
+        """
+        Submits the entry and returns True when it was submitted, False when the
+        target rejected it and None when the target was unavailable. Rejected
+        entries count towards the attempts of the retry policy, entries not
+        submitted due to an unavailable target are retried without limit.
+        """
         raise NotImplementedError()
+
+    def submit_batch(
+        self, entries: Sequence[AbstractLogSourceEntry]
+    ) -> list[bool | None]:
+        """
+        Submits multiple entries and returns the result of each entry in the same
+        order as the input. Targets that are able to send several entries in one
+        request should override this, by default entries are submitted one by one.
+        """
+        results: list[bool | None] = []
+
+        for entry in entries:
+            submitted = None
+
+            try:
+                submitted = self.submit(entry)
+            except Exception:
+                logger.exception("Log target threw while submitting")
+
+            results.append(submitted)
+
+        return results
+
+    def prepare_batch(self, entries: Sequence[AbstractLogSourceEntry]) -> Any:
+        """
+        Prepares the entries for submit_prepared, e.g. by building the documents.
+        Allows the preparation to be done ahead of the submission. By default the
+        entries are returned as they are.
+        """
+        return entries
+
+    def submit_prepared(self, prepared: Any) -> list[bool | None]:
+        """
+        Submits the entries prepared by prepare_batch and returns the result of
+        each entry in the same order.
+        """
+        return self.submit_batch(prepared)
@@ -1,14 +1,18 @@
 import logging
+from collections.abc import Sequence
 from urllib.parse import urlparse
 
 from elasticsearch8 import ConflictError, Elasticsearch
 
 from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
 from resilient_logger.targets import AbstractLogTarget
-from resilient_logger.utils import content_hash
 
 # Constants
 ES_STATUS_CREATED = "created"
+ES_HTTP_CREATED = 201
+ES_HTTP_CONFLICT = 409
+ES_HTTP_TOO_MANY_REQUESTS = 429
+ES_HTTP_SERVER_ERROR = 500
 
 logger = logging.getLogger(__name__)
 
@@ -66,15 +70,14 @@ class ElasticsearchLogTarget(AbstractLogTarget):
     def is_required(self) -> bool:
         return self._required
 
-    def submit(self, entry: AbstractLogSourceEntry) -> bool:
-        document = entry.get_document()
-        hash = content_hash(document)
+    def submit(self, entry: AbstractLogSourceEntry) -> bool | None:
+        hash = entry.get_idempotency_key()
 
         try:
             response = self._client.index(
                 index=self._index,
                 id=hash,
-                document=document,
+                document=entry.get_serialized_document(),
                 op_type="create",
             )
 
@@ -86,20 +89,99 @@ class ElasticsearchLogTarget(AbstractLogTarget):
 
         except ConflictError:
             """
-            The document key used to store log entry is the hash of the contents.
+            The document key used to store log entry is the idempotency key of it.
             If we receive conflict error, it means that the given entry is already
             sent to the Elasticsearch.
             """
             logger.warning(
                 f"""Skipping the document with key {hash}, it's already submitted.""",
-                extra=document,
+                extra=entry.get_shared_document(),
             )
 
             return True
         except Exception:
             """
             Unknown exception, log it and keep going to avoid transaction rollbacks.
+            The request failed as a whole, so Elasticsearch is treated as
+            unavailable.
             """
             logger.exception(f"Entry with key {hash} failed.")
+            return None
 
         return False
+
+    def submit_batch(
+        self, entries: Sequence[AbstractLogSourceEntry]
+    ) -> list[bool | None]:
+        """
+        Submits the entries with a single request to the _bulk endpoint. Every entry
+        is sent as a create action keyed by its idempotency key, so entries that are
+        already stored (409 conflict) are treated as submitted.
+
+        Entries are rejected when their item fails with a client error. When the
+        whole request fails or an item fails with 429 or a server error,
+        Elasticsearch is unavailable and the result of the entry is None.
+        """
+        return self.submit_prepared(self.prepare_batch(entries))
+
+    def prepare_batch(
+        self, entries: Sequence[AbstractLogSourceEntry]
+    ) -> tuple[list[str], list[dict | bytes]]:
+        """
+        Builds the document ids and the _bulk operations of the entries. The
+        documents are passed as the serialized bytes shared with other targets.
+        """
+        hashes: list[str] = []
+        operations: list[dict | bytes] = []
+
+        for entry in entries:
+            hash = entry.get_idempotency_key()
+            hashes.append(hash)
+            operations.append({"create": {"_index": self._index, "_id": hash}})
+            operations.append(entry.get_serialized_document())
+
+        return hashes, operations
+
+    def submit_prepared(
+        self, prepared: tuple[list[str], list[dict | bytes]]
+    ) -> list[bool | None]:
+        hashes, operations = prepared
+
+        if not hashes:
+            return []
+
+        try:
+            response = self._client.bulk(operations=operations)
+        except Exception:
+            """
+            Unknown exception, log it and keep going to avoid transaction rollbacks.
+            """
+            logger.exception(f"Bulk submission of {len(hashes)} entries failed.")
+            return [None] * len(hashes)
+
+        results: list[bool | None] = []
+
+        for hash, item in zip(hashes, response["items"]):
+            status = item["create"].get("status")
+
+            if status == ES_HTTP_CREATED:
+                results.append(True)
+            elif status == ES_HTTP_CONFLICT:
+                logger.warning(
+                    f"Skipping the document with key {hash}, it's already submitted."
+                )
+                results.append(True)
+            else:
+                logger.error(
+                    f"Entry with key {hash} failed with status {status}.",
+                    extra={"error": item["create"].get("error")},
+                )
+                results.append(
+                    None
+                    if status is None
+                    or status == ES_HTTP_TOO_MANY_REQUESTS
+                    or status >= ES_HTTP_SERVER_ERROR
+                    else False
+                )
+
+        return results
@@ -1,6 +1,7 @@
 import logging
+from collections import ChainMap
 
-from resilient_logger.sources import AbstractLogSource
+from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
 from resilient_logger.targets import AbstractLogTarget
 
 
@@ -16,16 +17,18 @@ class ProxyLogTarget(AbstractLogTarget):
     def is_required(self) -> bool:
         return self._required
 
-    def submit(self, entry: AbstractLogSource) -> bool:
-        document = entry.get_document()
-        audit_event = document["audit_event"]
+    def submit(self, entry: AbstractLogSourceEntry) -> bool:
+        audit_event = entry.get_shared_document()["audit_event"]
         actor = audit_event.get("actor", "unknown")
         operation = audit_event.get("operation", "MANUAL")
         target = audit_event.get("target", "unknown")
-        message: str = audit_event.pop("message")
+        message: str = audit_event["message"]
         level = audit_event.get("level", logging.INFO)
-        extra = audit_event.get("extra", {})
+        extra = audit_event.get("extra") or {}
 
-        context = {**extra, "actor": actor, "operation": operation, "target": target}
+        # The shared document is read-only, the overrides go on top of it
+        context = ChainMap(
+            {"actor": actor, "operation": operation, "target": target}, extra
+        )
         self._logger.log(level=level, msg=message, extra=context)
         return True
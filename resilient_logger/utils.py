@@ -1,13 +1,12 @@
 import hashlib
-import json
 import logging
+import uuid
 from collections.abc import Callable, Sequence
 from functools import cache
 from importlib import import_module
 from typing import Any, TypedDict, TypeVar, cast
 
 from django.conf import settings
-from django.core.serializers.json import DjangoJSONEncoder
 
 from resilient_logger.errors.missing_context_error import MissingContextError
 
@@ -17,6 +16,15 @@ class ResilientLoggerConfig(TypedDict):
     environment: str
     batch_limit: int
     chunk_size: int
+    commit_per_chunk: bool
+    claim_entries: bool
+    listen_notify: bool
+    circuit_breaker: dict[str, Any]
+    retry: dict[str, Any]
+    pipeline_queue_depth: int
+    concurrent_fetch: bool
+    partitioning: dict[str, Any] | None
+    serializer: str | None
     submit_unsent_entries: bool
     clear_sent_entries: bool
     sources: list[dict[str, Any]]
@@ -41,6 +49,15 @@ _required_fields: tuple[tuple[str, type[Any], Callable[[Any], bool] | None], ...
 _default_config: ResilientLoggerConfig = {
     "batch_limit": 5000,
     "chunk_size": 500,
+    "commit_per_chunk": False,
+    "claim_entries": False,
+    "listen_notify": False,
+    "circuit_breaker": {"failure_threshold": 5, "reset_timeout": 60},
+    "retry": {"base_delay": 60, "max_delay": 86400, "max_attempts": 10},
+    "pipeline_queue_depth": 0,
+    "concurrent_fetch": False,
+    "partitioning": None,
+    "serializer": None,
     "clear_sent_entries": False,
     "submit_unsent_entries": False,
 }
@@ -140,8 +157,52 @@ def get_resilient_logger_config() -> ResilientLoggerConfig:
 
 
 def content_hash(contents: dict[str, Any]) -> str:
-    json_repr = json.dumps(contents, sort_keys=True, cls=DjangoJSONEncoder)
-    return hashlib.sha256(json_repr.encode()).hexdigest()
+    from resilient_logger.serializers import get_serializer
+
+    return hashlib.sha256(get_serializer().canonical(contents)).hexdigest()
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict. Being a dict, it is serialized like one, but every attempt to
+    modify it raises TypeError.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Returns a read-only copy of the value with its dicts and lists frozen."""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+
+    return value
+
+
+def generate_idempotency_key() -> str:
+    """Returns a new random key for a log entry."""
+    return uuid.uuid4().hex
+
+
+def derive_idempotency_key(*parts: Any) -> str:
+    """Returns a key derived from the parts without serializing the document."""
+    return hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()
 
 
 def unavailable_class(name: str, dependencies: Sequence[str]):
@@ -0,0 +1,33 @@
+"""
+Entry points for the worker processes spawned by the management commands.
+
+The functions here may run in a freshly started interpreter, so Django is set up
+before anything that relies on the app registry is imported.
+"""
+
+from typing import Any
+
+import django
+from django.db import connections
+
+
+def submit_unsent_entries_worker() -> tuple[dict[str, bool], list[dict[str, Any]]]:
+    """
+    Submits unsent entries with a logger of its own. Entries are always claimed,
+    so that the workers running in parallel never submit the same entries, which
+    requires the chunks to be submitted without the pipeline.
+
+    Returns the results and the circuit breaker states of the worker.
+    """
+    django.setup()
+
+    from resilient_logger.resilient_logger import ResilientLogger
+
+    try:
+        resilient_logger = ResilientLogger.create(
+            claim_entries=True, pipeline_queue_depth=0
+        )
+        results = resilient_logger.submit_unsent_entries()
+        return results, resilient_logger.get_circuit_breaker_states()
+    finally:
+        connections.close_all()
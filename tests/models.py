@@ -1,5 +1,7 @@
 from auditlog.registry import auditlog
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -11,4 +13,25 @@ class DummyModel(models.Model):
         verbose_name_plural = _("dummy models")
 
 
+class LoginEvent(models.Model):
+    username = models.CharField(max_length=150)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL
+    )
+    success = models.BooleanField(default=True)
+    ip_address = models.GenericIPAddressField(null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    is_sent = models.BooleanField(default=False)
+    sent_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_sent=False),
+                name="login_event_unsent_idx",
+            )
+        ]
+
+
 auditlog.register(DummyModel)
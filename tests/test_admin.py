@@ -5,8 +5,11 @@ from django.contrib.admin import AdminSite
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 
-from resilient_logger.admin import ResilientLogEntryAdmin
-from resilient_logger.models import ResilientLogEntry
+from resilient_logger.admin import (
+    ResilientLogArchiveEntryAdmin,
+    ResilientLogEntryAdmin,
+)
+from resilient_logger.models import ResilientLogArchiveEntry, ResilientLogEntry
 
 
 @pytest.fixture(name="superuser", autouse=True)
@@ -24,6 +27,9 @@ def test_resilient_logger_admin_message_prettified(superuser: AbstractUser):
         "is_sent",
         "level",
         "created_at",
+        "attempts",
+        "last_error",
+        "next_attempt_at",
         "message_prettified",
         "context_prettified",
     ]
@@ -40,3 +46,46 @@ def test_resilient_logger_admin_permissions(superuser: AbstractUser):
     assert not model_admin.has_add_permission(request)
     assert not model_admin.has_change_permission(request, log_entry)
     assert not model_admin.has_delete_permission(request, log_entry)
+
+
+@pytest.mark.django_db
+def test_resilient_logger_archive_admin(superuser: AbstractUser):
+    request = Mock(user=superuser)
+    model_admin = ResilientLogArchiveEntryAdmin(ResilientLogArchiveEntry, AdminSite())
+
+    assert list(model_admin.get_fields(request)) == [
+        "id",
+        "level",
+        "created_at",
+        "sent_at",
+        "attempts",
+        "message_prettified",
+        "context_prettified",
+    ]
+    assert not model_admin.has_add_permission(request)
+    assert not model_admin.has_delete_permission(request)
+
+
+@pytest.mark.django_db
+def test_resilient_logger_admin_requeue_parked_entries(superuser: AbstractUser):
+    request = Mock(user=superuser, GET={})
+    parked = ResilientLogEntry.objects.create(
+        message={}, attempts=10, next_attempt_at=None
+    )
+    sent = ResilientLogEntry.objects.create(
+        message={}, is_sent=True, attempts=10, next_attempt_at=None
+    )
+    model_admin = ResilientLogEntryAdmin(ResilientLogEntry, AdminSite())
+    model_admin.message_user = Mock()
+
+    assert "requeue_parked_entries" in model_admin.get_actions(request)
+    model_admin.requeue_parked_entries(request, ResilientLogEntry.objects.all())
+
+    parked.refresh_from_db()
+    sent.refresh_from_db()
+    assert parked.attempts == 0
+    assert parked.next_attempt_at is not None
+    assert sent.next_attempt_at is None
+    model_admin.message_user.assert_called_once_with(
+        request, "Requeued 1 parked entries."
+    )
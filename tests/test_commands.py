@@ -1,12 +1,19 @@
 import logging
+from io import StringIO
+from unittest.mock import patch
 
 import pytest
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.test import override_settings
 
+from resilient_logger.management.commands.run_resilient_logger import (
+    Command as RunResilientLoggerCommand,
+)
 from resilient_logger.models import ResilientLogEntry
+from resilient_logger.resilient_logger import ResilientLogger
 from resilient_logger.sources import ResilientLogSource
 from resilient_logger.utils import get_resilient_logger_config
+from resilient_logger.workers import submit_unsent_entries_worker
 from tests.testdata.testconfig import (
     VALID_CONFIG_ALL_FIELDS,
     VALID_CONFIG_MISSING_OPTIONAL,
@@ -66,16 +73,44 @@ def test_clear_sent_entries(caplog: pytest.LogCaptureFixture):
     with caplog.at_level(logging.INFO, logger=logger_name):
         call_command("clear_sent_entries", days_to_keep=0)
         result = extract_result(caplog.records[1])
-        assert len(result) == num_log_entries
+        assert result == num_log_entries
         caplog.clear()
 
     with caplog.at_level(logging.INFO, logger=logger_name):
         call_command("clear_sent_entries", days_to_keep=0)
         result = extract_result(caplog.records[1])
-        assert len(result) == 0
+        assert result == 0
         caplog.clear()
 
 
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_clear_sent_entries_max_seconds(caplog: pytest.LogCaptureFixture):
+    logger_name = "resilient_logger.management.commands.clear_sent_entries"
+    create_resilient_log_entries(3, True)
+
+    with caplog.at_level(logging.INFO, logger=logger_name):
+        call_command("clear_sent_entries", days_to_keep=0, max_seconds=0)
+        assert extract_result(caplog.records[1]) == 0
+
+    assert ResilientLogEntry.objects.count() == 3
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_requeue_parked_entries(caplog: pytest.LogCaptureFixture):
+    logger_name = "resilient_logger.management.commands.requeue_parked_entries"
+    create_resilient_log_entries(3, False)
+    ResilientLogEntry.objects.update(attempts=10, next_attempt_at=None)
+
+    with caplog.at_level(logging.INFO, logger=logger_name):
+        call_command("requeue_parked_entries")
+        assert extract_result(caplog.records[1]) == 3
+
+    assert not ResilientLogEntry.objects.filter(next_attempt_at__isnull=True).exists()
+    assert not ResilientLogEntry.objects.filter(attempts__gt=0).exists()
+
+
 @pytest.mark.django_db
 @override_settings(RESILIENT_LOGGER=VALID_CONFIG_MISSING_OPTIONAL)
 def test_submit_unsent_entries_disabled(caplog: pytest.LogCaptureFixture):
@@ -109,3 +144,131 @@ def test_clear_sent_entries_disabled(caplog: pytest.LogCaptureFixture):
         assert "clear_sent_entries is disabled in config" in caplog.text
         assert "Begin clear_sent_entries job" not in caplog.text
         assert ResilientLogEntry.objects.filter(is_sent=True).count() == num_log_entries
+
+
+class InlineFuture:
+    def __init__(self, result):
+        self._result = result
+
+    def result(self):
+        return self._result
+
+
+class InlineExecutor:
+    instances: list["InlineExecutor"] = []
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.submitted = 0
+        InlineExecutor.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, fn):
+        self.submitted += 1
+        return InlineFuture(({str(self.submitted): True}, []))
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_unsent_entries_with_workers(caplog: pytest.LogCaptureFixture):
+    logger_name = "resilient_logger.management.commands.submit_unsent_entries"
+    InlineExecutor.instances.clear()
+
+    with (
+        patch(f"{logger_name}.ProcessPoolExecutor", InlineExecutor),
+        caplog.at_level(logging.INFO, logger=logger_name),
+    ):
+        call_command("submit_unsent_entries", workers=3)
+        result = extract_result(caplog.records[1])
+
+    [executor] = InlineExecutor.instances
+    assert executor.max_workers == 3
+    assert executor.submitted == 3
+    assert result == {"1": True, "2": True, "3": True}
+
+
+@pytest.mark.django_db
+@override_settings(
+    RESILIENT_LOGGER={**VALID_CONFIG_ALL_FIELDS, "pipeline_queue_depth": 2}
+)
+def test_submit_unsent_entries_worker_claims_without_pipeline():
+    create_resilient_log_entries(2, False)
+
+    with patch.object(
+        ResilientLogger, "create", wraps=ResilientLogger.create
+    ) as create:
+        results, _ = submit_unsent_entries_worker()
+
+    create.assert_called_once_with(claim_entries=True, pipeline_queue_depth=0)
+    assert len(results) == 2
+    assert all(results.values())
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_unsent_entries_invalid_workers():
+    with pytest.raises(CommandError):
+        call_command("submit_unsent_entries", workers=0)
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_run_resilient_logger_until_stopped():
+    num_log_entries = 10
+    create_resilient_log_entries(num_log_entries, False)
+    waits: list[float] = []
+
+    def wait(self, interval, listener):
+        waits.append(interval)
+
+        if len(waits) == 3:
+            self.resilient_logger.stop()
+
+    with patch.object(RunResilientLoggerCommand, "_wait", wait):
+        call_command("run_resilient_logger", min_interval=1, max_interval=3)
+
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+    # Partial batch submitted, then idle backoff up to the maximum interval
+    assert waits == [1, 2, 3]
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_run_resilient_logger_next_interval():
+    command = RunResilientLoggerCommand()
+    batch_limit = command.resilient_logger.batch_limit
+    full_batch = {str(idx): True for idx in range(batch_limit)}
+
+    assert command._next_interval(8, full_batch, 1, 60) == 0
+    assert command._next_interval(8, {"1": True}, 1, 60) == 1
+    assert command._next_interval(8, {}, 1, 60) == 16
+    assert command._next_interval(0, {"1": False}, 1, 60) == 2
+    assert command._next_interval(40, {}, 1, 60) == 60
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_MISSING_OPTIONAL)
+def test_run_resilient_logger_disabled(caplog: pytest.LogCaptureFixture):
+    logger_name = "resilient_logger.management.commands.run_resilient_logger"
+
+    with caplog.at_level(logging.INFO, logger=logger_name):
+        call_command("run_resilient_logger")
+
+    assert "submit_unsent_entries is disabled in config" in caplog.text
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_explain_resilient_logger():
+    stdout = StringIO()
+    call_command("explain_resilient_logger", stdout=stdout)
+    output = stdout.getvalue()
+
+    assert "== ResilientLogSource: fetch ==" in output
+    assert "== ResilientLogSource: clear ==" in output
+    assert "resilient_log_unsent_idx" in output
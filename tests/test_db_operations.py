@@ -0,0 +1,47 @@
+from django.db import models
+
+from resilient_logger.db_operations import (
+    AddPartialIndexConcurrently,
+    RemovePartialIndexConcurrently,
+)
+
+
+def create_operation() -> AddPartialIndexConcurrently:
+    return AddPartialIndexConcurrently(
+        model_name="resilientlogentry",
+        index=models.Index(
+            condition=models.Q(is_sent=False, next_attempt_at__isnull=False),
+            fields=["created_at", "id"],
+            name="resilient_log_unsent_idx",
+        ),
+        fallback_fields=["is_sent", "next_attempt_at"],
+    )
+
+
+def test_deconstruct_keeps_fallback_fields():
+    name, args, kwargs = create_operation().deconstruct()
+
+    assert name == "AddPartialIndexConcurrently"
+    assert kwargs["fallback_fields"] == ["is_sent", "next_attempt_at"]
+    assert kwargs["index"].name == "resilient_log_unsent_idx"
+
+
+def test_remove_deconstruct_keeps_fallback_fields():
+    operation = RemovePartialIndexConcurrently(
+        model_name="resilientlogentry",
+        name="resilient_log_unsent_idx",
+        fallback_fields=["is_sent"],
+    )
+    name, args, kwargs = operation.deconstruct()
+
+    assert name == "RemovePartialIndexConcurrently"
+    assert kwargs["name"] == "resilient_log_unsent_idx"
+    assert kwargs["fallback_fields"] == ["is_sent"]
+
+
+def test_fallback_index_leads_with_condition_fields():
+    index = create_operation()._fallback_index()
+
+    assert index.fields == ["is_sent", "next_attempt_at", "created_at", "id"]
+    assert index.name == "resilient_log_unsent_idx"
+    assert index.condition is None
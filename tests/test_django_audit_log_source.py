@@ -3,12 +3,20 @@ from unittest.mock import patch
 
 import pytest
 from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
+from resilient_logger.models import AuditLogDelivery
+from resilient_logger.retry_policy import RetryPolicy
 from resilient_logger.sources import DjangoAuditLogSource
 from resilient_logger.sources.django_audit_log_source_entry import (
     DjangoAuditLogSourceEntry,
 )
+from resilient_logger.utils import content_hash, get_resilient_logger_config
 from tests.models import DummyModel
 from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
 
@@ -18,6 +26,26 @@ def log_source():
     return DjangoAuditLogSource()
 
 
+@pytest.fixture
+def delivery_source():
+    config = {
+        **VALID_CONFIG_ALL_FIELDS,
+        "sources": [
+            {
+                "class": "resilient_logger.sources.DjangoAuditLogSource",
+                "tracking": "delivery_table",
+            }
+        ],
+    }
+
+    get_resilient_logger_config.cache_clear()
+
+    with override_settings(RESILIENT_LOGGER=config):
+        yield DjangoAuditLogSource(tracking="delivery_table")
+
+    get_resilient_logger_config.cache_clear()
+
+
 def create_objects(count: int) -> list[DummyModel]:
     results: list[DummyModel] = []
 
@@ -27,6 +55,10 @@ def create_objects(count: int) -> list[DummyModel]:
     return results
 
 
+def reload_auditlog_source_entry(log: LogEntry) -> DjangoAuditLogSourceEntry:
+    return DjangoAuditLogSourceEntry(LogEntry.objects.get(id=log.id))
+
+
 def object_to_auditlog_source(model: DummyModel) -> DjangoAuditLogSource:
     entry = LogEntry.objects.get(object_pk=model.id)
     return DjangoAuditLogSourceEntry(entry)
@@ -73,6 +105,49 @@ def test_get_unsent_entries(log_source):
         assert log_entry.additional_data["is_sent"]
 
 
+@pytest.mark.django_db
+def test_get_unsent_chunk(log_source):
+    objects = create_objects(5)
+    object_to_auditlog_source(objects[0]).mark_sent()
+
+    first = log_source.get_unsent_chunk(2)
+    second = log_source.get_unsent_chunk(2, after=first[-1])
+    third = log_source.get_unsent_chunk(2, after=second[-1])
+
+    chunk_ids = [entry.get_id() for entry in [*first, *second, *third]]
+    expected_ids = [object_to_auditlog_source(obj).get_id() for obj in objects[1:]]
+    assert chunk_ids == expected_ids
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_get_unsent_entries_with_keyset_pagination(log_source):
+    objects = create_objects(5)
+    LogEntry.objects.update(timestamp=timezone.now())
+
+    keyset_source = DjangoAuditLogSource(keyset_pagination=True)
+    keyset_entries = list(keyset_source.get_unsent_entries(2))
+    cursor_entries = list(log_source.get_unsent_entries(2))
+
+    assert len(keyset_entries) == len(objects)
+    assert [entry.get_id() for entry in keyset_entries] == [
+        entry.get_id() for entry in cursor_entries
+    ]
+
+
+@pytest.mark.django_db
+def test_mark_sent_many(log_source):
+    objects = create_objects(3)
+    entries = [object_to_auditlog_source(obj) for obj in objects]
+
+    log_source.mark_sent_many([entry.get_id() for entry in entries[:2]])
+
+    for entry in entries:
+        entry.log.refresh_from_db()
+
+    assert [entry.is_sent() for entry in entries] == [True, True, False]
+
+
 @pytest.mark.django_db
 @override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
 def test_clear_sent_entries(log_source):
@@ -83,17 +158,9 @@ def test_clear_sent_entries(log_source):
     for actual_entry in actual_entries:
         actual_entry.mark_sent()
 
-    actual_ids = [str(entry.get_id()) for entry in actual_entries]
-    cleaned_ids = log_source.clear_sent_entries(0)
-
-    assert len(actual_ids) == num_objects
-    assert len(cleaned_ids) == num_objects
-
-    for cleaned_id in cleaned_ids:
-        assert cleaned_id in actual_ids
-
-    cleaned_ids = log_source.clear_sent_entries(0)
-    assert len(cleaned_ids) == 0
+    assert log_source.clear_sent_entries(0, chunk_size=2) == num_objects
+    assert not LogEntry.objects.exists()
+    assert log_source.clear_sent_entries(0) == 0
 
 
 @pytest.mark.django_db
@@ -118,6 +185,166 @@ def test_changes_str_fallback():
     assert True
 
 
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_get_unsent_chunk_resolves_actors_once(log_source):
+    user_model = get_user_model()
+    first = user_model.objects.create(
+        username="first", first_name="First", last_name="User", email="first@a.fi"
+    )
+    second = user_model.objects.create(username="second", email="second@a.fi")
+    objects = create_objects(5)
+    LogEntry.objects.filter(object_pk__in=[obj.id for obj in objects[:3]]).update(
+        actor=first
+    )
+    LogEntry.objects.filter(object_pk=objects[3].id).update(actor=second)
+
+    with CaptureQueriesContext(connection) as context:
+        entries = log_source.get_unsent_chunk(3)
+        entries += log_source.get_unsent_chunk(3, after=entries[-1])
+
+    # Two chunks and the two distinct actors, each fetched only once
+    assert len(context.captured_queries) == 4
+
+    actors = [entry.get_document()["audit_event"]["actor"] for entry in entries]
+    assert actors == [
+        *[{"name": "First User", "email": "first@a.fi"}] * 3,
+        {"name": "", "email": "second@a.fi"},
+        {"name": None, "email": None},
+    ]
+
+    for entry in entries:
+        assert (
+            entry.get_document()
+            == reload_auditlog_source_entry(entry.log).get_document()
+        )
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_idempotency_key_is_stable():
+    objects = create_objects(2)
+    first = object_to_auditlog_source(objects[0])
+
+    assert first.get_idempotency_key() == (
+        object_to_auditlog_source(objects[0]).get_idempotency_key()
+    )
+    assert first.get_idempotency_key() != (
+        object_to_auditlog_source(objects[1]).get_idempotency_key()
+    )
+    # The document ids of the entries sent before the upgrade stay the same
+    assert first.get_idempotency_key() == content_hash(first.get_shared_document())
+
+
+def test_invalid_tracking():
+    with pytest.raises(ValueError):
+        DjangoAuditLogSource(tracking="unknown")
+
+
+@pytest.mark.django_db
+def test_delivery_table_not_used_by_default(log_source):
+    create_objects(2)
+
+    assert AuditLogDelivery.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_delivery_table_get_unsent_entries(delivery_source):
+    objects = create_objects(5)
+    log_ids = [object_to_auditlog_source(obj).get_id() for obj in objects]
+
+    assert (
+        list(
+            AuditLogDelivery.objects.order_by("log_entry_id").values_list(
+                "log_entry_id", flat=True
+            )
+        )
+        == log_ids
+    )
+
+    entries = list(delivery_source.get_unsent_entries(2))
+    assert [entry.get_id() for entry in entries] == log_ids
+    assert not entries[0].is_sent()
+
+    delivery_source.mark_sent_many(log_ids[:3])
+
+    entries = list(delivery_source.get_unsent_entries(2))
+    assert [entry.get_id() for entry in entries] == log_ids[3:]
+
+    # The log entries themselves are not modified
+    for log_entry in LogEntry.objects.all():
+        assert not log_entry.additional_data
+
+
+@pytest.mark.django_db
+def test_delivery_table_mark_sent(delivery_source):
+    create_objects(1)
+    [entry] = delivery_source.get_unsent_chunk(10)
+
+    entry.mark_sent()
+
+    assert entry.is_sent()
+    assert delivery_source.get_unsent_chunk(10) == []
+
+
+@pytest.mark.django_db
+def test_delivery_table_mark_failed_many(delivery_source):
+    create_objects(2)
+    [failed, other] = delivery_source.get_unsent_chunk(10)
+
+    policy = RetryPolicy(base_delay=60, max_attempts=1, jitter=0)
+    delivery_source.mark_failed_many({failed.get_id(): "Rejected"}, policy)
+
+    delivery = AuditLogDelivery.objects.get(log_entry_id=failed.get_id())
+    assert delivery.attempts == 1
+    assert delivery.last_error == "Rejected"
+    assert delivery.next_attempt_at is None
+
+    entries = delivery_source.get_unsent_chunk(10)
+    assert [entry.get_id() for entry in entries] == [other.get_id()]
+
+
+@pytest.mark.django_db
+def test_delivery_table_removes_orphans(delivery_source):
+    objects = create_objects(2)
+    LogEntry.objects.filter(object_pk=objects[0].id).delete()
+
+    entries = delivery_source.get_unsent_chunk(10)
+
+    assert len(entries) == 1
+    assert AuditLogDelivery.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_delivery_table_clear_sent_entries(delivery_source):
+    objects = create_objects(3)
+    sent_id = object_to_auditlog_source(objects[0]).get_id()
+    delivery_source.mark_sent_many([sent_id])
+
+    assert delivery_source.clear_sent_entries(0) == 1
+    assert not LogEntry.objects.filter(id=sent_id).exists()
+    assert LogEntry.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_enqueue_unsent_audit_log_entries(log_source):
+    objects = create_objects(3)
+    object_to_auditlog_source(objects[0]).mark_sent()
+
+    call_command("enqueue_unsent_audit_log_entries", "--chunk-size=1")
+    call_command("enqueue_unsent_audit_log_entries")
+
+    expected_ids = [object_to_auditlog_source(obj).get_id() for obj in objects[1:]]
+    assert (
+        list(
+            AuditLogDelivery.objects.order_by("log_entry_id").values_list(
+                "log_entry_id", flat=True
+            )
+        )
+        == expected_ids
+    )
+
+
 def test_optional_django_audit_log():
     with patch.dict(
         "sys.modules", {"resilient_logger.sources.django_audit_log_source": None}
@@ -1,8 +1,13 @@
+import json
 from base64 import b64encode
+from unittest.mock import patch
 
 import pytest
+from django.test import override_settings
 
+from resilient_logger.sources import ResilientLogSource
 from resilient_logger.targets import ElasticsearchLogTarget
+from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
 
 scheme = "https"
 host = "host"
@@ -98,3 +103,80 @@ def test_create_parts_without_scheme():
     assert node.port == port
     assert target._index == index
     assert authorization == expected_authorization
+
+
+def create_target() -> ElasticsearchLogTarget:
+    return ElasticsearchLogTarget(
+        es_url=f"{scheme}://{host}:{port}",
+        es_username=username,
+        es_password=password,
+        es_index=index,
+    )
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_batch_uses_bulk_api():
+    target = create_target()
+    entries = [
+        ResilientLogSource.create_structured(message="Hello", extra={"index": idx})
+        for idx in range(5)
+    ]
+    items = [
+        {"create": {"status": 201}},
+        {"create": {"status": 409}},
+        {"create": {"status": 400, "error": {"type": "mapper_parsing_exception"}}},
+        {"create": {"status": 429, "error": {"type": "es_rejected_execution"}}},
+        {"create": {"status": 503, "error": {"type": "unavailable_shards"}}},
+    ]
+
+    with patch.object(target._client, "bulk", return_value={"items": items}) as bulk:
+        results = target.submit_batch(entries)
+
+    assert results == [True, True, False, None, None]
+    bulk.assert_called_once()
+
+    operations = bulk.call_args.kwargs["operations"]
+    assert len(operations) == 2 * len(entries)
+
+    for idx, entry in enumerate(entries):
+        action, document = operations[2 * idx], operations[2 * idx + 1]
+        assert action == {"create": {"_index": index, "_id": entry.log.idempotency_key}}
+        assert document == entry.get_serialized_document()
+        assert json.loads(document) == entry.get_document()
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_sends_serialized_document():
+    target = create_target()
+    entry = ResilientLogSource.create_structured(message="Hello")
+
+    with patch.object(
+        target._client, "index", return_value={"result": "created"}
+    ) as index_:
+        assert target.submit(entry)
+
+    assert index_.call_args.kwargs["document"] == entry.get_serialized_document()
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_batch_request_failure():
+    target = create_target()
+    entries = [
+        ResilientLogSource.create_structured(message="Hello", extra={"index": idx})
+        for idx in range(2)
+    ]
+
+    with patch.object(target._client, "bulk", side_effect=ConnectionError()):
+        assert target.submit_batch(entries) == [None, None]
+
+
+def test_submit_batch_empty():
+    target = create_target()
+
+    with patch.object(target._client, "bulk") as bulk:
+        assert target.submit_batch([]) == []
+
+    bulk.assert_not_called()
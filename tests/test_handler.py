@@ -1,11 +1,18 @@
 import logging
+import time
 from contextlib import nullcontext as does_not_raise
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.test import override_settings
 
 from resilient_logger.errors import MissingContextError
-from resilient_logger.handlers import ResilientLogHandler
+from resilient_logger.handlers import (
+    AsyncResilientLogHandler,
+    BufferedResilientLogHandler,
+    ResilientLogHandler,
+)
+from resilient_logger.models import ResilientLogEntry
 from tests.testdata.testconfig import (
     VALID_CONFIG_ALL_FIELDS,
 )
@@ -74,3 +81,137 @@ def test_with_required_fields_without_extras():
 
     with expectation:
         logger.info("Hello World!", extra=extra)
+
+
+def create_buffered_logger(**kwargs) -> tuple[logging.Logger, logging.Handler]:
+    handler = BufferedResilientLogHandler(logging.INFO, **kwargs)
+    logger = logging.Logger(__name__)
+    logger.addHandler(handler)
+
+    return logger, handler
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_buffered_handler_stores_on_flush():
+    logger, handler = create_buffered_logger(flush_size=100, flush_interval=60)
+
+    for i in range(3):
+        logger.info("Hello World!", extra={"index": i})
+
+    handler.flush()
+
+    entries = ResilientLogEntry.objects.order_by("id")
+    assert [entry.context["index"] for entry in entries] == [0, 1, 2]
+    assert entries[0].message == "Hello World!"
+
+    handler.close()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_buffered_handler_flushes_in_background():
+    logger, handler = create_buffered_logger(flush_size=2, flush_interval=60)
+
+    logger.info("First")
+    logger.info("Second")
+
+    for _ in range(100):
+        if ResilientLogEntry.objects.count() == 2:
+            break
+
+        time.sleep(0.05)
+
+    assert ResilientLogEntry.objects.count() == 2
+
+    handler.close()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_buffered_handler_stores_on_close():
+    logger, handler = create_buffered_logger(flush_size=100, flush_interval=60)
+
+    logger.info("Hello World!")
+    handler.close()
+
+    assert ResilientLogEntry.objects.count() == 1
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_buffered_handler_requires_fields():
+    logger, handler = create_buffered_logger(required_fields=["foo"])
+
+    with pytest.raises(MissingContextError):
+        logger.info("Hello World!")
+
+    handler.close()
+
+
+@pytest.mark.parametrize(
+    "overflow,expected",
+    [("drop_newest", ["0", "1"]), ("drop_oldest", ["2", "3"])],
+)
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_buffered_handler_overflow(overflow: str, expected: list[str]):
+    handler = BufferedResilientLogHandler(
+        logging.INFO, queue_size=2, flush_size=100, overflow=overflow
+    )
+    # Keep the background thread from storing the records
+    handler._worker_pid = 0
+
+    logger = logging.Logger(__name__)
+    logger.addHandler(handler)
+
+    for i in range(4):
+        logger.info(str(i))
+
+    assert handler.dropped == 2
+    handler.flush()
+
+    messages = list(ResilientLogEntry.objects.order_by("id").values_list("message"))
+    assert [message for (message,) in messages] == [
+        *expected,
+        "Dropped 2 log records, the log queue was full.",
+    ]
+    assert handler.dropped == 0
+
+    handler.close()
+
+
+def test_buffered_handler_invalid_overflow():
+    with pytest.raises(ValueError):
+        BufferedResilientLogHandler(overflow="unknown")
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_async_handler_schedules_write_on_loop():
+    handler = AsyncResilientLogHandler(logging.INFO)
+    logger = logging.Logger(__name__)
+    logger.addHandler(handler)
+
+    async def log() -> int:
+        logger.info("Hello World!", extra={"foo": "bar"})
+        scheduled = len(handler._tasks)
+        await handler.aflush()
+        return scheduled
+
+    assert async_to_sync(log)() == 1
+
+    [entry] = ResilientLogEntry.objects.all()
+    assert entry.message == "Hello World!"
+    assert entry.context == {"foo": "bar"}
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_async_handler_without_loop():
+    logger = logging.Logger(__name__)
+    logger.addHandler(AsyncResilientLogHandler(logging.INFO))
+
+    logger.info("Hello World!")
+
+    assert ResilientLogEntry.objects.count() == 1
@@ -0,0 +1,95 @@
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from resilient_logger.middleware import ResilientLogBatchMiddleware
+from resilient_logger.models import ResilientLogEntry
+from resilient_logger.sources import ResilientLogSource
+
+
+def log_entries(count: int) -> None:
+    for idx in range(count):
+        ResilientLogSource.create_structured(message="Hello world", extra={"idx": idx})
+
+
+@pytest.mark.django_db(transaction=True)
+def test_middleware_saves_entries_at_end_of_request():
+    def view(request):
+        log_entries(3)
+        assert ResilientLogEntry.objects.count() == 0
+        return HttpResponse()
+
+    middleware = ResilientLogBatchMiddleware(view)
+    middleware(RequestFactory().get("/"))
+
+    assert ResilientLogEntry.objects.count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_middleware_saves_entries_when_view_fails():
+    def view(request):
+        log_entries(2)
+        raise ValueError("Failed")
+
+    middleware = ResilientLogBatchMiddleware(view)
+
+    with pytest.raises(ValueError):
+        middleware(RequestFactory().get("/"))
+
+    assert ResilientLogEntry.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("fail", [False, True])
+def test_middleware_binds_entries_to_request_transaction(fail: bool):
+    # Like ATOMIC_REQUESTS, the transaction ends before the middleware
+    @transaction.atomic
+    def view(request):
+        log_entries(2)
+
+        if fail:
+            raise ValueError("Failed")
+
+        return HttpResponse()
+
+    middleware = ResilientLogBatchMiddleware(view)
+
+    if fail:
+        with pytest.raises(ValueError):
+            middleware(RequestFactory().get("/"))
+    else:
+        middleware(RequestFactory().get("/"))
+
+    assert ResilientLogEntry.objects.count() == (0 if fail else 2)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_discards_entries_of_rolled_back_savepoint():
+    with transaction.atomic(), ResilientLogSource.batch():
+        log_entries(1)
+
+        try:
+            with transaction.atomic():
+                log_entries(2)
+                raise ValueError("Failed")
+        except ValueError:
+            pass
+
+        assert ResilientLogEntry.objects.count() == 0
+
+    assert ResilientLogEntry.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_middleware_saves_entries_at_end_of_request():
+    async def view(request):
+        await sync_to_async(log_entries)(3)
+        assert await ResilientLogEntry.objects.acount() == 0
+        return HttpResponse()
+
+    middleware = ResilientLogBatchMiddleware(view)
+    async_to_sync(middleware)(RequestFactory().get("/"))
+
+    assert ResilientLogEntry.objects.count() == 3
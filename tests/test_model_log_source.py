@@ -0,0 +1,153 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from resilient_logger.resilient_logger import ResilientLogger
+from resilient_logger.sources import ModelLogSource
+from resilient_logger.utils import get_resilient_logger_config
+from tests.models import LoginEvent
+from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
+
+FIELDS = {"message": "username", "actor": "user"}
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    get_resilient_logger_config.cache_clear()
+
+
+def create_source(**kwargs) -> ModelLogSource:
+    return ModelLogSource(
+        model="tests.LoginEvent",
+        fields=FIELDS,
+        extra_fields=["ip_address"],
+        **kwargs,
+    )
+
+
+def create_events(count: int) -> list[LoginEvent]:
+    created_at = timezone.now()
+
+    return LoginEvent.objects.bulk_create(
+        LoginEvent(username=f"user{idx}", ip_address="127.0.0.1", created_at=created_at)
+        for idx in range(count)
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"tracking": "unknown"},
+        {"fields": {"actor": "user"}},
+        {"fields": {"message": "username", "unknown": "username"}},
+        {"fields": {"message": "unknown"}},
+        {"timestamp_field": "unknown"},
+    ],
+)
+def test_invalid_configuration(kwargs):
+    with pytest.raises(ValueError):
+        ModelLogSource(**{"model": "tests.LoginEvent", "fields": FIELDS, **kwargs})
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_get_document():
+    user = get_user_model().objects.create(username="user")
+    event = LoginEvent.objects.create(
+        username="user", user=user, ip_address="127.0.0.1"
+    )
+    [entry] = create_source(operation="LOGIN").get_unsent_chunk(10)
+    iso_date = (
+        event.created_at.astimezone(datetime.timezone.utc)
+        .isoformat(timespec="milliseconds")
+        .replace("+00:00", "Z")
+    )
+
+    assert entry.get_id() == event.id
+    assert entry.get_document() == {
+        "@timestamp": iso_date,
+        "audit_event": {
+            "actor": {"value": str(user.id)},
+            "date_time": iso_date,
+            "operation": "LOGIN",
+            "origin": "test",
+            "target": {"value": "unknown"},
+            "environment": "dev",
+            "message": "user",
+            "level": None,
+            "extra": {
+                "ip_address": "127.0.0.1",
+                "source_model": "tests.LoginEvent",
+                "source_pk": event.id,
+            },
+        },
+    }
+    assert entry.get_idempotency_key() == entry.get_idempotency_key()
+
+
+@pytest.mark.django_db
+def test_get_unsent_chunk_fetches_only_mapped_fields():
+    events = create_events(5)
+    events[0].is_sent = True
+    events[0].save()
+    log_source = create_source()
+
+    with CaptureQueriesContext(connection) as context:
+        entries = list(log_source.get_unsent_entries(2))
+
+    # Keyset paginated chunks of two entries
+    selects = [q for q in context.captured_queries if q["sql"].startswith("SELECT")]
+    assert len(selects) == 3
+    assert '"sent_at"' not in selects[0]["sql"]
+    assert [entry.get_id() for entry in entries] == [event.id for event in events[1:]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"tracking": "timestamp", "sent_field": "sent_at"}]
+)
+def test_mark_sent_and_clear(kwargs):
+    events = create_events(4)
+    log_source = create_source(**kwargs)
+
+    log_source.mark_sent_many([events[0].id, events[1].id])
+    [entry, *_] = log_source.get_unsent_chunk(10)
+    assert entry.get_id() == events[2].id
+    assert not entry.is_sent()
+
+    entry.mark_sent()
+    assert entry.is_sent()
+    assert [entry.get_id() for entry in log_source.get_unsent_chunk(10)] == [
+        events[3].id
+    ]
+
+    LoginEvent.objects.update(created_at=timezone.now() - datetime.timedelta(days=2))
+    assert log_source.clear_sent_entries(days_to_keep=1, chunk_size=2) == 3
+    assert list(LoginEvent.objects.values_list("id", flat=True)) == [events[3].id]
+
+
+@pytest.mark.django_db
+def test_submit_from_config():
+    create_events(3)
+    config = {
+        **VALID_CONFIG_ALL_FIELDS,
+        "sources": [
+            {
+                "class": "resilient_logger.sources.ModelLogSource",
+                "model": "tests.LoginEvent",
+                "fields": {"message": "username"},
+            }
+        ],
+    }
+
+    with override_settings(RESILIENT_LOGGER=config):
+        results = ResilientLogger.create().submit_unsent_entries()
+
+    assert len(results) == 3
+    assert all(results.values())
+    assert not LoginEvent.objects.filter(is_sent=False).exists()
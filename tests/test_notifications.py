@@ -0,0 +1,76 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from django.db import OperationalError
+
+from resilient_logger.notifications import NotificationListener
+
+
+class Psycopg3Connection:
+    def __init__(self, pending: int) -> None:
+        self.pending = pending
+        self.calls: list[dict] = []
+
+    def notifies(self, timeout: float, stop_after: int | None = None):
+        self.calls.append({"timeout": timeout, "stop_after": stop_after})
+
+        while self.pending and (stop_after is None or stop_after > 0):
+            self.pending -= 1
+
+            if stop_after is not None:
+                stop_after -= 1
+
+            yield Mock()
+
+
+def create_listener(raw_connection) -> NotificationListener:
+    listener = NotificationListener()
+    listener._connection = Mock(connection=raw_connection)
+    listener._connection.Database.Error = OperationalError
+    return listener
+
+
+def test_wait_drains_pending_notifications():
+    raw_connection = Psycopg3Connection(pending=3)
+    listener = create_listener(raw_connection)
+
+    assert listener.wait(1.0)
+    assert raw_connection.pending == 0
+    assert raw_connection.calls == [
+        {"timeout": 1.0, "stop_after": 1},
+        {"timeout": 0, "stop_after": None},
+    ]
+
+    assert not listener.wait(1.0)
+
+
+@patch("resilient_logger.notifications.time.sleep")
+def test_wait_reconnects_lost_connection(sleep: Mock):
+    raw_connection = Mock()
+    raw_connection.notifies.side_effect = OperationalError("server closed")
+    listener = create_listener(raw_connection)
+
+    def close():
+        listener._connection.connection = None
+
+    listener._connection.close.side_effect = close
+    listener.listen = Mock()
+
+    assert not listener.wait(0.5)
+    sleep.assert_called_once_with(0.5)
+    listener.listen.assert_not_called()
+
+    # Notifications may have been missed while the connection was down
+    assert listener.wait(0.5)
+    listener.listen.assert_called_once()
+
+
+@pytest.mark.parametrize("error", [OperationalError("down"), OSError("down")])
+@patch("resilient_logger.notifications.time.sleep")
+def test_wait_survives_failed_reconnect(sleep: Mock, error: Exception):
+    listener = create_listener(None)
+    listener.listen = Mock(side_effect=error)
+
+    assert not listener.wait(1.0)
+    assert not listener.wait(1.0)
+    assert listener.listen.call_count == 2
@@ -0,0 +1,294 @@
+import datetime
+from unittest.mock import call, patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+
+from resilient_logger.models import ResilientLogEntry
+from resilient_logger.partitioning import (
+    convert_to_partitioned,
+    create_partitions,
+    drop_sent_partitions,
+    get_partition_name,
+    get_partition_ranges,
+    get_partition_start,
+    is_partitioned,
+)
+from resilient_logger.utils import get_resilient_logger_config
+from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
+
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    get_resilient_logger_config.cache_clear()
+    yield
+    get_resilient_logger_config.cache_clear()
+
+
+def test_partition_start():
+    moment = datetime.datetime(2026, 10, 18, 13, 30, tzinfo=UTC)
+
+    assert get_partition_start("monthly", moment) == datetime.datetime(
+        2026, 10, 1, tzinfo=UTC
+    )
+    assert get_partition_start("daily", moment) == datetime.datetime(
+        2026, 10, 18, tzinfo=UTC
+    )
+
+    with pytest.raises(ValueError):
+        get_partition_start("weekly", moment)
+
+
+def test_monthly_partition_ranges_cross_year():
+    ranges = get_partition_ranges(
+        "monthly",
+        datetime.datetime(2026, 11, 15, tzinfo=UTC),
+        datetime.datetime(2027, 1, 1, tzinfo=UTC),
+    )
+
+    assert [(start.date(), end.date()) for start, end in ranges] == [
+        (datetime.date(2026, 11, 1), datetime.date(2026, 12, 1)),
+        (datetime.date(2026, 12, 1), datetime.date(2027, 1, 1)),
+        (datetime.date(2027, 1, 1), datetime.date(2027, 2, 1)),
+    ]
+
+
+def test_partition_name():
+    start = datetime.datetime(2026, 10, 1, tzinfo=UTC)
+
+    assert get_partition_name("monthly", start).endswith("_p202610")
+    assert get_partition_name("daily", start).endswith("_p20261001")
+
+
+@pytest.mark.django_db
+def test_partitioning_is_postgresql_only():
+    assert not is_partitioned()
+    assert drop_sent_partitions(datetime.datetime.now(UTC)) == 0
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection") -> None:
+        self.connection = connection
+        self.rows: list[tuple] = []
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql: str, params: list | None = None) -> None:
+        self.connection.executed.append((sql, params))
+        self.rows = self.connection.respond(sql, params)
+        self.rowcount = len(self.rows)
+
+    def fetchone(self) -> tuple | None:
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+class FakeConnection:
+    """Records the SQL executed on a PostgreSQL connection."""
+
+    vendor = "postgresql"
+    alias = "default"
+    ops = type("Ops", (), {"quote_name": staticmethod(lambda name: name)})
+
+    def __init__(self, respond) -> None:
+        self.respond = respond
+        self.executed: list[tuple[str, list | None]] = []
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def statements(self, prefix: str) -> list[tuple[str, list | None]]:
+        return [
+            (sql, params) for sql, params in self.executed if sql.startswith(prefix)
+        ]
+
+
+@pytest.fixture
+def atomic():
+    with patch("resilient_logger.partitioning.transaction.atomic") as atomic:
+        yield atomic
+
+
+def use_connection(monkeypatch: pytest.MonkeyPatch, respond) -> FakeConnection:
+    connection = FakeConnection(respond)
+    monkeypatch.setattr(
+        "resilient_logger.partitioning.connections", {"default": connection}
+    )
+    return connection
+
+
+def test_create_partitions_premake(monkeypatch: pytest.MonkeyPatch, atomic):
+    def respond(sql, params):
+        return [(None,)] if sql.startswith("SELECT to_regclass") else []
+
+    connection = use_connection(monkeypatch, respond)
+
+    names = create_partitions(
+        "daily", 2, now=datetime.datetime(2026, 10, 18, 12, tzinfo=UTC)
+    )
+
+    assert [name[-8:] for name in names] == ["20261018", "20261019", "20261020"]
+    created = connection.statements("CREATE TABLE")
+    assert created[0][1] == [
+        datetime.datetime(2026, 10, 18, tzinfo=UTC),
+        datetime.datetime(2026, 10, 19, tzinfo=UTC),
+    ]
+    assert not connection.statements("ALTER TABLE")
+    assert atomic.call_count == 3
+
+
+def test_create_partitions_moves_rows_from_default_partition(
+    monkeypatch: pytest.MonkeyPatch, atomic
+):
+    table = ResilientLogEntry._meta.db_table
+    default = f"{table}_default"
+    day = datetime.datetime(2026, 10, 18, tzinfo=UTC)
+
+    def respond(sql, params):
+        if "pg_inherits" in sql:
+            return [(default, "DEFAULT")]
+
+        if sql.startswith("SELECT to_regclass"):
+            return [(None,)]
+
+        if sql.startswith(f"SELECT 1 FROM {default}"):
+            # Only the first day has rows in the default partition
+            return [(1,)] if params[0] == day else []
+
+        return []
+
+    connection = use_connection(monkeypatch, respond)
+    names = create_partitions("daily", 1, now=day)
+
+    assert len(names) == 2
+    assert [sql for sql, _ in connection.statements("ALTER TABLE")] == [
+        f"ALTER TABLE {table} DETACH PARTITION {default}",
+        f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT",
+    ]
+    [(moving, params)] = connection.statements("WITH moved")
+    assert f"DELETE FROM {default}" in moving
+    assert f"INSERT INTO {names[0]}" in moving
+    assert params == [day, day + datetime.timedelta(days=1)]
+
+    # The partition is created between detaching and attaching the default
+    executed = [sql for sql, _ in connection.executed]
+    detach = executed.index(f"ALTER TABLE {table} DETACH PARTITION {default}")
+    assert executed[detach + 1].startswith(f"CREATE TABLE {names[0]} PARTITION OF")
+    assert len(connection.statements("CREATE TABLE")) == 2
+
+
+def test_drop_sent_partitions_in_own_transactions(
+    monkeypatch: pytest.MonkeyPatch, atomic
+):
+    table = ResilientLogEntry._meta.db_table
+    partitions = [
+        (
+            f"{table}_p20261016",
+            "FOR VALUES FROM ('2026-10-16 00:00:00+00') TO ('2026-10-17 00:00:00+00')",
+        ),
+        (
+            f"{table}_p20261017",
+            "FOR VALUES FROM ('2026-10-17 00:00:00+00') TO ('2026-10-18 00:00:00+00')",
+        ),
+        (
+            f"{table}_p20261018",
+            "FOR VALUES FROM ('2026-10-18 00:00:00+00') TO ('2026-10-19 00:00:00+00')",
+        ),
+        (f"{table}_default", "DEFAULT"),
+    ]
+
+    def respond(sql, params):
+        if sql.startswith("SELECT 1 FROM pg_partitioned_table"):
+            return [(1,)]
+
+        if "pg_inherits" in sql:
+            return partitions
+
+        if sql.startswith("SELECT count(*), count(*) FILTER (WHERE NOT is_sent)"):
+            # The second partition still has an unsent entry
+            return [(5, 1)] if f"{table}_p20261017" in sql else [(3, 0)]
+
+        return []
+
+    connection = use_connection(monkeypatch, respond)
+    dropped = drop_sent_partitions(datetime.datetime(2026, 10, 18, tzinfo=UTC))
+
+    assert dropped == 3
+    assert [sql for sql, _ in connection.statements("DROP TABLE")] == [
+        f"DROP TABLE {table}_p20261016"
+    ]
+    assert atomic.call_args_list == [call(using="default", durable=True)] * 2
+
+
+@pytest.mark.django_db
+def test_convert_to_partitioned_recreates_model_indexes(
+    monkeypatch: pytest.MonkeyPatch, atomic
+):
+    table = ResilientLogEntry._meta.db_table
+    old_table = f"{table}_unpartitioned"
+
+    def respond(sql, params):
+        if sql.startswith("SELECT min(created_at)"):
+            return [(None, 0)]
+
+        if sql.startswith("SELECT conname FROM pg_constraint"):
+            return [(f"{table}_pkey",)]
+
+        if sql.startswith("SELECT indexname FROM pg_indexes"):
+            return [("resilient_log_retry_idx",), (f"{table}_created_at_idx",)]
+
+        if sql.startswith("SELECT to_regclass"):
+            return [(None,)]
+
+        return []
+
+    fake_connection = use_connection(monkeypatch, respond)
+    # The names are the same on every database, only the SQL differs
+    fake_connection.schema_editor = connection.schema_editor
+    convert_to_partitioned("monthly", 0)
+
+    executed = [sql for sql, _ in fake_connection.executed]
+    assert f"ALTER TABLE {old_table} DROP CONSTRAINT {table}_pkey" in executed
+    assert "DROP INDEX resilient_log_retry_idx" in executed
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+
+    index_names = {
+        name
+        for name, constraint in constraints.items()
+        if constraint["index"] and not constraint["primary_key"]
+    }
+    created = "\n".join(sql for sql in executed if sql.startswith("CREATE INDEX"))
+
+    assert index_names
+    for name in index_names:
+        assert f'"{name}"' in created
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_create_partitions_command_not_configured():
+    with pytest.raises(CommandError, match="not configured"):
+        call_command("create_resilient_log_partitions")
+
+
+@pytest.mark.django_db
+@override_settings(
+    RESILIENT_LOGGER={**VALID_CONFIG_ALL_FIELDS, "partitioning": {"interval": "daily"}}
+)
+def test_create_partitions_command_requires_postgresql():
+    with pytest.raises(CommandError, match="requires PostgreSQL"):
+        call_command("create_resilient_log_partitions")
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from resilient_logger.pipeline import Pipeline
+
+
+def test_pipeline_stages():
+    consumed: list[int] = []
+
+    with Pipeline(queue_depth=2) as pipeline:
+        produced = pipeline.produce(lambda: range(10))
+        doubled = pipeline.map(produced, lambda item: item * 2)
+        results = pipeline.create_queue()
+        pipeline.consume(results, consumed.append)
+
+        for item in pipeline.iterate(doubled):
+            pipeline.put(results, item + 1)
+
+        pipeline.end(results)
+
+    assert consumed == [item * 2 + 1 for item in range(10)]
+
+
+def test_pipeline_queues_are_bounded():
+    produced_count = 0
+    release = threading.Event()
+
+    def producer():
+        nonlocal produced_count
+
+        for item in range(10):
+            produced_count += 1
+            yield item
+
+    with Pipeline(queue_depth=2) as pipeline:
+        produced = pipeline.produce(producer)
+        # One item may be waiting to be put into the full queue
+        release.wait(0.3)
+        assert produced_count <= 3
+        assert list(pipeline.iterate(produced)) == list(range(10))
+
+
+def test_pipeline_stage_error_is_raised():
+    def fail(item):
+        raise ValueError("Broken stage")
+
+    with pytest.raises(ValueError, match="Broken stage"):
+        with Pipeline(queue_depth=1) as pipeline:
+            produced = pipeline.produce(lambda: range(10))
+            failing = pipeline.map(produced, fail)
+            assert list(pipeline.iterate(failing)) == []
+
+
+def test_pipeline_invalid_queue_depth():
+    with pytest.raises(ValueError):
+        Pipeline(queue_depth=0)
@@ -1,10 +1,31 @@
+import csv
+import io
+import json
+from itertools import chain, repeat
+from unittest.mock import Mock, patch
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.db.models.sql import Query
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-from resilient_logger.models import ResilientLogEntry
+from resilient_logger.models import ResilientLogArchiveEntry, ResilientLogEntry
+from resilient_logger.retry_policy import RetryPolicy
 from resilient_logger.sources import ResilientLogSource
 from resilient_logger.sources.resilient_log_source import (
+    ResilientLogEntryData,
     StructuredResilientLogEntryData,
+    _copy_entries,
+)
+from resilient_logger.sources.resilient_log_source_entry import (
+    ResilientLogSourceRowEntry,
 )
+from resilient_logger.utils import content_hash, get_resilient_logger_config
+from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
 
 
 @pytest.mark.django_db
@@ -21,3 +42,415 @@ def test_bulk_create_resilient_log_entries(django_assert_max_num_queries):
 
     for idx in range(10):
         ResilientLogEntry.objects.get(message="Hello world", context__index=idx)
+
+
+@pytest.mark.django_db
+def test_mark_sent_many(django_assert_num_queries):
+    entries = ResilientLogSource.bulk_create_structured(
+        [StructuredResilientLogEntryData(message="Hello world") for _ in range(5)]
+    )
+    sent_ids = [entry.get_id() for entry in entries[:3]]
+
+    with django_assert_num_queries(1):
+        ResilientLogSource().mark_sent_many(sent_ids)
+
+    assert set(
+        ResilientLogEntry.objects.filter(is_sent=True).values_list("id", flat=True)
+    ) == set(sent_ids)
+
+
+@pytest.mark.django_db
+def test_get_unsent_chunk_claim():
+    entries = ResilientLogSource.bulk_create_structured(
+        [StructuredResilientLogEntryData(message="Hello world") for _ in range(5)]
+    )
+    log_source = ResilientLogSource()
+
+    with transaction.atomic():
+        first = log_source.get_unsent_chunk(3, claim=True)
+        second = log_source.get_unsent_chunk(3, after=first[-1], claim=True)
+
+    chunk_ids = [entry.get_id() for entry in [*first, *second]]
+    assert chunk_ids == [entry.get_id() for entry in entries]
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+@pytest.mark.parametrize("row_projection", [False, True])
+def test_get_unsent_chunk_claim_skips_locked_rows(row_projection):
+    ResilientLogSource.create_structured(message="Hello world")
+    claim_queries: list[Query] = []
+    select_for_update = QuerySet.select_for_update
+
+    def record_select_for_update(queryset, *args, **kwargs):
+        queryset = select_for_update(queryset, *args, **kwargs)
+        claim_queries.append(queryset.query)
+        return queryset
+
+    with patch.object(QuerySet, "select_for_update", record_select_for_update):
+        ResilientLogSource(row_projection=row_projection).get_unsent_chunk(
+            3, claim=True
+        )
+
+    [query] = claim_queries
+    assert query.select_for_update
+    assert query.select_for_update_skip_locked
+    assert not query.select_for_update_nowait
+
+    # SQLite ignores the locks, compile the query as a database that supports them
+    with (
+        patch.object(connection.features, "has_select_for_update", True),
+        patch.object(connection.features, "has_select_for_update_skip_locked", True),
+    ):
+        assert str(query).endswith("FOR UPDATE SKIP LOCKED")
+
+
+@pytest.mark.django_db
+def test_mark_failed_many_schedules_retry():
+    entries = ResilientLogSource.bulk_create_structured(
+        [StructuredResilientLogEntryData(message="Hello world") for _ in range(3)]
+    )
+    failed, parked, unsent = entries
+    log_source = ResilientLogSource()
+    policy = RetryPolicy(base_delay=60, max_attempts=2, jitter=0)
+
+    log_source.mark_failed_many({failed.get_id(): "Failed"}, policy)
+    log_source.mark_failed_many({parked.get_id(): "Failed"}, policy)
+    log_source.mark_failed_many({parked.get_id(): "Failed again"}, policy)
+
+    failed_log = ResilientLogEntry.objects.get(id=failed.get_id())
+    assert failed_log.attempts == 1
+    assert failed_log.last_error == "Failed"
+    assert failed_log.next_attempt_at > timezone.now()
+
+    parked_log = ResilientLogEntry.objects.get(id=parked.get_id())
+    assert parked_log.attempts == 2
+    assert parked_log.last_error == "Failed again"
+    assert parked_log.next_attempt_at is None
+
+    assert [entry.get_id() for entry in log_source.get_unsent_entries(500)] == [
+        unsent.get_id()
+    ]
+    assert [entry.get_id() for entry in log_source.get_unsent_chunk(500)] == [
+        unsent.get_id()
+    ]
+
+    ResilientLogEntry.objects.filter(id=failed.get_id()).update(
+        next_attempt_at=timezone.now()
+    )
+    assert len(log_source.get_unsent_chunk(500)) == 2
+
+
+@pytest.mark.django_db
+def test_get_unsent_entries_with_keyset_pagination():
+    entries = ResilientLogSource.bulk_create_structured(
+        [StructuredResilientLogEntryData(message="Hello world") for _ in range(7)]
+    )
+    # Entries sharing the same timestamp are ordered by id
+    ResilientLogEntry.objects.update(created_at=timezone.now())
+
+    log_source = ResilientLogSource(keyset_pagination=True)
+
+    with CaptureQueriesContext(connection) as context:
+        unsent_entries = list(log_source.get_unsent_entries(3))
+
+    selects = [q for q in context.captured_queries if q["sql"].startswith("SELECT")]
+    assert len(selects) == 3
+
+    assert [entry.get_id() for entry in unsent_entries] == [
+        entry.get_id() for entry in entries
+    ]
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+@pytest.mark.parametrize("keyset_pagination", [False, True])
+def test_get_unsent_entries_with_row_projection(keyset_pagination: bool):
+    entries = ResilientLogSource.bulk_create_structured(
+        [
+            StructuredResilientLogEntryData(
+                message="Hello world", actor={"name": "actor"}, extra={"index": idx}
+            )
+            for idx in range(7)
+        ]
+    )
+    ResilientLogEntry.objects.filter(id=entries[0].get_id()).update(
+        idempotency_key=None
+    )
+    log_source = ResilientLogSource(
+        keyset_pagination=keyset_pagination, row_projection=True
+    )
+
+    unsent_entries = list(log_source.get_unsent_entries(3))
+    assert [entry.get_id() for entry in unsent_entries] == [
+        entry.get_id() for entry in entries
+    ]
+
+    for unsent, entry in zip(unsent_entries, entries):
+        entry.log.refresh_from_db()
+        assert isinstance(unsent, ResilientLogSourceRowEntry)
+        assert not hasattr(unsent, "__dict__")
+        assert unsent.get_document() == entry.get_document()
+        assert unsent.get_idempotency_key() == entry.get_idempotency_key()
+
+    unsent_entries[0].mark_sent()
+    assert [
+        entry.get_id() for entry in log_source.get_unsent_chunk(3, unsent_entries[2])
+    ] == [entry.get_id() for entry in entries[3:6]]
+    assert len(log_source.get_unsent_chunk(10)) == 6
+
+
+@pytest.mark.django_db
+def test_row_projection_builds_documents_per_chunk():
+    ResilientLogSource.bulk_create_structured(
+        [StructuredResilientLogEntryData(message="Hello world") for _ in range(4)]
+    )
+    log_source = ResilientLogSource(row_projection=True)
+
+    with (
+        override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS),
+        patch(
+            "resilient_logger.sources.resilient_log_source_entry."
+            "get_resilient_logger_config",
+            wraps=get_resilient_logger_config,
+        ) as get_config,
+    ):
+        entries = log_source.get_unsent_chunk(4)
+        documents = [entry.get_document() for entry in entries]
+
+    get_config.assert_called_once()
+    assert all(document["audit_event"]["origin"] == "test" for document in documents)
+
+
+@pytest.mark.django_db
+def test_batch_saves_entries_on_commit(django_capture_on_commit_callbacks):
+    with CaptureQueriesContext(connection) as context:
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with ResilientLogSource.batch():
+                for idx in range(5):
+                    ResilientLogSource.create_structured(
+                        message="Hello world", extra={"index": idx}
+                    )
+
+                with ResilientLogSource.batch():
+                    ResilientLogSource.create_structured(message="Nested")
+
+                assert ResilientLogEntry.objects.count() == 0
+
+    inserts = [q for q in context.captured_queries if q["sql"].startswith("INSERT")]
+    # Every entry joins the batch on commit, then the batch is saved
+    assert len(callbacks) == 7
+    assert len(inserts) == 1
+    assert ResilientLogEntry.objects.count() == 6
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_saves_entries_outside_transaction():
+    with ResilientLogSource.batch():
+        ResilientLogSource.create_structured(message="Hello world")
+        assert ResilientLogEntry.objects.count() == 0
+
+    assert ResilientLogEntry.objects.count() == 1
+
+    # Entries created outside the batch are saved right away
+    ResilientLogSource.create_structured(message="Hello world")
+    assert ResilientLogEntry.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_create():
+    async def create():
+        entry = await ResilientLogSource.acreate_structured(
+            message="Hello world", extra={"index": 1}
+        )
+        entries = await ResilientLogSource.abulk_create(
+            [
+                ResilientLogEntryData(level=0, message="Bulk", context={"index": idx})
+                for idx in range(3)
+            ]
+        )
+        return entry, entries
+
+    entry, entries = async_to_sync(create)()
+
+    assert entry.get_id() is not None
+    assert len(entries) == 3
+    assert ResilientLogEntry.objects.get(id=entry.get_id()).context["index"] == 1
+    assert ResilientLogEntry.objects.filter(message="Bulk").count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_consumes_generator_in_chunks():
+    consumed = []
+
+    def generate():
+        for idx in range(5):
+            consumed.append(idx)
+            yield ResilientLogEntryData(level=0, message="Hello", context={"i": idx})
+
+    with CaptureQueriesContext(connection) as context:
+        count = ResilientLogSource.bulk_ingest(generate(), chunk_size=2)
+
+    inserts = [q for q in context.captured_queries if q["sql"].startswith("INSERT")]
+    assert count == 5
+    assert len(inserts) == 3
+    assert ResilientLogEntry.objects.filter(is_sent=False).count() == 5
+
+
+def test_copy_entries_streams_csv():
+    copied = []
+
+    class RawCursor:
+        def copy_expert(self, sql, file):
+            copied.append((sql, file.read()))
+
+    cursor = Mock(cursor=RawCursor())
+    db = Mock(ops=connection.ops)
+    db.cursor.return_value.__enter__ = Mock(return_value=cursor)
+    db.cursor.return_value.__exit__ = Mock(return_value=False)
+
+    objs = [
+        ResilientLogEntryData(level=20, message="Hello, world", context={"a": 1}),
+        ResilientLogEntryData(level=30, message={"b": [1, 2]}, context=None),
+    ]
+    count = _copy_entries(db, iter(objs), 1)
+
+    [(sql, data)] = copied
+    rows = list(csv.reader(io.StringIO(data.decode())))
+
+    assert count == 2
+    assert sql.startswith('COPY "resilient_logger_resilientlogentry" ("level"')
+    assert sql.endswith("FROM STDIN WITH (FORMAT csv)")
+    assert [row[:4] for row in rows] == [
+        ["20", '"Hello, world"', '{"a": 1}', "f"],
+        ["30", '{"b": [1, 2]}', "", "f"],
+    ]
+
+
+@pytest.mark.django_db
+def test_clear_sent_entries_in_chunks():
+    for idx in range(5):
+        entry = ResilientLogSource.create_structured(message="Hello", extra={"i": idx})
+
+        if idx != 2:
+            entry.mark_sent()
+
+    source = ResilientLogSource()
+
+    with CaptureQueriesContext(connection) as context:
+        cleared = source.clear_sent_entries(0, chunk_size=2)
+
+    deletes = [q for q in context.captured_queries if q["sql"].startswith("DELETE")]
+    assert cleared == 4
+    assert len(deletes) == 2
+    assert list(ResilientLogEntry.objects.values_list("is_sent", flat=True)) == [False]
+
+
+@pytest.mark.django_db
+def test_clear_sent_entries_max_seconds():
+    ResilientLogSource.create_structured(message="Hello").mark_sent()
+
+    with patch("time.monotonic", side_effect=[0.0, 0.0, 2.0]):
+        assert ResilientLogSource().clear_sent_entries(0, max_seconds=1) == 1
+
+
+@pytest.mark.django_db
+def test_archive_moves_sent_entries():
+    source = ResilientLogSource(archive=True)
+    entries = [
+        ResilientLogSource.create_structured(message="Hello", extra={"i": idx})
+        for idx in range(3)
+    ]
+    ids = [entry.get_id() for entry in entries]
+
+    source.mark_sent_many(ids[:2])
+
+    assert list(ResilientLogEntry.objects.values_list("id", flat=True)) == [ids[2]]
+    archived = ResilientLogArchiveEntry.objects.order_by("id")
+    assert [entry.id for entry in archived] == ids[:2]
+    assert archived[0].context["i"] == 0
+    assert archived[0].created_at == entries[0].log.created_at
+    assert archived[0].sent_at is not None
+    assert [entry.get_id() for entry in source.get_unsent_chunk(10)] == [ids[2]]
+
+
+@pytest.mark.django_db
+def test_archive_clear_sent_entries():
+    source = ResilientLogSource(archive=True)
+    archived = ResilientLogSource.create_structured(message="Archived")
+    marked = ResilientLogSource.create_structured(message="Marked")
+    unsent = ResilientLogSource.create_structured(message="Unsent")
+
+    source.mark_sent_many([archived.get_id()])
+    marked.mark_sent()
+
+    assert source.clear_sent_entries(0) == 2
+    assert not ResilientLogArchiveEntry.objects.exists()
+    assert list(ResilientLogEntry.objects.values_list("id", flat=True)) == [
+        unsent.get_id()
+    ]
+
+
+@pytest.mark.django_db
+def test_archive_clear_sent_entries_max_seconds():
+    source = ResilientLogSource(archive=True)
+
+    for _ in range(5):
+        ResilientLogSource.create_structured(message="Marked").mark_sent()
+
+    # The first chunk is moved before the time runs out
+    with patch("time.monotonic", side_effect=chain([0, 0], repeat(2))):
+        assert source.clear_sent_entries(0, chunk_size=2, max_seconds=1) == 0
+
+    assert ResilientLogEntry.objects.count() == 3
+    assert ResilientLogArchiveEntry.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_idempotency_key_is_stored_at_insert():
+    entry = ResilientLogSource.create_structured(message="Hello")
+    [bulk_entry] = ResilientLogSource.bulk_create(
+        [ResilientLogEntryData(level=0, message="Hello", context={})]
+    )
+    entry.log.refresh_from_db()
+
+    assert len(entry.log.idempotency_key) == 32
+    assert entry.get_idempotency_key() == entry.log.idempotency_key
+    assert bulk_entry.get_idempotency_key() != entry.get_idempotency_key()
+
+    with patch("resilient_logger.sources.abstract_log_source_entry.content_hash") as h:
+        entry.get_idempotency_key()
+
+    h.assert_not_called()
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_idempotency_key_falls_back_to_content_hash():
+    entry = ResilientLogSource.create_structured(message="Hello")
+    ResilientLogEntry.objects.update(idempotency_key=None)
+    entry.log.refresh_from_db()
+
+    assert entry.get_idempotency_key() == content_hash(entry.get_document())
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_shared_document_is_built_once():
+    entry = ResilientLogSource.create_structured(message="Hello", extra={"a": [1]})
+
+    with patch.object(entry, "get_document", wraps=entry.get_document) as build:
+        document = entry.get_shared_document()
+        serialized = entry.get_serialized_document()
+
+        assert entry.get_shared_document() is document
+        assert entry.get_serialized_document() is serialized
+
+    build.assert_called_once()
+    assert json.loads(serialized) == entry.get_document()
+
+    with pytest.raises(TypeError):
+        document["audit_event"]["message"] = "Changed"
+
+    with pytest.raises(TypeError):
+        document["audit_event"]["extra"].pop("a")
@@ -0,0 +1,748 @@
+import logging
+from unittest.mock import Mock, patch
+
+import pytest
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_delete
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from resilient_logger.models import ResilientLogEntry
+from resilient_logger.resilient_logger import ResilientLogger
+from resilient_logger.sources import (
+    AbstractLogSource,
+    ModelLogSource,
+    ResilientLogSource,
+)
+from resilient_logger.sources.abstract_log_source_entry import AbstractLogSourceEntry
+from resilient_logger.sources.resilient_log_source_entry import (
+    ResilientLogSourceEntry,
+)
+from resilient_logger.targets import AbstractLogTarget, ProxyLogTarget
+from resilient_logger.utils import get_resilient_logger_config
+from tests.models import LoginEvent
+from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
+
+
+class SingleLogTarget(AbstractLogTarget):
+    def __init__(self, required: bool = True, accept: bool | None = True) -> None:
+        self.required = required
+        self.accept = accept
+        self.submitted: list[AbstractLogSourceEntry] = []
+
+    def is_required(self) -> bool:
+        return self.required
+
+    def submit(self, entry: AbstractLogSourceEntry) -> bool | None:
+        self.submitted.append(entry)
+        return self.accept
+
+
+class BatchLogTarget(SingleLogTarget):
+    def __init__(self, required: bool = True, accept: bool | None = True) -> None:
+        super().__init__(required, accept)
+        self.batches: list[list[AbstractLogSourceEntry]] = []
+
+    def submit_batch(self, entries) -> list[bool | None]:
+        self.batches.append(list(entries))
+        return [self.accept] * len(entries)
+
+
+class PreparingLogTarget(BatchLogTarget):
+    def __init__(self) -> None:
+        super().__init__()
+        self.prepared: list[list[dict]] = []
+
+    def prepare_batch(self, entries) -> list[dict]:
+        return [entry.get_document() for entry in entries]
+
+    def submit_prepared(self, prepared: list[dict]) -> list[bool]:
+        self.prepared.append(prepared)
+        return [True] * len(prepared)
+
+
+class MemoryLogSourceEntry(AbstractLogSourceEntry):
+    def __init__(self, id: int) -> None:
+        self.id = id
+        self.sent = False
+
+    def get_id(self) -> int:
+        return self.id
+
+    def get_document(self):
+        return {"@timestamp": "", "audit_event": {"message": str(self.id)}}
+
+    def is_sent(self) -> bool:
+        return self.sent
+
+    def mark_sent(self) -> None:
+        self.sent = True
+
+
+class MemoryLogSource(AbstractLogSource):
+    """Log source of a third party, implementing only the required methods."""
+
+    def __init__(self, count: int) -> None:
+        self.entries = [MemoryLogSourceEntry(id) for id in range(count)]
+
+    def get_unsent_entries(self, chunk_size: int):
+        return (entry for entry in self.entries if not entry.is_sent())
+
+    def clear_sent_entries(self, days_to_keep=30, chunk_size=1000, max_seconds=None):
+        return 0
+
+
+class LegacyLogSource(MemoryLogSource):
+    """Log source written against the old clear_sent_entries signature."""
+
+    def clear_sent_entries(self, days_to_keep=30):
+        return [str(entry.get_id()) for entry in self.entries if entry.is_sent()]
+
+
+def create_entries(count: int):
+    for idx in range(count):
+        ResilientLogSource.create_structured(message="Hello", extra={"index": idx})
+
+
+def create_logger(
+    targets: list[AbstractLogTarget],
+    batch_limit: int = 5000,
+    chunk_size: int = 500,
+    **kwargs,
+) -> ResilientLogger:
+    return ResilientLogger(
+        batch_limit=batch_limit,
+        chunk_size=chunk_size,
+        log_sources=[ResilientLogSource()],
+        log_targets=targets,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_submit_in_chunks():
+    target = BatchLogTarget()
+    create_entries(7)
+
+    results = create_logger([target], chunk_size=3).submit_unsent_entries()
+
+    assert len(results) == 7
+    assert all(results.values())
+    assert [len(batch) for batch in target.batches] == [3, 3, 1]
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db
+def test_submit_respects_batch_limit():
+    target = BatchLogTarget()
+    create_entries(7)
+
+    results = create_logger(
+        [target], batch_limit=5, chunk_size=3
+    ).submit_unsent_entries()
+
+    assert len(results) == 5
+    assert [len(batch) for batch in target.batches] == [3, 2]
+    assert ResilientLogEntry.objects.filter(is_sent=False).count() == 2
+
+
+@pytest.mark.django_db
+def test_submit_falls_back_to_single_entries():
+    target = SingleLogTarget()
+    create_entries(4)
+
+    results = create_logger([target], chunk_size=3).submit_unsent_entries()
+
+    assert len(results) == 4
+    assert len(target.submitted) == 4
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_targets_share_the_document(caplog):
+    proxy = ProxyLogTarget(name="shared", required=True)
+    target = SingleLogTarget()
+
+    for idx in range(2):
+        ResilientLogSource.create_structured(
+            message="Hello", level=logging.INFO, extra={"index": idx}
+        )
+
+    with (
+        patch.object(
+            ResilientLogSourceEntry,
+            "get_document",
+            autospec=True,
+            side_effect=ResilientLogSourceEntry.get_document,
+        ) as build,
+        caplog.at_level(logging.INFO, logger="shared"),
+    ):
+        results = create_logger([proxy, target]).submit_unsent_entries()
+
+    assert all(results.values())
+    assert build.call_count == 2
+    assert [record.getMessage() for record in caplog.records] == ["Hello"] * 2
+    assert [record.index for record in caplog.records] == [0, 1]
+
+    for entry in target.submitted:
+        assert entry.get_shared_document()["audit_event"]["message"] == "Hello"
+
+
+@pytest.mark.django_db
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_with_row_projection():
+    target = BatchLogTarget()
+    create_entries(5)
+
+    results = ResilientLogger(
+        batch_limit=5000,
+        chunk_size=2,
+        log_sources=[ResilientLogSource(row_projection=True)],
+        log_targets=[target],
+    ).submit_unsent_entries()
+
+    assert len(results) == 5
+    assert all(results.values())
+    assert [len(batch) for batch in target.batches] == [2, 2, 1]
+    assert ResilientLogEntry.objects.filter(is_sent=False).count() == 0
+
+
+@pytest.mark.django_db
+def test_required_target_failure_skips_later_targets():
+    failing = BatchLogTarget(required=True, accept=False)
+    later = BatchLogTarget()
+    create_entries(3)
+
+    results = create_logger([failing, later]).submit_unsent_entries()
+
+    assert not any(results.values())
+    assert later.batches == []
+    assert ResilientLogEntry.objects.filter(is_sent=False).count() == 3
+
+
+@pytest.mark.django_db
+def test_optional_target_failure_is_ignored():
+    optional = BatchLogTarget(required=False, accept=False)
+    required = BatchLogTarget()
+    create_entries(3)
+
+    results = create_logger([optional, required]).submit_unsent_entries()
+
+    assert all(results.values())
+    assert len(required.batches[0]) == 3
+
+
+@pytest.mark.django_db
+def test_sent_entries_are_acknowledged_per_chunk():
+    target = BatchLogTarget()
+    create_entries(6)
+
+    with CaptureQueriesContext(connection) as context:
+        create_logger([target], chunk_size=3).submit_unsent_entries()
+
+    updates = [q for q in context.captured_queries if q["sql"].startswith("UPDATE")]
+    assert len(updates) == 2
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db
+def test_commit_per_chunk():
+    target = BatchLogTarget()
+    create_entries(7)
+
+    logger = create_logger([target], chunk_size=3, commit_per_chunk=True)
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 7
+    assert [len(batch) for batch in target.batches] == [3, 3, 1]
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("commit_per_chunk,expected_sent", [(False, 0), (True, 3)])
+def test_commit_per_chunk_keeps_progress(commit_per_chunk, expected_sent):
+    create_entries(6)
+
+    logger = create_logger(
+        [BatchLogTarget()], chunk_size=3, commit_per_chunk=commit_per_chunk
+    )
+    mark_sent_many = ResilientLogSource.mark_sent_many
+    calls = []
+
+    def crash_on_second_chunk(self, ids):
+        calls.append(ids)
+
+        if len(calls) > 1:
+            raise RuntimeError("Crash")
+
+        mark_sent_many(self, ids)
+
+    with patch.object(ResilientLogSource, "mark_sent_many", crash_on_second_chunk):
+        with pytest.raises(RuntimeError):
+            logger.submit_unsent_entries()
+
+    assert ResilientLogEntry.objects.filter(is_sent=True).count() == expected_sent
+
+
+@pytest.mark.django_db
+def test_commit_per_chunk_does_not_retry_failed_entries_within_run():
+    target = BatchLogTarget(accept=False)
+    create_entries(5)
+
+    logger = create_logger([target], chunk_size=2, commit_per_chunk=True)
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 5
+    assert [len(batch) for batch in target.batches] == [2, 2, 1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("commit_per_chunk", [False, True])
+def test_stop_finishes_current_chunk(commit_per_chunk):
+    target = BatchLogTarget()
+    create_entries(6)
+
+    logger = create_logger([target], chunk_size=2, commit_per_chunk=commit_per_chunk)
+    submit_batch = target.submit_batch
+
+    def stop_after_first_batch(entries):
+        logger.stop()
+        return submit_batch(entries)
+
+    target.submit_batch = stop_after_first_batch
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 2
+    assert ResilientLogEntry.objects.filter(is_sent=True).count() == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("commit_per_chunk", [False, True])
+def test_open_circuit_of_required_target_ends_run(commit_per_chunk):
+    target = BatchLogTarget(accept=None)
+    create_entries(10)
+
+    logger = create_logger(
+        [target],
+        chunk_size=2,
+        commit_per_chunk=commit_per_chunk,
+        circuit_breaker={"failure_threshold": 2, "reset_timeout": 60},
+    )
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 4
+    assert len(target.batches) == 2
+    assert logger.get_circuit_breaker_states() == [
+        {"target": "BatchLogTarget", "state": "open", "failures": 2}
+    ]
+
+    # The circuit stays open for the next run
+    assert logger.submit_unsent_entries() == {}
+    assert len(target.batches) == 2
+
+
+@pytest.mark.django_db
+def test_rejections_do_not_open_circuit():
+    target = BatchLogTarget(accept=False)
+    create_entries(6)
+
+    logger = create_logger(
+        [target],
+        chunk_size=2,
+        circuit_breaker={"failure_threshold": 1, "reset_timeout": 60},
+    )
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 6
+    assert len(target.batches) == 3
+    assert logger.get_circuit_breaker_states() == [
+        {"target": "BatchLogTarget", "state": "closed", "failures": 0}
+    ]
+
+
+@pytest.mark.django_db
+def test_open_circuit_of_optional_target_is_skipped():
+    optional = BatchLogTarget(required=False, accept=None)
+    required = BatchLogTarget()
+    create_entries(6)
+
+    logger = create_logger(
+        [optional, required],
+        chunk_size=2,
+        circuit_breaker={"failure_threshold": 1, "reset_timeout": 60},
+    )
+    results = logger.submit_unsent_entries()
+
+    assert all(results.values())
+    assert len(optional.batches) == 1
+    assert len(required.batches) == 3
+
+
+@pytest.mark.django_db
+def test_failed_entries_are_scheduled_for_retry():
+    target = BatchLogTarget(accept=False)
+    create_entries(3)
+
+    logger = create_logger([target], retry={"base_delay": 60, "max_attempts": 5})
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 3
+    assert not any(results.values())
+
+    for log in ResilientLogEntry.objects.all():
+        assert log.attempts == 1
+        assert log.last_error == "Rejected by BatchLogTarget"
+        assert log.next_attempt_at > timezone.now()
+
+    # Failed entries are not retried before the next attempt time
+    assert logger.submit_unsent_entries() == {}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "submit_batch",
+    [Mock(side_effect=ValueError("Broken")), Mock(return_value=[None, None])],
+)
+def test_unavailable_target_does_not_use_attempts(submit_batch):
+    target = BatchLogTarget()
+    target.submit_batch = submit_batch
+    create_entries(2)
+
+    logger = create_logger([target], retry={"base_delay": 60, "max_attempts": 1})
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 2
+    assert not any(results.values())
+
+    for log in ResilientLogEntry.objects.all():
+        assert log.attempts == 0
+        assert log.last_error is None
+        assert log.next_attempt_at <= timezone.now()
+
+    # The entries are retried on the next run
+    assert len(logger.submit_unsent_entries()) == 2
+
+
+@pytest.mark.django_db
+def test_open_circuit_does_not_use_attempts():
+    target = BatchLogTarget()
+    create_entries(2)
+
+    logger = create_logger(
+        [target], circuit_breaker={"failure_threshold": 1, "reset_timeout": 60}
+    )
+    logger._circuit_breakers[0].record_failure()
+    log_source = ResilientLogSource()
+    results = logger._process_chunk(log_source, log_source.get_unsent_chunk(10))
+
+    assert not any(results.values())
+    assert target.batches == []
+
+    for log in ResilientLogEntry.objects.all():
+        assert log.attempts == 0
+        assert log.last_error is None
+
+
+@pytest.mark.django_db
+def test_requeue_parked_entries():
+    target = BatchLogTarget(accept=False)
+    create_entries(3)
+
+    logger = create_logger([target], retry={"base_delay": 60, "max_attempts": 1})
+    logger.submit_unsent_entries()
+
+    assert ResilientLogEntry.objects.filter(next_attempt_at__isnull=True).count() == 3
+    assert logger.submit_unsent_entries() == {}
+
+    assert logger.requeue_parked_entries() == 3
+    assert not ResilientLogEntry.objects.filter(next_attempt_at__isnull=True).exists()
+    assert not ResilientLogEntry.objects.filter(attempts__gt=0).exists()
+
+    target.accept = True
+    assert all(logger.submit_unsent_entries().values())
+    assert logger.requeue_parked_entries() == 0
+
+
+@pytest.fixture
+def sqlite_read_uncommitted():
+    """
+    The in-memory test database uses SQLite shared cache, where a read fails
+    right away with "table is locked" while another connection writes to the
+    table. Let the pipeline stages read uncommitted data like they could with
+    the MVCC of PostgreSQL.
+    """
+
+    def set_read_uncommitted(sender, connection, **kwargs):
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA read_uncommitted = 1")
+
+    connection_created.connect(set_read_uncommitted)
+    yield
+    connection_created.disconnect(set_read_uncommitted)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("sqlite_read_uncommitted")
+@override_settings(RESILIENT_LOGGER=VALID_CONFIG_ALL_FIELDS)
+def test_submit_pipelined():
+    target = PreparingLogTarget()
+    optional = BatchLogTarget(required=False)
+    create_entries(7)
+
+    logger = create_logger([target, optional], chunk_size=3, pipeline_queue_depth=1)
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 7
+    assert all(results.values())
+    assert [len(payload) for payload in target.prepared] == [3, 3, 1]
+    assert [len(batch) for batch in optional.batches] == [3, 3, 1]
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("sqlite_read_uncommitted")
+def test_submit_pipelined_failures():
+    target = BatchLogTarget(accept=False)
+    create_entries(4)
+
+    logger = create_logger([target], chunk_size=3, pipeline_queue_depth=2)
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 4
+    assert not any(results.values())
+    assert ResilientLogEntry.objects.filter(attempts=1).count() == 4
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("sqlite_read_uncommitted")
+def test_submit_pipelined_skips_chunks_after_circuit_opens():
+    target = BatchLogTarget(accept=None)
+    create_entries(6)
+
+    logger = create_logger(
+        [target],
+        chunk_size=2,
+        pipeline_queue_depth=2,
+        circuit_breaker={"failure_threshold": 1, "reset_timeout": 60},
+    )
+    results = logger.submit_unsent_entries()
+
+    assert len(results) == 2
+    assert not any(results.values())
+    assert len(target.batches) == 1
+    assert not ResilientLogEntry.objects.filter(attempts__gt=0).exists()
+
+
+def test_claim_entries_cannot_be_pipelined():
+    with pytest.raises(ValueError, match="claim_entries"):
+        create_logger([BatchLogTarget()], claim_entries=True, pipeline_queue_depth=1)
+
+
+def create_login_events(count: int) -> None:
+    LoginEvent.objects.bulk_create(
+        LoginEvent(username=f"user{idx}") for idx in range(count)
+    )
+
+
+def create_interleaved_logger(target: AbstractLogTarget, **kwargs) -> ResilientLogger:
+    return ResilientLogger(
+        chunk_size=2,
+        log_sources=[
+            ResilientLogSource(),
+            ModelLogSource(model="tests.LoginEvent", fields={"message": "username"}),
+        ],
+        log_targets=[target],
+        **{"batch_limit": 5000, **kwargs},
+    )
+
+
+def get_batch_sources(target: BatchLogTarget) -> list[str]:
+    return [type(batch[0]).__name__ for batch in target.batches]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("commit_per_chunk", [False, True])
+def test_submit_interleaves_sources(commit_per_chunk: bool):
+    target = BatchLogTarget()
+    create_entries(10)
+    create_login_events(3)
+
+    results = create_interleaved_logger(
+        target, batch_limit=8, commit_per_chunk=commit_per_chunk
+    ).submit_unsent_entries()
+
+    # The ids of the sources overlap, so the results are counted from the batches
+    assert all(results.values())
+    assert sum(len(batch) for batch in target.batches) == 8
+    assert get_batch_sources(target) == [
+        "ResilientLogSourceEntry",
+        "ModelLogSourceEntry",
+        "ResilientLogSourceEntry",
+        "ModelLogSourceEntry",
+        "ResilientLogSourceEntry",
+    ]
+    assert [len(batch) for batch in target.batches] == [2, 2, 2, 1, 1]
+    assert not LoginEvent.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db
+def test_submit_with_source_weights_and_limits():
+    target = BatchLogTarget()
+    create_entries(10)
+    create_login_events(10)
+
+    create_interleaved_logger(
+        target, source_weights=[1, 2], source_limits=[None, 5]
+    ).submit_unsent_entries()
+
+    assert get_batch_sources(target)[:6] == [
+        "ModelLogSourceEntry",
+        "ResilientLogSourceEntry",
+        "ModelLogSourceEntry",
+        "ModelLogSourceEntry",
+        "ResilientLogSourceEntry",
+        "ResilientLogSourceEntry",
+    ]
+    assert LoginEvent.objects.filter(is_sent=False).count() == 5
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("sqlite_read_uncommitted")
+def test_submit_pipelined_with_concurrent_fetch():
+    target = BatchLogTarget()
+    create_entries(6)
+    create_login_events(3)
+
+    results = create_interleaved_logger(
+        target, batch_limit=7, pipeline_queue_depth=1, concurrent_fetch=True
+    ).submit_unsent_entries()
+
+    assert all(results.values())
+    assert get_batch_sources(target) == [
+        "ResilientLogSourceEntry",
+        "ModelLogSourceEntry",
+        "ResilientLogSourceEntry",
+        "ModelLogSourceEntry",
+    ]
+    assert [len(batch) for batch in target.batches] == [2, 2, 2, 1]
+    assert ResilientLogEntry.objects.filter(is_sent=False).count() == 2
+    assert not LoginEvent.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("sqlite_read_uncommitted")
+def test_submit_pipelined_with_concurrent_fetch_until_exhausted():
+    target = BatchLogTarget()
+    create_entries(3)
+    create_login_events(1)
+
+    results = create_interleaved_logger(
+        target, pipeline_queue_depth=1, concurrent_fetch=True
+    ).submit_unsent_entries()
+
+    assert all(results.values())
+    assert sum(len(batch) for batch in target.batches) == 4
+    assert not ResilientLogEntry.objects.filter(is_sent=False).exists()
+    assert not LoginEvent.objects.filter(is_sent=False).exists()
+
+
+@pytest.mark.django_db
+def test_create_pops_source_scheduling_options():
+    config = {
+        **VALID_CONFIG_ALL_FIELDS,
+        "sources": [
+            {
+                "class": "resilient_logger.sources.ResilientLogSource",
+                "weight": 3,
+                "limit": 100,
+            }
+        ],
+    }
+
+    with override_settings(RESILIENT_LOGGER=config):
+        get_resilient_logger_config.cache_clear()
+        logger = ResilientLogger.create()
+
+    get_resilient_logger_config.cache_clear()
+    assert logger._source_weights == [3]
+    assert logger._source_limits == [100]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_clear_sent_entries_commits_each_chunk():
+    create_entries(5)
+    ResilientLogEntry.objects.update(is_sent=True)
+    savepoints: list[list] = []
+
+    def record_savepoints(sender, **kwargs):
+        savepoints.append(list(connection.savepoint_ids))
+
+    pre_delete.connect(record_savepoints, sender=ResilientLogEntry)
+
+    try:
+        cleared = create_logger([BatchLogTarget()], chunk_size=2).clear_sent_entries(0)
+    finally:
+        pre_delete.disconnect(record_savepoints, sender=ResilientLogEntry)
+
+    assert cleared == 5
+    assert len(savepoints) == 5
+    # The chunk is a transaction of its own, not a savepoint of an outer one
+    assert not any(any(ids) for ids in savepoints)
+
+
+def test_clear_sent_entries_supports_legacy_sources():
+    source = LegacyLogSource(5)
+    source.mark_sent_many([1, 3])
+    logger = ResilientLogger(
+        batch_limit=10, chunk_size=2, log_sources=[source], log_targets=[]
+    )
+
+    assert logger.clear_sent_entries(0, max_seconds=10) == 2
+
+
+def test_mark_sent_many_defaults_to_mark_sent():
+    source = MemoryLogSource(5)
+    source.mark_sent_many([1, "3"])
+
+    assert [entry.get_id() for entry in source.get_unsent_entries(10)] == [0, 2, 4]
+
+
+def test_get_unsent_chunk_defaults_to_unsent_entries():
+    source = MemoryLogSource(5)
+    chunk = source.get_unsent_chunk(2)
+
+    assert [entry.get_id() for entry in chunk] == [0, 1]
+    assert [entry.get_id() for entry in source.get_unsent_chunk(2, chunk[-1])] == [
+        2,
+        3,
+    ]
+
+    source.mark_sent_many([0, 1])
+    # The entries after an entry that is already sent start from the first one
+    assert [entry.get_id() for entry in source.get_unsent_chunk(2, chunk[-1])] == [
+        2,
+        3,
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("commit_per_chunk", [False, True])
+def test_submit_from_source_with_default_methods(commit_per_chunk):
+    target = BatchLogTarget()
+    source = MemoryLogSource(5)
+
+    results = ResilientLogger(
+        batch_limit=5000,
+        chunk_size=2,
+        log_sources=[source, ResilientLogSource()],
+        log_targets=[target],
+        commit_per_chunk=commit_per_chunk,
+    ).submit_unsent_entries()
+
+    assert all(results.values())
+    assert [len(batch) for batch in target.batches] == [2, 2, 1]
+    assert all(entry.is_sent() for entry in source.entries)
@@ -0,0 +1,31 @@
+import datetime
+
+from resilient_logger.retry_policy import RetryPolicy
+
+now = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def test_exponential_delay_without_jitter():
+    policy = RetryPolicy(base_delay=10, max_delay=60, jitter=0)
+
+    assert [policy.get_delay(attempts) for attempts in range(1, 6)] == [
+        10,
+        20,
+        40,
+        60,
+        60,
+    ]
+
+
+def test_jitter_shortens_delay():
+    policy = RetryPolicy(base_delay=100, jitter=0.5)
+
+    for _ in range(100):
+        assert 50 <= policy.get_delay(1) <= 100
+
+
+def test_next_attempt_at():
+    policy = RetryPolicy(base_delay=10, max_attempts=3, jitter=0)
+
+    assert policy.get_next_attempt_at(2, now) == now + datetime.timedelta(seconds=20)
+    assert policy.get_next_attempt_at(3, now) is None
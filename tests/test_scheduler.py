@@ -0,0 +1,54 @@
+import pytest
+
+from resilient_logger.scheduler import SourceScheduler
+
+
+def run(scheduler: SourceScheduler, backlogs: list[int]) -> list[tuple[int, int]]:
+    """Runs the scheduler against sources with the given number of entries."""
+    fetched: list[tuple[int, int]] = []
+
+    while scheduled := scheduler.next():
+        index, size, _ = scheduled
+        chunk = list(range(min(size, backlogs[index])))
+        backlogs[index] -= len(chunk)
+        scheduler.record(index, chunk, exhausted=len(chunk) < size)
+        fetched.append((index, len(chunk)))
+
+    return fetched
+
+
+def test_weighted_round_robin():
+    scheduler = SourceScheduler(10, 1000, weights=[2, 1], limits=[None, None])
+    fetched = run(scheduler, [100, 100])
+
+    assert [index for index, _ in fetched[:6]] == [0, 1, 0, 0, 1, 0]
+
+
+def test_backlog_does_not_starve_other_sources():
+    scheduler = SourceScheduler(10, 40, weights=[1, 1], limits=[None, None])
+    fetched = run(scheduler, [5000, 15])
+
+    assert fetched == [(0, 10), (1, 10), (0, 10), (1, 5), (0, 5)]
+    assert scheduler.is_batch_limit_reached
+
+
+def test_source_limits():
+    scheduler = SourceScheduler(10, 1000, weights=[1, 1], limits=[15, None])
+    fetched = run(scheduler, [100, 30])
+
+    assert fetched == [(0, 10), (1, 10), (0, 5), (1, 10), (1, 10), (1, 0)]
+    assert not scheduler.is_batch_limit_reached
+
+
+def test_next_returns_the_last_entry_of_previous_chunk():
+    scheduler = SourceScheduler(2, 10, weights=[1], limits=[None])
+
+    assert scheduler.next() == (0, 2, None)
+    scheduler.record(0, ["a", "b"], exhausted=False)
+    assert scheduler.next() == (0, 2, "b")
+
+
+@pytest.mark.parametrize("weights,limits", [([0, 1], [None, None]), ([1, 1], [None])])
+def test_invalid_configuration(weights, limits):
+    with pytest.raises(ValueError):
+        SourceScheduler(10, 100, weights, limits)
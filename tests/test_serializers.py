@@ -0,0 +1,86 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import override_settings
+
+from resilient_logger.serializers import (
+    JsonSerializer,
+    OrjsonSerializer,
+    get_serializer,
+)
+from resilient_logger.utils import content_hash, get_resilient_logger_config
+from tests.testdata.testconfig import VALID_CONFIG_ALL_FIELDS
+
+DOCUMENT = {
+    "@timestamp": datetime.datetime(
+        2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+    ),
+    "audit_event": {
+        "message": "Hyvää päivää",
+        "date": datetime.date(2025, 1, 2),
+        "amount": decimal.Decimal("1.10"),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "duration": datetime.timedelta(minutes=5),
+        "list": [1, 2.5, None, True],
+        "nested": {"b": 1, "a": 2},
+    },
+}
+
+SERIALIZERS = [JsonSerializer(), OrjsonSerializer()]
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    get_resilient_logger_config.cache_clear()
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS)
+def test_dumps_encodes_like_django_json_encoder(serializer: JsonSerializer):
+    expected = json.loads(json.dumps(DOCUMENT, cls=DjangoJSONEncoder))
+
+    assert json.loads(serializer.dumps(DOCUMENT)) == expected
+    assert json.loads(serializer.dumps(DOCUMENT, pretty=True)) == expected
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS)
+def test_dumps_sort_keys(serializer: JsonSerializer):
+    serialized = serializer.dumps({"b": 1, "a": 2}, sort_keys=True, pretty=True)
+    assert serialized.decode() == '{\n  "a": 2,\n  "b": 1\n}'
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS)
+def test_canonical_is_byte_identical(serializer: JsonSerializer):
+    expected = json.dumps(DOCUMENT, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    assert serializer.canonical(DOCUMENT) == expected
+
+
+def test_orjson_falls_back_on_big_integers():
+    assert (
+        OrjsonSerializer().dumps({"value": 2**70})
+        == b'{"value": 1180591620717411303424}'
+    )
+
+
+def test_content_hash_is_unchanged():
+    assert (
+        content_hash({"b": "ä", "a": 1})
+        == "5840bc86a308d6f0bce0981f468e82efdb9bac8c16b96a77c055f1083b7fe852"
+    )
+
+
+def test_default_serializer():
+    assert isinstance(get_serializer(), OrjsonSerializer)
+
+
+@override_settings(
+    RESILIENT_LOGGER={
+        **VALID_CONFIG_ALL_FIELDS,
+        "serializer": "resilient_logger.serializers.JsonSerializer",
+    }
+)
+def test_configured_serializer():
+    assert type(get_serializer()) is JsonSerializer
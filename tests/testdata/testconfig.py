@@ -12,6 +12,15 @@ VALID_CONFIG_ALL_FIELDS = {
     ],
     "batch_limit": 5000,
     "chunk_size": 500,
+    "commit_per_chunk": False,
+    "claim_entries": False,
+    "listen_notify": False,
+    "circuit_breaker": {"failure_threshold": 5, "reset_timeout": 60},
+    "retry": {"base_delay": 60, "max_delay": 86400, "max_attempts": 10},
+    "pipeline_queue_depth": 0,
+    "concurrent_fetch": False,
+    "partitioning": None,
+    "serializer": None,
     "submit_unsent_entries": True,
     "clear_sent_entries": True,
     "environment": "dev",